@@ -0,0 +1,13 @@
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User
+
+
+class RoleAwareModelBackend(ModelBackend):
+    """ModelBackend that loads the linked doctor profile together with the user"""
+
+    def get_user(self, user_id):
+        try:
+            user = User._default_manager.select_related('doctors').get(pk=user_id)
+        except User.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,46 @@
+import time
+
+from django.contrib.auth import SESSION_KEY as AUTH_SESSION_KEY
+
+from .roles import PRIVILEGED_ROLES, ROLE_ANONYMOUS, ROLE_MAX_AGE, SESSION_KEY, resolve_role, role_version
+
+
+class UserRoleMiddleware:
+    """Attach request.role, request.doctor_id and request.is_privileged.
+
+    The role is resolved once per session and stored next to the auth user id,
+    so routing decisions don't need to load the user or its doctor profile.
+    The stored role carries the user's role version from the cache; linking or
+    unlinking a doctor profile or saving the user bumps it (see accounts.signals
+    and doctors.signals), so the change takes effect on the next request. Roles
+    are also resolved again every ROLE_MAX_AGE seconds.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        role, doctor_id = self.get_role(request)
+        request.role = role
+        request.doctor_id = doctor_id
+        request.is_privileged = role in PRIVILEGED_ROLES
+        return self.get_response(request)
+
+    def get_role(self, request):
+        user_id = request.session.get(AUTH_SESSION_KEY)
+        if user_id is None:
+            return ROLE_ANONYMOUS, None
+
+        version = role_version(user_id)
+        now = int(time.time())
+        cached = request.session.get(SESSION_KEY)
+        if (
+            cached and len(cached) == 5 and cached[0] == str(user_id)
+            and cached[3] == version and now - cached[4] < ROLE_MAX_AGE
+        ):
+            return cached[1], cached[2]
+
+        role, doctor_id = resolve_role(request.user)
+        if role != ROLE_ANONYMOUS:
+            request.session[SESSION_KEY] = [str(user_id), role, doctor_id, version, now]
+        return role, doctor_id
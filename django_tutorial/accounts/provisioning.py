@@ -0,0 +1,85 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.contrib.auth.models import User
+
+BATCH_SIZE = 500
+# Below this many hashes the cost of starting worker processes outweighs the gain
+PARALLEL_THRESHOLD = 4
+
+
+def _init_worker(settings_module):
+    # Spawned (not forked) workers start without Django configured
+    import django
+    from django.conf import settings
+    if not settings.configured:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+
+def _encode(args):
+    password, hasher, keep_hashes = args
+    if not password:
+        return make_password(None)
+    if keep_hashes:
+        try:
+            # Already hashed (e.g. exported from another Django site)
+            identify_hasher(password)
+            return password
+        except ValueError:
+            pass
+    return make_password(password, hasher=hasher)
+
+
+def hash_passwords(passwords, hasher='default', workers=None, keep_hashes=False):
+    """Hash plain passwords across CPU cores, blanking empty ones.
+
+    `hasher` is an algorithm name from settings.PASSWORD_HASHERS ('pbkdf2_sha256',
+    'argon2', 'bcrypt_sha256', ...) or 'default' for the first configured one.
+    Values that already look like Django hashes are stored as they are only with
+    `keep_hashes`; otherwise they are hashed like any other password.
+    """
+    jobs = [(password, hasher, keep_hashes) for password in passwords]
+    if workers == 1 or len(jobs) < PARALLEL_THRESHOLD:
+        return [_encode(job) for job in jobs]
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'django_tutorial.settings'),),
+    ) as pool:
+        return list(pool.map(_encode, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+
+def provision_users(accounts, hasher='default', workers=None, keep_hashes=False):
+    """Create users from dicts of username, email, password and optional first_name.
+
+    Passwords are hashed in parallel (see hash_passwords) and users inserted
+    BATCH_SIZE at a time; returns the created User objects with primary keys set.
+    """
+    accounts = list(accounts)
+    hashes = hash_passwords([account.get('password', '') for account in accounts], hasher, workers, keep_hashes)
+    users = [
+        User(
+            username=account['username'],
+            email=account.get('email', ''),
+            first_name=account.get('first_name', '')[:150],
+            password=password,
+        )
+        for account, password in zip(accounts, hashes)
+    ]
+    return User.objects.bulk_create(users, batch_size=BATCH_SIZE)
+
+
+def reset_passwords(users, passwords, hasher='default', workers=None):
+    """Set a new password on each user, pairing `users` with `passwords` in order.
+
+    Hashing runs in parallel and the rows are written with batched bulk_update.
+    """
+    users = list(users)
+    for user, password in zip(users, hash_passwords(passwords, hasher, workers)):
+        user.password = password
+    User.objects.bulk_update(users, ['password'], batch_size=BATCH_SIZE)
+    return len(users)
@@ -0,0 +1,42 @@
+import time
+
+from django.core.cache import cache
+
+ROLE_ANONYMOUS = 'anonymous'
+ROLE_PATIENT = 'patient'
+ROLE_DOCTOR = 'doctor'
+ROLE_SUPERUSER = 'superuser'
+
+PRIVILEGED_ROLES = (ROLE_DOCTOR, ROLE_SUPERUSER)
+
+# Session key holding [user_id, role, doctor_id, role version, resolved at] for the logged-in user
+SESSION_KEY = '_user_role'
+# A session role is resolved again after this many seconds even if its version still
+# matches, which bounds staleness when the cache is not shared between processes
+ROLE_MAX_AGE = 300
+
+
+def _version_key(user_id):
+    return f'role-version:{user_id}'
+
+
+def role_version(user_id):
+    """Version of a user's role; 0 until the user or their doctor link changes"""
+    return cache.get(_version_key(user_id), 0)
+
+
+def invalidate_roles(user_ids):
+    """Make the sessions of these users re-resolve their role on the next request"""
+    version = time.time_ns()
+    cache.set_many({_version_key(user_id): version for user_id in user_ids if user_id is not None}, None)
+
+
+def resolve_role(user):
+    """Return (role, doctor_id) for a user object"""
+    if not user.is_authenticated:
+        return ROLE_ANONYMOUS, None
+    if user.is_superuser:
+        return ROLE_SUPERUSER, None
+    if hasattr(user, 'doctors'):
+        return ROLE_DOCTOR, user.doctors.id
+    return ROLE_PATIENT, None
@@ -0,0 +1,80 @@
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from doctors.models import Departments, Doctors
+from .provisioning import hash_passwords
+from .roles import SESSION_KEY, role_version
+
+
+class HashPasswordsTests(SimpleTestCase):
+    def setUp(self):
+        self.existing = make_password('from another site')
+
+    def test_hash_lookalikes_are_hashed_by_default(self):
+        stored, = hash_passwords([self.existing], workers=1)
+        self.assertNotEqual(stored, self.existing)
+        self.assertTrue(check_password(self.existing, stored))
+
+    def test_hashes_kept_when_asked(self):
+        stored, plain = hash_passwords([self.existing, 'plain secret'], workers=1, keep_hashes=True)
+        self.assertEqual(stored, self.existing)
+        self.assertTrue(check_password('plain secret', plain))
+
+    def test_blank_passwords_are_unusable(self):
+        stored, = hash_passwords([''], workers=1)
+        self.assertFalse(check_password('', stored))
+        self.assertTrue(stored.startswith('!'))
+
+
+class SessionRoleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('dr-asha')
+        department = Departments.objects.create(dep_name='Cardiology', dep_decription='Heart')
+        self.doctor = Doctors.objects.create(doc_name='Asha Menon', doc_spec='Cardiologist', dep_name=department, user=self.user)
+        self.client.force_login(self.user)
+
+    def role(self):
+        self.client.get('/')
+        return self.client.session[SESSION_KEY][1:3]
+
+    def save(self, obj):
+        with self.captureOnCommitCallbacks(execute=True):
+            obj.save()
+
+    def test_unlinking_the_doctor(self):
+        self.assertEqual(self.role(), ['doctor', self.doctor.id])
+        doctor = Doctors.objects.get(pk=self.doctor.pk)
+        doctor.user = None
+        self.save(doctor)
+        self.assertEqual(self.role(), ['patient', None])
+
+    def test_moving_the_profile_to_another_login(self):
+        self.role()
+        other = User.objects.create_user('dr-other')
+        doctor = Doctors.objects.get(pk=self.doctor.pk)
+        doctor.user = other
+        self.save(doctor)
+        self.assertEqual(self.role(), ['patient', None])
+        self.assertNotEqual(role_version(other.id), 0)
+
+    def test_deleting_the_doctor(self):
+        self.role()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.doctor.delete()
+        self.assertEqual(self.role(), ['patient', None])
+
+    def test_profile_edits_keep_the_session_role(self):
+        self.role()
+        doctor = Doctors.objects.get(pk=self.doctor.pk)
+        doctor.doc_spec = 'Senior Cardiologist'
+        self.save(doctor)
+        self.assertEqual(role_version(self.user.id), 0)
+
+    def test_becoming_a_superuser(self):
+        self.role()
+        self.user.is_superuser = True
+        self.save(self.user)
+        self.assertEqual(self.role(), ['superuser', None])
@@ -2,6 +2,7 @@ from django.shortcuts import render, redirect
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.forms import AuthenticationForm, UserCreationForm
 from django.contrib import messages
+from core.ratelimit import rate_limit
 
 def login_view(request):
     if request.method == 'POST':
@@ -31,6 +32,7 @@ def logout_view(request):
     messages.info(request, "You have successfully logged out.")
     return redirect('login')  # Go to login page, NOT homepage
 
+@rate_limit('signup', methods=('POST',))
 def signup_view(request):
     if request.method == 'POST':
         form = UserCreationForm(request.POST)
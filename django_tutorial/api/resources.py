@@ -0,0 +1,277 @@
+import base64
+import binascii
+import datetime
+from operator import attrgetter
+
+from django.core.exceptions import ValidationError
+from django.db.models import Prefetch
+
+from bookings.models import Booking
+from core.tenancy import tenant_lookup
+from doctors.models import Departments, DoctorAvailability, DoctorLeave, Doctors
+from doctors.schedule import hours_as_times
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+MAX_BATCH_IDS = 100
+
+
+class ApiError(Exception):
+    """Turned into a JSON error response by the views"""
+
+    def __init__(self, message, status=400):
+        self.message = message
+        self.status = status
+        super().__init__(message)
+
+
+class Field:
+    """One selectable output field.
+
+    `source` is a dotted attribute path on the object. `select` and `prefetch`
+    name the relations the field needs, so the queryset only joins or prefetches
+    what the requested fields use. `render` turns the raw value into JSON.
+    """
+
+    def __init__(self, source, select=None, prefetch=None, render=None):
+        self.source = source
+        self.select = select
+        self.prefetch = prefetch
+        self.render = render
+        self._get = attrgetter(source)
+
+    def value(self, obj):
+        value = self._get(obj)
+        return self.render(value) if self.render else value
+
+
+def _related_ids(manager):
+    return [obj.pk for obj in manager.all()]
+
+
+def _windows(week):
+    return [
+        {'day': day, 'start': start, 'end': end}
+        for day, intervals in enumerate(week)
+        for start, end in hours_as_times(intervals)
+    ]
+
+
+def _leave_dates(manager):
+    return [leave.date for leave in manager.all()]
+
+
+def _upcoming_leaves():
+    return Prefetch(
+        'leaves',
+        queryset=DoctorLeave.objects.filter(date__gte=datetime.date.today()).order_by('date'),
+    )
+
+
+class Resource:
+    model = None
+    fields = {}
+    # Returned when the client does not pass ?fields=
+    default_fields = ()
+    # Filter query parameters -> queryset lookups
+    filters = {}
+
+    def get_queryset(self, request):
+        return self.model.objects.all()
+
+    def parse_fields(self, value):
+        if not value:
+            return list(self.default_fields)
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError(f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(self.fields)}")
+        return names
+
+    def shape(self, queryset, names):
+        """Join and prefetch only the relations the requested fields read"""
+        selected = [self.fields[name] for name in names]
+        select = {field.select for field in selected if field.select}
+        prefetch = {}
+        for field in selected:
+            if field.prefetch:
+                lookup = field.prefetch() if callable(field.prefetch) else field.prefetch
+                prefetch[getattr(lookup, 'prefetch_to', lookup)] = lookup
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch.values())
+        return queryset
+
+    def filter(self, queryset, params):
+        for param, lookup in self.filters.items():
+            value = params.get(param)
+            if value:
+                try:
+                    queryset = queryset.filter(**{lookup: value})
+                except (ValueError, ValidationError):
+                    raise ApiError(f'Invalid value for {param}')
+        return queryset
+
+    def serialize(self, obj, names):
+        return {name: self.fields[name].value(obj) for name in names}
+
+
+class DepartmentResource(Resource):
+    model = Departments
+    fields = {
+        'id': Field('id'),
+        'name': Field('dep_name'),
+        'description': Field('dep_decription'),
+        'timezone': Field('timezone'),
+        'doctors': Field('doctors_set', prefetch='doctors_set', render=_related_ids),
+    }
+    default_fields = ('id', 'name')
+
+
+class DoctorResource(Resource):
+    model = Doctors
+    fields = {
+        'id': Field('id'),
+        'name': Field('doc_name'),
+        'specialization': Field('doc_spec'),
+        'department': Field('dep_name_id'),
+        'department_name': Field('dep_name.dep_name', select='dep_name'),
+        'timezone': Field('dep_name.timezone', select='dep_name'),
+        'slot_minutes': Field('slot_minutes'),
+        'buffer_minutes': Field('buffer_minutes'),
+        'image': Field('thumbnail_small_url'),
+        'availability': Field('weekly_hours', render=_windows),
+        'upcoming_leaves': Field('leaves', prefetch=_upcoming_leaves, render=_leave_dates),
+    }
+    default_fields = ('id', 'name', 'specialization', 'department')
+    filters = {'department': 'dep_name_id'}
+
+
+class AvailabilityResource(Resource):
+    model = DoctorAvailability
+    fields = {
+        'id': Field('id'),
+        'doctor': Field('doctor_id'),
+        'doctor_name': Field('doctor.doc_name', select='doctor'),
+        'day': Field('day'),
+        'start': Field('start_time'),
+        'end': Field('end_time'),
+    }
+    default_fields = ('id', 'doctor', 'day', 'start', 'end')
+    filters = {'doctor': 'doctor_id', 'day': 'day'}
+
+    def get_queryset(self, request):
+        return DoctorAvailability.objects.filter(**tenant_lookup('doctor__'))
+
+
+class LeaveResource(Resource):
+    model = DoctorLeave
+    fields = {
+        'id': Field('id'),
+        'doctor': Field('doctor_id'),
+        'doctor_name': Field('doctor.doc_name', select='doctor'),
+        'date': Field('date'),
+        'reason': Field('reason'),
+    }
+    default_fields = ('id', 'doctor', 'date', 'reason')
+    filters = {'doctor': 'doctor_id', 'date_from': 'date__gte', 'date_to': 'date__lte'}
+
+    def get_queryset(self, request):
+        return DoctorLeave.objects.filter(**tenant_lookup('doctor__'))
+
+
+class BookingResource(Resource):
+    model = Booking
+    fields = {
+        'id': Field('id'),
+        'patient_name': Field('p_name'),
+        'patient_phone': Field('p_phone'),
+        'patient_email': Field('p_email'),
+        'doctor': Field('doc_name_id'),
+        'doctor_name': Field('doc_name.doc_name', select='doc_name'),
+        'department': Field('doc_name.dep_name_id', select='doc_name'),
+        'department_name': Field('doc_name.dep_name.dep_name', select='doc_name__dep_name'),
+        'date': Field('booking_date'),
+        'time': Field('appointment_time'),
+        # date and time are wall-clock at the clinic, starts_at is the same moment in UTC
+        'starts_at': Field('starts_at'),
+        'status': Field('status'),
+        'created_at': Field('created_at'),
+        'updated_at': Field('updated_at'),
+    }
+    default_fields = ('id', 'doctor', 'date', 'time', 'status')
+    filters = {
+        'status': 'status',
+        'doctor': 'doc_name_id',
+        'date_from': 'booking_date__gte',
+        'date_to': 'booking_date__lte',
+    }
+
+    def get_queryset(self, request):
+        """Superusers see every booking, doctors their own patients', patients their own"""
+        bookings = Booking.objects.all()
+        if request.user.is_superuser:
+            return bookings
+        if request.doctor_id:
+            return bookings.filter(doc_name_id=request.doctor_id)
+        return bookings.filter(user=request.user)
+
+
+def encode_cursor(last_id):
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        return int(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ApiError('Invalid cursor')
+
+
+def parse_ids(value):
+    try:
+        ids = sorted({int(part) for part in value.split(',') if part.strip()})
+    except ValueError:
+        raise ApiError('ids must be a comma-separated list of integers')
+    if len(ids) > MAX_BATCH_IDS:
+        raise ApiError(f'At most {MAX_BATCH_IDS} ids per request')
+    return ids
+
+
+def list_page(resource, request):
+    """Results for ?ids= (a batch read) or one keyset page ordered by id"""
+    params = request.GET
+    names = resource.parse_fields(params.get('fields'))
+    queryset = resource.filter(resource.get_queryset(request), params)
+
+    if 'ids' in params:
+        ids = parse_ids(params['ids'])
+        objects = resource.shape(queryset.filter(pk__in=ids), names).order_by('id')
+        results = [resource.serialize(obj, names) for obj in objects]
+        found = {obj.pk for obj in objects}
+        return {'results': results, 'missing': [pk for pk in ids if pk not in found]}
+
+    try:
+        limit = min(max(int(params.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        raise ApiError('limit must be an integer')
+    if params.get('cursor'):
+        queryset = queryset.filter(pk__gt=decode_cursor(params['cursor']))
+
+    # One extra row tells us whether there is a next page without a COUNT
+    objects = list(resource.shape(queryset, names).order_by('id')[:limit + 1])
+    has_next = len(objects) > limit
+    objects = objects[:limit]
+    return {
+        'results': [resource.serialize(obj, names) for obj in objects],
+        'next_cursor': encode_cursor(objects[-1].pk) if has_next else None,
+    }
+
+
+def detail(resource, request, pk):
+    names = resource.parse_fields(request.GET.get('fields'))
+    obj = resource.shape(resource.get_queryset(request), names).filter(pk=pk).first()
+    if obj is None:
+        raise ApiError('Not found', status=404)
+    return resource.serialize(obj, names)
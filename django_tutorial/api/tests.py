@@ -0,0 +1,149 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from bookings.models import Booking
+from doctors.models import Departments, DoctorAvailability, DoctorLeave, Doctors
+from .resources import MAX_BATCH_IDS, encode_cursor
+
+BOOKINGS = '/api/v1/bookings/'
+DOCTORS = '/api/v1/doctors/'
+
+
+class ApiTestCase(TestCase):
+    """Patients and a doctor sharing a department, with a few bookings each"""
+
+    @classmethod
+    def setUpTestData(cls):
+        department = Departments.objects.create(dep_name='Cardiology', dep_decription='Heart')
+        cls.doctor_user = User.objects.create_user('dr-asha')
+        cls.doctor = Doctors.objects.create(
+            doc_name='Asha Menon', doc_spec='Cardiologist', dep_name=department, user=cls.doctor_user,
+        )
+        DoctorAvailability.objects.create(doctor=cls.doctor, day=0, start_time=datetime.time(9), end_time=datetime.time(17))
+        DoctorLeave.objects.create(doctor=cls.doctor, date=datetime.date.today() + datetime.timedelta(days=3))
+        cls.patient = User.objects.create_user('patient')
+        cls.other_patient = User.objects.create_user('other-patient')
+        date = datetime.date.today() + datetime.timedelta(days=7)
+        cls.bookings = [
+            Booking.objects.create(
+                user=user, p_name=user.username, p_phone='9876543210', p_email=f'{user.username}@example.com',
+                doc_name=cls.doctor, booking_date=date, appointment_time=datetime.time(9 + i),
+            )
+            for i, user in enumerate([cls.patient] * 5 + [cls.other_patient])
+        ]
+        cls.own_ids = [booking.id for booking in cls.bookings[:5]]
+
+    def login(self, user):
+        self.client.force_login(user)
+        # Resolves the tenant and the session role, both cached from here on
+        self.client.get(DOCTORS)
+
+    def get_json(self, url, status=200, queries=None, **params):
+        if queries is None:
+            response = self.client.get(url, params)
+        else:
+            with self.assertNumQueries(queries):
+                response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status, response.content)
+        return response.json()
+
+
+class AuthenticationTests(ApiTestCase):
+    def test_signed_out_requests_get_401(self):
+        for url in (BOOKINGS, f'{BOOKINGS}{self.own_ids[0]}/', DOCTORS):
+            self.assertEqual(self.get_json(url, status=401), {'error': 'Authentication required'})
+        response = self.client.post(f'{BOOKINGS}{self.own_ids[0]}/cancel/')
+        self.assertEqual(response.status_code, 401)
+
+    def test_doctors_cannot_book(self):
+        self.login(self.doctor_user)
+        response = self.client.post(BOOKINGS, {}, content_type='application/json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_patients_cannot_set_a_status(self):
+        self.login(self.patient)
+        response = self.client.post(f'{BOOKINGS}{self.own_ids[0]}/status/', {'status': 'accepted'}, content_type='application/json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_only_the_patient_can_cancel(self):
+        self.login(self.doctor_user)
+        response = self.client.post(f'{BOOKINGS}{self.own_ids[0]}/cancel/')
+        self.assertEqual(response.status_code, 403)
+
+    def test_other_patients_bookings_are_not_found(self):
+        self.login(self.patient)
+        self.get_json(f'{BOOKINGS}{self.bookings[-1].id}/', status=404)
+
+
+class FieldSelectionTests(ApiTestCase):
+    def setUp(self):
+        self.login(self.patient)
+
+    def test_default_fields(self):
+        # The session user and the page
+        page = self.get_json(BOOKINGS, queries=2)
+        self.assertEqual(set(page['results'][0]), {'id', 'doctor', 'date', 'time', 'status'})
+
+    def test_related_fields_are_joined(self):
+        page = self.get_json(BOOKINGS, queries=2, fields='id,doctor_name,department_name')
+        self.assertEqual(page['results'][0], {'id': self.own_ids[0], 'doctor_name': 'Asha Menon', 'department_name': 'Cardiology'})
+
+    def test_prefetched_fields_cost_one_query_each(self):
+        # The session user, the page and the upcoming leave of every doctor on it
+        page = self.get_json(DOCTORS, queries=3, fields='id,availability,upcoming_leaves')
+        doctor = page['results'][0]
+        self.assertEqual(doctor['availability'], [{'day': 0, 'start': '09:00:00', 'end': '17:00:00'}])
+        self.assertEqual(len(doctor['upcoming_leaves']), 1)
+
+    def test_unknown_fields_are_rejected(self):
+        error = self.get_json(BOOKINGS, status=400, fields='id,nope')['error']
+        self.assertIn('nope', error)
+
+
+class PagingTests(ApiTestCase):
+    def setUp(self):
+        self.login(self.patient)
+
+    def test_cursor_walks_every_page(self):
+        seen = []
+        params = {'limit': 2}
+        while True:
+            page = self.get_json(BOOKINGS, queries=2, **params)
+            seen += [booking['id'] for booking in page['results']]
+            if page['next_cursor'] is None:
+                break
+            params['cursor'] = page['next_cursor']
+        self.assertEqual(seen, self.own_ids)
+
+    def test_last_full_page_has_no_cursor(self):
+        page = self.get_json(BOOKINGS, limit=5)
+        self.assertEqual(len(page['results']), 5)
+        self.assertIsNone(page['next_cursor'])
+
+    def test_cursor_continues_after_its_id(self):
+        page = self.get_json(BOOKINGS, cursor=encode_cursor(self.own_ids[2]))
+        self.assertEqual([booking['id'] for booking in page['results']], self.own_ids[3:])
+
+    def test_invalid_paging_parameters(self):
+        self.assertEqual(self.get_json(BOOKINGS, status=400, cursor='!!')['error'], 'Invalid cursor')
+        self.get_json(BOOKINGS, status=400, limit='ten')
+
+
+class BatchReadTests(ApiTestCase):
+    def setUp(self):
+        self.login(self.patient)
+
+    def test_ids_in_one_query(self):
+        hidden = self.bookings[-1].id
+        ids = f'{self.own_ids[3]},{self.own_ids[0]},{hidden},999999'
+        data = self.get_json(BOOKINGS, queries=2, ids=ids, fields='id,doctor_name')
+        self.assertEqual([booking['id'] for booking in data['results']], [self.own_ids[0], self.own_ids[3]])
+        # Another patient's booking is reported missing, not leaked
+        self.assertEqual(data['missing'], [hidden, 999999])
+
+    def test_invalid_ids(self):
+        self.get_json(BOOKINGS, status=400, ids='1,x')
+        too_many = ','.join(str(pk) for pk in range(1, MAX_BATCH_IDS + 2))
+        self.get_json(BOOKINGS, status=400, ids=too_many)
@@ -0,0 +1,17 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('v1/departments/', views.department_list, name='api_department_list'),
+    path('v1/departments/<int:pk>/', views.department_detail, name='api_department_detail'),
+    path('v1/doctors/', views.doctor_list, name='api_doctor_list'),
+    path('v1/doctors/<int:pk>/', views.doctor_detail, name='api_doctor_detail'),
+    path('v1/availability/', views.availability_list, name='api_availability_list'),
+    path('v1/availability/<int:pk>/', views.availability_detail, name='api_availability_detail'),
+    path('v1/leaves/', views.leave_list, name='api_leave_list'),
+    path('v1/leaves/<int:pk>/', views.leave_detail, name='api_leave_detail'),
+    path('v1/bookings/', views.booking_list, name='api_booking_list'),
+    path('v1/bookings/<int:pk>/', views.booking_detail, name='api_booking_detail'),
+    path('v1/bookings/<int:pk>/cancel/', views.cancel_booking, name='api_cancel_booking'),
+    path('v1/bookings/<int:pk>/status/', views.booking_status, name='api_booking_status'),
+]
@@ -0,0 +1,154 @@
+import json
+from functools import wraps
+
+from django.http import JsonResponse
+from django.views.decorators.http import require_http_methods
+
+from bookings.forms import BookingForm
+from bookings.idempotency import create_once, find_replay, valid_key
+from core.ratelimit import rate_limit
+from .resources import (
+    ApiError, AvailabilityResource, BookingResource, DepartmentResource, DoctorResource,
+    LeaveResource, detail, list_page,
+)
+
+# API field names -> BookingForm fields
+BOOKING_INPUT = {
+    'patient_name': 'p_name',
+    'patient_phone': 'p_phone',
+    'patient_email': 'p_email',
+    'doctor': 'doc_name',
+    'date': 'booking_date',
+    'time': 'appointment_time',
+}
+FORM_TO_API = {form_field: api_field for api_field, form_field in BOOKING_INPUT.items()}
+
+CANCELLABLE_STATUSES = ('pending', 'accepted')
+DOCTOR_STATUSES = ('accepted', 'rejected', 'completed')
+
+
+def api_view(*methods):
+    """Session-authenticated JSON endpoint: 401 when signed out, ApiError -> JSON error"""
+    def decorator(view_func):
+        @rate_limit('api', json=True)
+        @require_http_methods(list(methods))
+        @wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            if not request.user.is_authenticated:
+                return JsonResponse({'error': 'Authentication required'}, status=401)
+            try:
+                return view_func(request, *args, **kwargs)
+            except ApiError as e:
+                return JsonResponse({'error': e.message}, status=e.status)
+        return wrapped
+    return decorator
+
+
+def _json_body(request):
+    try:
+        data = json.loads(request.body or b'{}')
+    except (ValueError, UnicodeDecodeError):
+        raise ApiError('Request body must be JSON')
+    if not isinstance(data, dict):
+        raise ApiError('Request body must be a JSON object')
+    return data
+
+
+def _resource_views(resource):
+    @api_view('GET')
+    def list_view(request):
+        return JsonResponse(list_page(resource, request))
+
+    @api_view('GET')
+    def detail_view(request, pk):
+        return JsonResponse(detail(resource, request, pk))
+
+    return list_view, detail_view
+
+
+department_list, department_detail = _resource_views(DepartmentResource())
+doctor_list, doctor_detail = _resource_views(DoctorResource())
+availability_list, availability_detail = _resource_views(AvailabilityResource())
+leave_list, leave_detail = _resource_views(LeaveResource())
+
+bookings = BookingResource()
+booking_detail = _resource_views(bookings)[1]
+
+
+@api_view('GET', 'POST')
+def booking_list(request):
+    """GET lists the caller's bookings; POST books an appointment for a patient"""
+    if request.method == 'GET':
+        return JsonResponse(list_page(bookings, request))
+
+    if request.is_privileged:
+        raise ApiError('Only patients can book appointments', status=403)
+    key = request.headers.get('Idempotency-Key', '')
+    if key and not valid_key(key):
+        raise ApiError('Idempotency-Key must be at most 64 printable characters')
+    if key:
+        existing = find_replay(request.user, key)
+        if existing:
+            return _replay(existing)
+
+    data = _json_body(request)
+    form = BookingForm({form_field: data.get(api_field) for api_field, form_field in BOOKING_INPUT.items()})
+    if not form.is_valid():
+        errors = {FORM_TO_API.get(field, field): messages for field, messages in form.errors.items()}
+        return JsonResponse({'error': 'Invalid booking', 'errors': errors}, status=400)
+
+    names = bookings.parse_fields(request.GET.get('fields'))
+
+    def create():
+        booking = form.save(commit=False)
+        booking.user = request.user
+        booking.save()
+        return booking
+
+    if not key:
+        return JsonResponse(bookings.serialize(create(), names), status=201)
+    record, replayed = create_once(request.user, key, create, render=lambda booking: bookings.serialize(booking, names))
+    if replayed:
+        return _replay(record)
+    return JsonResponse(record.response, status=201)
+
+
+def _replay(record):
+    """The stored response of the first request with this Idempotency-Key"""
+    response = JsonResponse(record.response or {'id': record.booking_id}, status=201)
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _own_booking(request, pk):
+    booking = bookings.get_queryset(request).filter(pk=pk).first()
+    if booking is None:
+        raise ApiError('Not found', status=404)
+    return booking
+
+
+@api_view('POST')
+def cancel_booking(request, pk):
+    """Patients cancel their own pending or accepted bookings"""
+    booking = _own_booking(request, pk)
+    if booking.user_id != request.user.id:
+        raise ApiError('Only the patient can cancel a booking', status=403)
+    if booking.status not in CANCELLABLE_STATUSES:
+        raise ApiError(f'Cannot cancel a {booking.get_status_display().lower()} booking', status=409)
+    booking.status = 'cancelled'
+    booking.save()
+    return JsonResponse(bookings.serialize(booking, bookings.default_fields))
+
+
+@api_view('POST')
+def booking_status(request, pk):
+    """Doctors accept, reject or complete their own patients' bookings"""
+    if not request.doctor_id:
+        raise ApiError('Only doctors can change a booking status', status=403)
+    booking = _own_booking(request, pk)
+    status = _json_body(request).get('status')
+    if status not in DOCTOR_STATUSES:
+        raise ApiError(f"status must be one of {', '.join(DOCTOR_STATUSES)}")
+    booking.status = status
+    booking.save()
+    return JsonResponse(bookings.serialize(booking, bookings.default_fields))
@@ -1,4 +1,6 @@
 from django.contrib import admin
-from .models import Booking
+from .models import Booking, BookingEvent, WaitlistEntry
 
 admin.site.register(Booking)
+admin.site.register(WaitlistEntry)
+admin.site.register(BookingEvent)
@@ -0,0 +1,50 @@
+from .events import events_between, latest_event_id
+from .models import Booking
+
+
+def _serialize(row):
+    time = row['appointment_time']
+    return {
+        'id': row['id'],
+        'patient': row['p_name'],
+        'phone': row['p_phone'],
+        'time': time.strftime('%H:%M') if time else None,
+        'time_display': time.strftime('%I:%M %p') if time else 'Not Set',
+        'status': row['status'],
+        'status_display': dict(Booking.STATUS_CHOICES).get(row['status'], row['status']),
+    }
+
+
+def day_board(doctor_id, date, since=None):
+    """A doctor's bookings for `date` in appointment order, or only those changed since `since`.
+
+    The version is the latest BookingEvent id, read before the rows like the
+    rollup cursor, so a write committing during the read is picked up by the
+    next poll rather than missed. A delta reads the events on this doctor and day
+    after `since`; their bookings that are still there are returned, the rest
+    (deleted or moved away) are listed in `deleted` so clients can drop them.
+    A `since` ahead of the log, e.g. a timestamp version from before events were
+    used, gets the full board.
+    """
+    version = latest_event_id()
+    if since is not None and since > version:
+        since = None
+    bookings = Booking.objects.filter(doc_name_id=doctor_id, booking_date=date)
+    changed = set()
+    if since is not None:
+        changed = set(
+            events_between(since, version).filter(doctor_id=doctor_id, booking_date=date)
+            .values_list('booking_ref', flat=True)
+        )
+        bookings = bookings.filter(id__in=changed)
+    rows = list(
+        bookings.order_by('appointment_time', 'id')
+        .values('id', 'p_name', 'p_phone', 'appointment_time', 'status')
+    )
+    return {
+        'date': date.isoformat(),
+        'version': version,
+        'full': since is None,
+        'bookings': [_serialize(row) for row in rows],
+        'deleted': sorted(changed - {row['id'] for row in rows}),
+    }
@@ -0,0 +1,95 @@
+from collections import defaultdict
+
+from django.db.models import Count
+
+from doctors.models import DoctorLeave, Doctors
+from .models import Booking
+from .slots import INACTIVE_STATUSES, interval_slots
+
+
+def weekday_counts(start, end):
+    """How many Mondays..Sundays fall in [start, end] (none when end is before start)"""
+    full_weeks, rest = divmod(max(0, (end - start).days + 1), 7)
+    counts = [full_weeks] * 7
+    for i in range(rest):
+        counts[(start.weekday() + i) % 7] += 1
+    return counts
+
+
+def _rate(part, whole):
+    return round(100 * part / whole, 1) if whole else 0.0
+
+
+def capacity_report(start, end, doctors=None):
+    """Offered vs booked slot-minutes per doctor and department for [start, end].
+
+    Offered minutes come from each doctor's stored weekly hours multiplied by how often
+    each weekday occurs in the range, minus the window minutes of every leave day, so the
+    cost is three queries plus O(doctors x 7 + leave days) arithmetic whatever the range length.
+    """
+    doctors = (doctors if doctors is not None else Doctors.objects.all()).values(
+        'id', 'doc_name', 'slot_minutes', 'dep_name_id', 'dep_name__dep_name', 'weekly_hours',
+    )
+    doctors = {row['id']: row for row in doctors}
+
+    # Offered slot-minutes per doctor per weekday
+    weekly = defaultdict(lambda: [0] * 7)
+    for doctor_id, doctor in doctors.items():
+        step = doctor['slot_minutes']
+        for day, intervals in enumerate(doctor['weekly_hours']):
+            weekly[doctor_id][day] = sum(len(interval_slots(start, end, step)) for start, end in intervals) * step
+
+    counts = weekday_counts(start, end)
+    offered = {doctor_id: sum(m * c for m, c in zip(weekly[doctor_id], counts)) for doctor_id in doctors}
+    leave_days = (
+        DoctorLeave.objects.filter(doctor_id__in=doctors, date__range=(start, end))
+        .values_list('doctor_id', 'date').distinct()
+    )
+    for doctor_id, date in leave_days:
+        offered[doctor_id] -= weekly[doctor_id][date.weekday()]
+
+    booked_counts = dict(
+        Booking.objects.filter(doc_name_id__in=doctors, booking_date__range=(start, end))
+        .exclude(status__in=INACTIVE_STATUSES)
+        .values('doc_name_id').annotate(total=Count('id')).order_by()
+        .values_list('doc_name_id', 'total')
+    )
+
+    doctor_rows = []
+    departments = {}
+    for doctor_id, doctor in sorted(doctors.items(), key=lambda item: item[1]['doc_name']):
+        booked = booked_counts.get(doctor_id, 0) * doctor['slot_minutes']
+        doctor_rows.append({
+            'doctor_id': doctor_id,
+            'doctor_name': doctor['doc_name'],
+            'department': doctor['dep_name__dep_name'],
+            'offered_minutes': offered[doctor_id],
+            'booked_minutes': booked,
+            'utilization': _rate(booked, offered[doctor_id]),
+        })
+        department = departments.setdefault(doctor['dep_name_id'], {
+            'department_id': doctor['dep_name_id'],
+            'department': doctor['dep_name__dep_name'],
+            'offered_minutes': 0,
+            'booked_minutes': 0,
+        })
+        department['offered_minutes'] += offered[doctor_id]
+        department['booked_minutes'] += booked
+
+    department_rows = sorted(departments.values(), key=lambda row: row['department'] or '')
+    for row in department_rows:
+        row['utilization'] = _rate(row['booked_minutes'], row['offered_minutes'])
+
+    offered_total = sum(row['offered_minutes'] for row in doctor_rows)
+    booked_total = sum(row['booked_minutes'] for row in doctor_rows)
+    return {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'doctors': doctor_rows,
+        'departments': department_rows,
+        'totals': {
+            'offered_minutes': offered_total,
+            'booked_minutes': booked_total,
+            'utilization': _rate(booked_total, offered_total),
+        },
+    }
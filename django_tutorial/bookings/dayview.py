@@ -0,0 +1,152 @@
+import time
+import zoneinfo
+
+from django.core.cache import cache
+from django.db.models import OuterRef, Subquery
+
+from core.tenancy import current_tenant_id
+from doctors.models import DoctorLeave, Doctors
+from .models import Booking
+from .slots import INACTIVE_STATUSES, from_minutes, interval_slots, slot_instants, slot_state, to_minutes
+
+DAY_VIEW_TIMEOUT = 60 * 60
+
+
+# Department ids repeat across tenants with their own database, so every key carries the tenant
+
+def _version_key(department_id, tenant_id=None):
+    return f'day-view-version:{tenant_id or current_tenant_id()}:{department_id}'
+
+
+def _version(department_id, tenant_id):
+    return cache.get_or_set(_version_key(department_id, tenant_id), time.time_ns, None)
+
+
+# A cached day is a roster (the department's doctor ids in display order) plus one
+# row per doctor under its own key, so a booking only ever drops its doctor's row
+
+def _roster_key(department_id, date, tenant_id, version):
+    return f'day-view:{tenant_id}:{department_id}:{date.isoformat()}:{version}'
+
+
+def _row_key(doctor_id, date, tenant_id, version):
+    return f'day-view-row:{tenant_id}:{doctor_id}:{date.isoformat()}:{version}'
+
+
+def _load(date, department_id=None, doctor_ids=None):
+    """Fetch doctors (with leave and weekly hours) and the day's bookings in 2 queries"""
+    if doctor_ids is not None:
+        doctor_q, booking_q = {'pk__in': doctor_ids}, {'doc_name_id__in': doctor_ids}
+    else:
+        doctor_q = {'dep_name_id': department_id}
+        booking_q = {'doc_name__dep_name_id': department_id}
+
+    leave = DoctorLeave.objects.filter(doctor=OuterRef('pk'), date=date)
+    doctors = list(
+        Doctors.objects.filter(**doctor_q)
+        .annotate(leave_reason=Subquery(leave.values('reason')[:1]))
+        .order_by('doc_name')
+        .values('id', 'doc_name', 'doc_spec', 'slot_minutes', 'buffer_minutes', 'leave_reason', 'dep_name__timezone', 'weekly_hours')
+    )
+    bookings = (
+        Booking.objects.filter(booking_date=date, appointment_time__isnull=False, **booking_q)
+        .exclude(status__in=INACTIVE_STATUSES)
+        .values_list('doc_name_id', 'appointment_time', 'id', 'p_name', 'status')
+    )
+    return doctors, bookings
+
+
+def _build_rows(date, doctors, bookings):
+    """Merge the two result sets into one timeline row per doctor.
+
+    Each slot carries its UTC instant, converted once per grid build for the
+    whole day; wall-clock times the clocks skip are left out.
+    """
+    bookings_by_doctor = {}
+    for doctor_id, time, booking_id, patient, status in bookings:
+        bookings_by_doctor.setdefault(doctor_id, {})[to_minutes(time)] = (booking_id, patient, status)
+    booked_minutes = {doctor_id: sorted(booked) for doctor_id, booked in bookings_by_doctor.items()}
+
+    rows = []
+    for doctor in doctors:
+        on_leave = doctor['leave_reason'] is not None
+        booked = bookings_by_doctor.get(doctor['id'], {})
+        sorted_booked = booked_minutes.get(doctor['id'], [])
+        minutes = sorted({
+            m for start, end in doctor['weekly_hours'][date.weekday()]
+            for m in interval_slots(start, end, doctor['slot_minutes'])
+        })
+        instants = slot_instants(date, minutes, zoneinfo.ZoneInfo(doctor['dep_name__timezone']))
+        slots = []
+        for minute in minutes:
+            if minute not in instants:
+                continue
+            slot = {'time': from_minutes(minute).strftime('%H:%M'), 'starts_at': instants[minute]}
+            if on_leave:
+                slot['state'] = 'leave'
+            else:
+                slot['state'] = slot_state(minute, sorted_booked, doctor['buffer_minutes'])
+            if minute in booked:
+                slot['booking_id'], slot['patient'], slot['status'] = booked[minute]
+            slots.append(slot)
+        rows.append({
+            'doctor_id': doctor['id'],
+            'doctor_name': doctor['doc_name'],
+            'doctor_spec': doctor['doc_spec'],
+            'slot_minutes': doctor['slot_minutes'],
+            'on_leave': on_leave,
+            'leave_reason': doctor['leave_reason'] or '',
+            'slots': slots,
+        })
+    return rows
+
+
+def _cache_rows(rows, date, tenant_id, version):
+    cache.set_many(
+        {_row_key(row['doctor_id'], date, tenant_id, version): row for row in rows},
+        DAY_VIEW_TIMEOUT,
+    )
+
+
+def get_day_view(department_id, date):
+    """Slot grid (booked/blocked/free/leave) for every doctor of a department on one date.
+
+    A cold day costs 2 queries; after a booking change only the dropped rows are
+    rebuilt, again in 2 queries.
+    """
+    tenant_id = current_tenant_id()
+    version = _version(department_id, tenant_id)
+    roster_key = _roster_key(department_id, date, tenant_id, version)
+    roster = cache.get(roster_key)
+    if roster is None:
+        rows = _build_rows(date, *_load(date, department_id=department_id))
+        _cache_rows(rows, date, tenant_id, version)
+        cache.set(roster_key, [row['doctor_id'] for row in rows], DAY_VIEW_TIMEOUT)
+    else:
+        keys = {doctor_id: _row_key(doctor_id, date, tenant_id, version) for doctor_id in roster}
+        cached = cache.get_many(keys.values())
+        missing = [doctor_id for doctor_id, key in keys.items() if key not in cached]
+        if missing:
+            fresh = _build_rows(date, *_load(date, doctor_ids=missing))
+            _cache_rows(fresh, date, tenant_id, version)
+            cached.update((keys[row['doctor_id']], row) for row in fresh)
+        rows = [cached[key] for key in keys.values() if key in cached]
+    return {'department_id': department_id, 'date': date.isoformat(), 'doctors': rows}
+
+
+def invalidate_doctor_day(doctor_id, date, tenant_id=None):
+    """Drop one doctor's cached row for `date` after a booking change.
+
+    A delete rather than an in-place patch, so concurrent changes for other
+    doctors (or this one) cannot overwrite each other with a stale grid.
+    """
+    department_id = Doctors.objects.filter(pk=doctor_id).values_list('dep_name_id', flat=True).first()
+    if department_id is None:
+        return
+    tenant_id = tenant_id or current_tenant_id()
+    cache.delete(_row_key(doctor_id, date, tenant_id, _version(department_id, tenant_id)))
+
+
+def invalidate_department(department_id, tenant_id=None):
+    """Drop every cached day of a department (schedule, leave or roster changed)"""
+    cache.set(_version_key(department_id, tenant_id), time.time_ns(), None)
@@ -0,0 +1,21 @@
+from django.db.models import Max
+
+from .models import BookingEvent, SyncCursor
+
+
+def latest_event_id():
+    return BookingEvent.objects.aggregate(latest=Max('id'))['latest'] or 0
+
+
+def get_cursor(name):
+    """Position of consumer `name`, or None if it has never run"""
+    return SyncCursor.objects.filter(name=name).values_list('position', flat=True).first()
+
+
+def set_cursor(name, position):
+    SyncCursor.objects.update_or_create(name=name, defaults={'position': position})
+
+
+def events_between(after, upto):
+    """Events with after < id <= upto, oldest first"""
+    return BookingEvent.objects.filter(id__gt=after, id__lte=upto)
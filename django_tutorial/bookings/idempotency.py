@@ -0,0 +1,59 @@
+import datetime
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from core.tenancy import tenant_lookup
+from .models import IdempotencyKey
+
+# How long a submission can be replayed for
+KEY_TTL = datetime.timedelta(hours=getattr(settings, 'IDEMPOTENCY_KEY_TTL_HOURS', 24))
+MAX_KEY_LENGTH = IdempotencyKey._meta.get_field('key').max_length
+
+
+def valid_key(key):
+    return bool(key) and len(key) <= MAX_KEY_LENGTH and key.isprintable()
+
+
+def find_replay(user, key, now=None):
+    """The IdempotencyKey an earlier submission stored, or None.
+
+    Reads only the key table. An expired key is dropped so it can be reused.
+    """
+    now = now or timezone.now()
+    record = IdempotencyKey.objects.filter(user=user, key=key).first()
+    if record is None:
+        return None
+    if record.created_at < now - KEY_TTL:
+        record.delete()
+        return None
+    return record
+
+
+def create_once(user, key, create, render=None):
+    """Run create() and store its booking (and render(booking), if given) under `key`.
+
+    Both rows are written in one transaction. Returns (record, replayed); when a
+    concurrent request with the same key commits first, the unique constraint
+    rolls this one back and that request's record is returned instead.
+    """
+    try:
+        with transaction.atomic():
+            booking = create()
+            record = IdempotencyKey.objects.create(
+                user=user, key=key, booking=booking, response=render(booking) if render else None,
+            )
+        return record, False
+    except IntegrityError:
+        record = find_replay(user, key)
+        if record is None:
+            raise
+        return record, True
+
+
+def purge_expired_keys(now=None):
+    """Delete the active tenant's keys past their TTL, returns how many were deleted"""
+    now = now or timezone.now()
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=now - KEY_TTL, **tenant_lookup('booking__')).delete()
+    return deleted
@@ -0,0 +1,84 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+
+from core.pubsub import get_broker
+from core.tenancy import current_tenant_id, get_current_tenant, tenant_context
+from .models import Booking
+from .slots import INACTIVE_STATUSES
+
+# Comment line sent when nothing happened, keeps proxies from closing the stream
+KEEPALIVE_SECONDS = 15
+# Streams end after this long and the browser reconnects, so a tab that went away
+# without the server noticing cannot hold a subscription forever
+STREAM_SECONDS = 300
+RETRY_MS = 3000
+
+
+def slot_channel(doctor_id, date, tenant_id=None):
+    # Doctor ids repeat across tenants with their own database
+    return f'slots:{tenant_id or current_tenant_id()}:{doctor_id}:{date.isoformat()}'
+
+
+def booked_times(doctor_id, date):
+    times = (
+        Booking.objects.filter(doc_name_id=doctor_id, booking_date=date, appointment_time__isnull=False)
+        .exclude(status__in=INACTIVE_STATUSES)
+        .order_by('appointment_time')
+        .values_list('appointment_time', flat=True)
+    )
+    return [t.strftime('%H:%M') for t in times]
+
+
+def slot_message(doctor_id, date):
+    return {
+        'doctor_id': doctor_id,
+        'date': date.isoformat(),
+        'booked_times': booked_times(doctor_id, date),
+    }
+
+
+def publish_slot_change(doctor_id, date, tenant_id=None):
+    """Push the current booked times of a doctor's day to every page watching it"""
+    broker = get_broker()
+    channel = slot_channel(doctor_id, date, tenant_id)
+    # The query runs once per change, and not at all when nobody is watching
+    if not broker.has_subscribers(channel):
+        return 0
+    return broker.publish(channel, slot_message(doctor_id, date))
+
+
+def _event(name, data):
+    return f'event: {name}\ndata: {json.dumps(data)}\n\n'
+
+
+def slot_event_stream(doctor_id, date):
+    """Server-Sent Events for one (doctor, date), as an async iterator of strings.
+
+    The first event is the day's current booked times, read after subscribing, so
+    a booking made before the page connected (or while it reconnected) is not missed.
+    """
+    # Resolved now: the stream is iterated after the tenant middleware has returned
+    tenant = get_current_tenant()
+    return _stream(slot_channel(doctor_id, date), tenant, doctor_id, date)
+
+
+def _snapshot(tenant, doctor_id, date):
+    with tenant_context(tenant):
+        return slot_message(doctor_id, date)
+
+
+async def _stream(channel, tenant, doctor_id, date):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + STREAM_SECONDS
+    async with get_broker().subscribe(channel) as messages:
+        yield f'retry: {RETRY_MS}\n\n'
+        yield _event('slots', await sync_to_async(_snapshot)(tenant, doctor_id, date))
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                message = await asyncio.wait_for(messages.get(), timeout=min(KEEPALIVE_SECONDS, remaining))
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield _event('slots', message)
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from bookings.waitlist import expire_lapsed_holds
+from core.tenancy import each_tenant
+
+
+class Command(BaseCommand):
+    help = 'Expire lapsed waitlist holds so their slots cascade to the next waiting patient (run every few minutes)'
+
+    def handle(self, *args, **options):
+        # Per tenant, so each one's database, caches and live pages are the ones updated
+        count = sum(expire_lapsed_holds() for _ in each_tenant())
+        self.stdout.write(self.style.SUCCESS(f'Expired {count} waitlist hold(s).'))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from bookings.idempotency import purge_expired_keys
+from core.tenancy import each_tenant
+
+
+class Command(BaseCommand):
+    help = 'Delete booking idempotency keys older than IDEMPOTENCY_KEY_TTL_HOURS (run daily)'
+
+    def handle(self, *args, **options):
+        count = sum(purge_expired_keys() for _ in each_tenant())
+        self.stdout.write(self.style.SUCCESS(f'Deleted {count} expired idempotency key(s).'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from bookings.rollups import run_rollup
+from core.tenancy import each_tenant
+
+
+class Command(BaseCommand):
+    help = 'Update the daily booking rollups used by the analytics page (run nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Rebuild every rollup instead of only days with new booking events')
+
+    def handle(self, *args, **options):
+        for tenant in each_tenant():
+            days, rows = run_rollup(full=options['full'])
+            if days is None:
+                self.stdout.write(self.style.SUCCESS(f'{tenant.name}: rebuilt all rollups ({rows} row(s)).'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{tenant.name}: updated {days} changed day(s) ({rows} row(s)).'))
@@ -0,0 +1,36 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.synthetic import SCALES, SyntheticData
+from core.models import Tenant
+from core.tenancy import DEFAULT_TENANT_SLUG, tenant_context
+
+
+class Command(BaseCommand):
+    help = 'Fill the database with a reproducible synthetic hospital for load and performance testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=list(SCALES), default='small', help='How much data to generate')
+        parser.add_argument('--seed', type=int, default=0, help='Same seed, scale and --today give the same data')
+        parser.add_argument('--today', type=datetime.date.fromisoformat, help='Date bookings are placed around (YYYY-MM-DD), defaults to today')
+        parser.add_argument('--password', default='', help='Password for every synthetic login (hashed once); blank leaves them unusable')
+        parser.add_argument('--tenant', default=DEFAULT_TENANT_SLUG, help='Slug of the hospital to fill')
+
+    def handle(self, *args, **options):
+        tenant = Tenant.objects.filter(slug=options['tenant']).first()
+        if tenant is None:
+            raise CommandError(f'No tenant with slug "{options["tenant"]}".')
+
+        generator = SyntheticData(options['scale'], options['seed'], options['today'], options['password'])
+        with tenant_context(tenant):
+            if generator.already_seeded():
+                raise CommandError(f'Seed {options["seed"]} has already been loaded, pick another --seed.')
+            totals = generator.run()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {totals['departments']} department(s), {totals['doctors']} doctor(s), {totals['users']} login(s), "
+            f"{totals['availabilities']} schedule slot(s), {totals['leaves']} leave day(s), "
+            f"{totals['bookings']} booking(s) and {totals['contacts']} contact message(s)."
+        ))
+        self.stdout.write('Run `manage.py rollup_bookings` to include the new bookings in the analytics.')
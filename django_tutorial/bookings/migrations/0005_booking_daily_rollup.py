@@ -0,0 +1,74 @@
+# Generated by Django 4.2 on 2026-10-19 14:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("doctors", "0006_doctors_slot_settings"),
+        ("bookings", "0004_waitlist"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookingDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("accepted", "Accepted"),
+                            ("rejected", "Rejected"),
+                            ("completed", "Completed"),
+                            ("cancelled", "Cancelled"),
+                            ("held", "Held for you"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("count", models.PositiveIntegerField(default=0)),
+                ("computed_on", models.DateField(auto_now=True)),
+                (
+                    "department",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="booking_rollups",
+                        to="doctors.departments",
+                    ),
+                ),
+                (
+                    "doctor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="booking_rollups",
+                        to="doctors.doctors",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="bookingdailyrollup",
+            index=models.Index(
+                fields=["date", "department"], name="rollup_date_department_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="bookingdailyrollup",
+            constraint=models.UniqueConstraint(
+                fields=("date", "doctor", "status"), name="unique_booking_rollup"
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2 on 2026-10-19 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0005_booking_daily_rollup"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="booking",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["doc_name", "booking_date", "appointment_time"],
+                name="booking_doctor_day_idx",
+            ),
+        ),
+    ]
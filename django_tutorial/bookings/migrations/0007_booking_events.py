@@ -0,0 +1,111 @@
+# Generated by Django 4.2 on 2026-10-19 15:03
+
+import datetime
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def backfill(apps, schema_editor):
+    """Use the old booked_on date as created_at and log one event per existing booking"""
+    Booking = apps.get_model("bookings", "Booking")
+    BookingEvent = apps.get_model("bookings", "BookingEvent")
+    for booking in Booking.objects.only("id", "booked_on").iterator():
+        created_at = datetime.datetime.combine(booking.booked_on, datetime.time(), tzinfo=datetime.timezone.utc)
+        Booking.objects.filter(pk=booking.pk).update(created_at=created_at)
+    BookingEvent.objects.bulk_create(
+        [
+            BookingEvent(
+                booking_id=booking.id,
+                booking_ref=booking.id,
+                doctor_id=booking.doc_name_id,
+                booking_date=booking.booking_date,
+                kind="created",
+                new_status=booking.status,
+            )
+            for booking in Booking.objects.order_by("id").iterator()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("doctors", "0006_doctors_slot_settings"),
+        ("bookings", "0006_booking_updated_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookingEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("booking_ref", models.PositiveBigIntegerField()),
+                ("booking_date", models.DateField()),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("created", "Created"),
+                            ("status_changed", "Status Changed"),
+                            ("deleted", "Deleted"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("old_status", models.CharField(blank=True, max_length=20)),
+                ("new_status", models.CharField(blank=True, max_length=20)),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                "ordering": ["id"],
+            },
+        ),
+        migrations.AddField(
+            model_name="booking",
+            name="created_at",
+            field=models.DateTimeField(
+                auto_now_add=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(fields=["-created_at"], name="booking_created_idx"),
+        ),
+        migrations.AddField(
+            model_name="bookingevent",
+            name="booking",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="events",
+                to="bookings.booking",
+            ),
+        ),
+        migrations.AddField(
+            model_name="bookingevent",
+            name="doctor",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="booking_events",
+                to="doctors.doctors",
+            ),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="booking",
+            name="booked_on",
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2 on 2026-10-19 15:10
+
+import datetime
+import zoneinfo
+
+from django.db import migrations, models
+
+
+def stamp_starts_at(apps, schema_editor):
+    Booking = apps.get_model('bookings', 'Booking')
+    bookings = []
+    for booking in Booking.objects.filter(appointment_time__isnull=False).select_related('doc_name__dep_name').iterator():
+        tz = zoneinfo.ZoneInfo(booking.doc_name.dep_name.timezone)
+        booking.starts_at = datetime.datetime.combine(
+            booking.booking_date, booking.appointment_time, tzinfo=tz,
+        ).astimezone(datetime.timezone.utc)
+        bookings.append(booking)
+    Booking.objects.bulk_update(bookings, ['starts_at'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0009_idempotency_key"),
+        ("doctors", "0007_clinic_timezones"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="booking",
+            name="starts_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["doc_name", "starts_at"], name="booking_doctor_start_idx"
+            ),
+        ),
+        migrations.RunPython(stamp_starts_at, migrations.RunPython.noop),
+    ]
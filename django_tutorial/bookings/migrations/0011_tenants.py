@@ -0,0 +1,44 @@
+# Generated by Django 4.2 on 2026-10-19 15:13
+
+import core.tenancy
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_tenants"),
+        ("bookings", "0010_clinic_timezones"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="booking",
+            name="booking_created_idx",
+        ),
+        migrations.AddField(
+            model_name="booking",
+            name="tenant",
+            field=models.ForeignKey(
+                db_constraint=False,
+                default=core.tenancy.current_tenant_id,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="core.tenant",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["tenant", "-created_at"], name="booking_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["tenant", "status", "booking_date"],
+                name="booking_tenant_status_idx",
+            ),
+        ),
+    ]
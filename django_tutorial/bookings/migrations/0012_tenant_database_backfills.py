@@ -0,0 +1,57 @@
+import datetime
+import zoneinfo
+
+from django.db import migrations
+
+
+def backfill_tenant_database(apps, schema_editor):
+    """Log 'created' events and stamp starts_at for bookings of a tenant database.
+
+    0007 and 0010 did this for 'default' before tenants existed; on tenant
+    databases the router skips them, so it is done here through the alias.
+    """
+    db_alias = schema_editor.connection.alias
+    if db_alias == 'default':
+        return
+    Booking = apps.get_model('bookings', 'Booking')
+    BookingEvent = apps.get_model('bookings', 'BookingEvent')
+    bookings = Booking.objects.using(db_alias)
+
+    logged = BookingEvent.objects.using(db_alias).filter(kind='created').values('booking_ref')
+    BookingEvent.objects.using(db_alias).bulk_create(
+        [
+            BookingEvent(
+                booking_id=booking.id,
+                booking_ref=booking.id,
+                doctor_id=booking.doc_name_id,
+                booking_date=booking.booking_date,
+                kind='created',
+                new_status=booking.status,
+            )
+            for booking in bookings.exclude(id__in=logged).order_by('id').iterator()
+        ],
+        batch_size=500,
+    )
+
+    stamped = []
+    unstamped = bookings.filter(appointment_time__isnull=False, starts_at__isnull=True).select_related('doc_name__dep_name')
+    for booking in unstamped.iterator():
+        tz = zoneinfo.ZoneInfo(booking.doc_name.dep_name.timezone)
+        booking.starts_at = datetime.datetime.combine(
+            booking.booking_date, booking.appointment_time, tzinfo=tz,
+        ).astimezone(datetime.timezone.utc)
+        stamped.append(booking)
+    bookings.bulk_update(stamped, ['starts_at'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0011_tenants"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            backfill_tenant_database, migrations.RunPython.noop, hints={'tenant_databases': True},
+        ),
+    ]
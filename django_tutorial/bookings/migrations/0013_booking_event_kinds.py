@@ -0,0 +1,27 @@
+# Generated by Django 4.2 on 2026-10-19 15:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0012_tenant_database_backfills"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="bookingevent",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("created", "Created"),
+                    ("status_changed", "Status Changed"),
+                    ("updated", "Updated"),
+                    ("moved", "Moved"),
+                    ("deleted", "Deleted"),
+                ],
+                max_length=20,
+            ),
+        ),
+    ]
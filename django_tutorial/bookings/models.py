@@ -1,14 +1,18 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
-from doctors.models import Doctors
+from django.core.serializers.json import DjangoJSONEncoder
+from core.models import TenantModel
+from doctors.models import Departments, Doctors
+from .slots import to_utc
 
-class Booking(models.Model):
+class Booking(TenantModel):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('accepted', 'Accepted'),
         ('rejected', 'Rejected'),
         ('completed', 'Completed'),
         ('cancelled', 'Cancelled'),
+        ('held', 'Held for you'),
     ]
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='bookings')
     p_name = models.CharField(max_length=255)
@@ -17,8 +21,65 @@ class Booking(models.Model):
     doc_name = models.ForeignKey(Doctors, on_delete=models.CASCADE)
     booking_date = models.DateField()
     appointment_time = models.TimeField(null=True, blank=True)
+    # booking_date + appointment_time at the department's timezone as a UTC instant, set on save
+    starts_at = models.DateTimeField(null=True, blank=True, editable=False)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
-    booked_on = models.DateField(auto_now=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped on every save so clients can ask for rows changed since their last poll
+    updated_at = models.DateTimeField(auto_now=True)
+
+    tenant_parent = 'doc_name'
+
+    class Meta:
+        indexes = [
+            # A doctor's queue for one day, in appointment order
+            models.Index(fields=['doc_name', 'booking_date', 'appointment_time'], name='booking_doctor_day_idx'),
+            models.Index(fields=['tenant', '-created_at'], name='booking_created_idx'),
+            models.Index(fields=['tenant', 'status', 'booking_date'], name='booking_tenant_status_idx'),
+            models.Index(fields=['doc_name', 'starts_at'], name='booking_doctor_start_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored status so saves can tell which transition happened
+        instance._loaded_status = instance.__dict__.get('status')
+        instance._loaded_slot = (instance.__dict__.get('booking_date'), instance.__dict__.get('appointment_time'))
+        instance._loaded_day = (instance.__dict__.get('doc_name_id'), instance.__dict__.get('booking_date'))
+        return instance
+
+    def stamp_starts_at(self, tz=None):
+        """Set starts_at from the wall-clock date and time (tz defaults to the doctor's department)"""
+        if self.appointment_time is None:
+            self.starts_at = None
+        else:
+            self.starts_at = to_utc(self.booking_date, self.appointment_time, tz or self.doc_name.dep_name.tzinfo)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        slot = (self.booking_date, self.appointment_time)
+        # Only a new or moved appointment needs the department's timezone loaded
+        if getattr(self, '_loaded_slot', None) != slot and (
+            update_fields is None or {'booking_date', 'appointment_time'} & set(update_fields)
+        ):
+            self.stamp_starts_at()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'starts_at'}
+            self._loaded_slot = slot
+        # The booking row and its events commit together or not at all
+        with transaction.atomic():
+            created = self._state.adding
+            previous = getattr(self, '_loaded_status', None)
+            day = getattr(self, '_loaded_day', None)
+            super().save(*args, **kwargs)
+            if created:
+                BookingEvent.record(self, 'created')
+            else:
+                BookingEvent.record(self, 'updated' if previous == self.status else 'status_changed', previous)
+                if day is not None and day != (self.doc_name_id, self.booking_date):
+                    # Logged against the doctor and day it left, whose consumers would not see it otherwise
+                    BookingEvent.record(self, 'moved', previous, day=day)
+            self._loaded_day = (self.doc_name_id, self.booking_date)
 
     @property
     def formatted_date(self):
@@ -31,8 +92,132 @@ class Booking(models.Model):
         return "Not Set"
 
     @property
-    def formatted_booked_on(self):
-        return self.booked_on.strftime("%b %d")
+    def formatted_created_at(self):
+        return self.created_at.strftime("%b %d")
 
     def __str__(self):
         return f"{self.p_name} - {self.doc_name.doc_name} ({self.status})"
+
+class BookingEvent(models.Model):
+    """Append-only log of every booking write: creations, status changes, other edits and deletions.
+
+    A booking moved to another doctor or day also gets a 'moved' event on the
+    doctor and day it left. Consumers keep the last `id` they processed and
+    read forward from it.
+    """
+    KIND_CHOICES = [
+        ('created', 'Created'),
+        ('status_changed', 'Status Changed'),
+        ('updated', 'Updated'),
+        ('moved', 'Moved'),
+        ('deleted', 'Deleted'),
+    ]
+    # Kept (as NULL) when the booking is deleted, the copied fields still locate it
+    booking = models.ForeignKey(Booking, on_delete=models.SET_NULL, null=True, blank=True, related_name='events')
+    booking_ref = models.PositiveBigIntegerField()
+    doctor = models.ForeignKey(Doctors, on_delete=models.CASCADE, related_name='booking_events')
+    booking_date = models.DateField()
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    old_status = models.CharField(max_length=20, blank=True)
+    new_status = models.CharField(max_length=20, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['id']
+
+    @classmethod
+    def record(cls, booking, kind, old_status=None, day=None):
+        """Log `kind` for the booking's doctor and date, or for `day`, a (doctor id, date) pair"""
+        doctor_id, booking_date = day or (booking.doc_name_id, booking.booking_date)
+        return cls.objects.create(
+            booking=None if kind == 'deleted' else booking,
+            booking_ref=booking.pk,
+            doctor_id=doctor_id,
+            booking_date=booking_date,
+            kind=kind,
+            old_status=old_status or '',
+            new_status='' if kind == 'deleted' else booking.status,
+        )
+
+    def __str__(self):
+        return f"#{self.booking_ref} {self.kind} ({self.old_status or '-'} -> {self.new_status or '-'})"
+
+class SyncCursor(models.Model):
+    """Last BookingEvent id a downstream consumer (rollups, exports, ...) has processed"""
+    name = models.CharField(max_length=50, unique=True)
+    position = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.position}"
+
+class IdempotencyKey(models.Model):
+    """Client-chosen key of a booking submission, so a replayed POST returns the original booking"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='idempotency_keys')
+    key = models.CharField(max_length=64)
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name='+')
+    # API response body sent the first time, replayed as-is
+    response = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.key} -> #{self.booking_id}"
+
+class WaitlistEntry(models.Model):
+    """A patient waiting for any freed slot with a doctor within a date range"""
+    STATUS_CHOICES = [
+        ('waiting', 'Waiting'),
+        ('offered', 'Slot Offered'),
+        ('booked', 'Booked'),
+        ('expired', 'Offer Expired'),
+        ('cancelled', 'Cancelled'),
+    ]
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='waitlist_entries')
+    doctor = models.ForeignKey(Doctors, on_delete=models.CASCADE, related_name='waitlist_entries')
+    p_name = models.CharField(max_length=255)
+    p_phone = models.CharField(max_length=10)
+    p_email = models.EmailField()
+    date_from = models.DateField()
+    date_to = models.DateField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='waiting')
+    created_at = models.DateTimeField(auto_now_add=True)
+    # The held booking offered to this patient and when the hold lapses
+    offered_booking = models.OneToOneField(Booking, on_delete=models.SET_NULL, null=True, blank=True, related_name='waitlist_offer')
+    hold_expires_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = 'Waitlist Entries'
+        indexes = [
+            # First-come lookup of waiters for a doctor
+            models.Index(fields=['doctor', 'status', 'created_at'], name='waitlist_doctor_queue_idx'),
+            models.Index(fields=['status', 'hold_expires_at'], name='waitlist_hold_expiry_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.p_name} - {self.doctor.doc_name} ({self.date_from} to {self.date_to})"
+
+class BookingDailyRollup(models.Model):
+    """Booking counts per day, doctor and status, rebuilt by `manage.py rollup_bookings`"""
+    date = models.DateField()
+    doctor = models.ForeignKey(Doctors, on_delete=models.CASCADE, related_name='booking_rollups')
+    # Department at rollup time, so department totals need no join through Doctors
+    department = models.ForeignKey(Departments, on_delete=models.CASCADE, related_name='booking_rollups')
+    status = models.CharField(max_length=20, choices=Booking.STATUS_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+    computed_on = models.DateField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'doctor', 'status'], name='unique_booking_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['date', 'department'], name='rollup_date_department_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} - {self.doctor.doc_name} ({self.status}): {self.count}"
@@ -0,0 +1,151 @@
+from django.db import transaction
+from django.db.models import Count, IntegerField, Q, Sum
+from django.db.models.functions import Coalesce
+
+from core.tenancy import current_tenant_id, tenant_lookup
+from doctors.models import Departments
+from .events import events_between, get_cursor, latest_event_id, set_cursor
+from .models import Booking, BookingDailyRollup
+
+CURSOR_NAME = 'rollup_bookings'
+
+# Keeps `booking_date IN (...)` under SQLite's bound-parameter limit
+DAYS_PER_BATCH = 500
+
+
+# The event log and rollup table are shared by the tenants of a database, so each
+# tenant keeps its own cursor and only reads and replaces its own rows
+
+def _cursor_name():
+    return f'{CURSOR_NAME}:{current_tenant_id()}'
+
+
+def changed_days(after, upto):
+    """Booking dates of the active tenant touched by the booking events in (after, upto]"""
+    events = events_between(after, upto).filter(**tenant_lookup('doctor__'))
+    return set(events.values_list('booking_date', flat=True).distinct())
+
+
+def _aggregate(bookings):
+    return (
+        bookings.values('booking_date', 'doc_name_id', 'doc_name__dep_name_id', 'status')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+
+
+def _rollup_rows(grouped):
+    return [
+        BookingDailyRollup(
+            date=row['booking_date'],
+            doctor_id=row['doc_name_id'],
+            department_id=row['doc_name__dep_name_id'],
+            status=row['status'],
+            count=row['total'],
+        )
+        for row in grouped
+    ]
+
+
+def rollup_days(days):
+    """Recompute the rollups for `days` with one GROUP BY per batch, returns rows written"""
+    days = sorted(days)
+    written = 0
+    for i in range(0, len(days), DAYS_PER_BATCH):
+        batch = days[i:i + DAYS_PER_BATCH]
+        rows = _rollup_rows(_aggregate(Booking.objects.filter(booking_date__in=batch)))
+        with transaction.atomic():
+            BookingDailyRollup.objects.filter(date__in=batch, **tenant_lookup('department__')).delete()
+            BookingDailyRollup.objects.bulk_create(rows, batch_size=1000)
+        written += len(rows)
+    return written
+
+
+def rollup_all():
+    """Rebuild every rollup from scratch, returns rows written"""
+    rows = _rollup_rows(_aggregate(Booking.objects.all()))
+    with transaction.atomic():
+        BookingDailyRollup.objects.filter(**tenant_lookup('department__')).delete()
+        BookingDailyRollup.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def run_rollup(full=False):
+    """Bring the active tenant's rollups up to date, returns (days processed or None for a full rebuild, rows written).
+
+    Only booking dates with a BookingEvent after the stored cursor are recomputed;
+    the first run, or `full`, rebuilds everything.
+    """
+    # Read the cursor target first so events written during the run are picked up next time
+    upto = latest_event_id()
+    name = _cursor_name()
+    position = get_cursor(name)
+    if full or position is None:
+        rows = rollup_all()
+        set_cursor(name, upto)
+        return None, rows
+    days = changed_days(position, upto)
+    rows = rollup_days(days)
+    set_cursor(name, upto)
+    return len(days), rows
+
+
+def _sum(*conditions, **filters):
+    return Coalesce(Sum('count', filter=Q(*conditions, **filters)), 0, output_field=IntegerField())
+
+
+def _past_days(today=None):
+    """Q for rollup rows whose day is over, at their department's clinic unless `today` is given"""
+    if today is not None:
+        return Q(date__lt=today)
+    # Departments share few timezones, so this is one branch per distinct local date
+    by_today = {}
+    for department in Departments.objects.only('timezone'):
+        by_today.setdefault(department.local_today(), []).append(department.id)
+    condition = Q(pk__in=[])
+    for local_today, department_ids in by_today.items():
+        condition |= Q(department_id__in=department_ids, date__lt=local_today)
+    return condition
+
+
+def booking_rates(start, end, by='doctor', today=None):
+    """Per-doctor or per-department booking counts and rates for [start, end] from the rollups.
+
+    A no-show is an accepted booking whose day has passed without being completed,
+    judged by the local date at its department's clinic (or `today`, if given).
+    """
+    past = _past_days(today)
+    name_field = 'doctor__doc_name' if by == 'doctor' else 'department__dep_name'
+    rows = (
+        BookingDailyRollup.objects.filter(date__range=(start, end), **tenant_lookup('department__'))
+        .values(f'{by}_id', name_field)
+        .annotate(
+            total=Coalesce(Sum('count'), 0),
+            completed=_sum(status='completed'),
+            cancelled=_sum(status='cancelled'),
+            rejected=_sum(status='rejected'),
+            no_show=_sum(past, status='accepted'),
+        )
+        .order_by(name_field)
+    )
+
+    results = []
+    for row in rows:
+        attended = row['completed'] + row['no_show']
+        results.append({
+            'id': row[f'{by}_id'],
+            'name': row[name_field],
+            'total': row['total'],
+            'completed': row['completed'],
+            'cancelled': row['cancelled'],
+            'rejected': row['rejected'],
+            'no_show': row['no_show'],
+            'cancellation_rate': _rate(row['cancelled'], row['total']),
+            'rejection_rate': _rate(row['rejected'], row['total']),
+            'no_show_rate': _rate(row['no_show'], attended),
+        })
+    return results
+
+
+def _rate(part, whole):
+    return round(100 * part / whole, 1) if whole else 0.0
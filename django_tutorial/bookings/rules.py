@@ -0,0 +1,163 @@
+from bisect import bisect_left, bisect_right
+from functools import cached_property
+
+from doctors.models import DoctorLeave
+from .models import Booking
+from .slots import INACTIVE_STATUSES, from_minutes, to_minutes, wall_time_exists
+
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+class BookingContext:
+    """Everything the booking rules need, loaded lazily with at most 2 queries.
+
+    Pass the doctor with its department loaded (select_related('dep_name')),
+    the rules read the clinic's timezone from it. Working hours come from the
+    doctor's stored weekly summary, not the availability table.
+    """
+
+    def __init__(self, doctor, date, time):
+        self.doctor = doctor
+        self.date = date
+        self.time = time
+        self.day_name = DAY_NAMES[date.weekday()]
+
+    @property
+    def tz(self):
+        return self.doctor.dep_name.tzinfo
+
+    @cached_property
+    def leave(self):
+        return DoctorLeave.objects.filter(doctor=self.doctor, date=self.date).first()
+
+    @cached_property
+    def windows(self):
+        """Merged (start, end) working hours on the booking's weekday"""
+        return self.doctor.hours_on(self.date.weekday())
+
+    @property
+    def available_days(self):
+        return [day for day in range(7) if self.doctor.works_on(day)]
+
+    @cached_property
+    def bookings(self):
+        """(appointment_time, id) of the doctor's active bookings that day, sorted by time"""
+        return list(
+            Booking.objects.filter(doc_name=self.doctor, booking_date=self.date, appointment_time__isnull=False)
+            .exclude(status__in=INACTIVE_STATUSES)
+            .order_by('appointment_time', 'id')
+            .values_list('appointment_time', 'id')
+        )
+
+    @cached_property
+    def booked_minutes(self):
+        return [to_minutes(time) for time, _ in self.bookings]
+
+
+# Each rule returns a list of (field, message) errors; the first failing rule wins
+
+def check_interval(ctx):
+    step = ctx.doctor.slot_minutes
+    if to_minutes(ctx.time) % step != 0 or ctx.time.second != 0:
+        first = -(-9 * 60 // step) * step
+        examples = ', '.join(
+            f"{t.hour}:{t.minute:02d}" for t in (from_minutes(first + i * step) for i in range(4))
+        )
+        return [('appointment_time',
+                 f"⚠️ Appointment times must be in {step}-minute intervals (e.g., {examples})")]
+    return []
+
+
+def check_not_past(ctx):
+    # "Today" at the clinic, which may already be tomorrow or still yesterday on the server
+    if ctx.date < ctx.doctor.dep_name.local_today():
+        return [('booking_date', "Cannot book appointments for past dates. Please select today or a future date.")]
+    return []
+
+
+def check_leave(ctx):
+    if ctx.leave:
+        reason = f" (Reason: {ctx.leave.reason})" if ctx.leave.reason else ""
+        return [('booking_date',
+                 f"❌ Dr. {ctx.doctor.doc_name} is on leave on {ctx.date.strftime('%B %d, %Y')}{reason}. Please choose another date.")]
+    return []
+
+
+def check_working_day(ctx):
+    if ctx.windows:
+        return []
+    errors = [('booking_date',
+               f"❌ Dr. {ctx.doctor.doc_name} is not available on {ctx.day_name}s. Please choose a different day.")]
+    if ctx.available_days:
+        day_names = [DAY_NAMES[d] for d in ctx.available_days]
+        errors.append(('booking_date', f"ℹ️ Doctor is available on: {', '.join(day_names)}"))
+    return errors
+
+
+def check_working_hours(ctx):
+    if any(start <= ctx.time <= end for start, end in ctx.windows):
+        return []
+    slots_info = [
+        f"{start.strftime('%I:%M %p')} - {end.strftime('%I:%M %p')}"
+        for start, end in ctx.windows
+    ]
+    return [
+        ('appointment_time',
+         f"❌ The selected time ({ctx.time.strftime('%I:%M %p')}) is outside Dr. {ctx.doctor.doc_name}'s working hours for {ctx.day_name}."),
+        ('appointment_time', f"ℹ️ Available time slots: {' | '.join(slots_info)}"),
+    ]
+
+
+def check_clock_change(ctx):
+    if wall_time_exists(ctx.date, ctx.time, ctx.tz):
+        return []
+    return [('appointment_time',
+             f"❌ {ctx.time.strftime('%I:%M %p')} does not exist on {ctx.date.strftime('%B %d, %Y')} because the clocks go forward. Please choose another time.")]
+
+
+def check_buffer(ctx):
+    buffer = ctx.doctor.buffer_minutes
+    # Sorted booked minutes: bisect finds the conflicting range without scanning
+    minute = to_minutes(ctx.time)
+    lo = bisect_left(ctx.booked_minutes, minute - buffer)
+    hi = bisect_right(ctx.booked_minutes, minute + buffer)
+    conflicts = ctx.bookings[lo:hi]
+    if not conflicts:
+        return []
+
+    if any(time == ctx.time for time, _ in conflicts):
+        apart = f" (at least {buffer} minutes apart)" if buffer else ""
+        return [
+            ('appointment_time',
+             f"❌ This time slot ({ctx.time.strftime('%I:%M %p')} on {ctx.date.strftime('%B %d, %Y')}) is already booked."),
+            ('appointment_time', f"ℹ️ Please select a different time slot{apart}."),
+        ]
+
+    # Only reachable with a non-zero buffer
+    conflict_time = min(conflicts, key=lambda booking: booking[1])[0].strftime('%I:%M %p')
+    return [
+        ('appointment_time',
+         f"❌ A booking already exists at {conflict_time}. Appointments must be at least {buffer} minutes apart."),
+        ('appointment_time',
+         f"ℹ️ Please choose a time slot that is at least {buffer} minutes before or after existing bookings."),
+    ]
+
+
+BOOKING_RULES = [
+    check_interval,
+    check_not_past,
+    check_leave,
+    check_working_day,
+    check_working_hours,
+    check_clock_change,
+    check_buffer,
+]
+
+
+def validate_booking(ctx, rules=BOOKING_RULES):
+    """Run the rules in order and return the errors of the first one that fails"""
+    for rule in rules:
+        errors = rule(ctx)
+        if errors:
+            return errors
+    return []
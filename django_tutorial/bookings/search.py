@@ -0,0 +1,128 @@
+import datetime
+import heapq
+import zoneinfo
+from itertools import islice
+
+from django.utils import timezone
+
+from doctors.models import DoctorLeave
+from .models import Booking
+from .slots import INACTIVE_STATUSES, from_minutes, interval_slots, slot_instants, slot_state, to_minutes
+
+# Bookings are loaded in blocks of days as the merge advances through the window
+BOOKING_BLOCK_DAYS = 7
+
+
+class BookedIndex:
+    """Sorted booked minutes per (doctor, date), fetched lazily one block of days at a time"""
+
+    def __init__(self, doctor_ids, start_date, end_date):
+        self.doctor_ids = doctor_ids
+        self.start_date = start_date
+        self.end_date = end_date
+        self.loaded_blocks = set()
+        self.booked = {}
+
+    def get(self, doctor_id, date):
+        block = (date - self.start_date).days // BOOKING_BLOCK_DAYS
+        if block not in self.loaded_blocks:
+            self._load_block(block)
+        return self.booked.get((doctor_id, date), ())
+
+    def _load_block(self, block):
+        first = self.start_date + datetime.timedelta(days=block * BOOKING_BLOCK_DAYS)
+        last = min(first + datetime.timedelta(days=BOOKING_BLOCK_DAYS - 1), self.end_date)
+        rows = (
+            Booking.objects.filter(
+                doc_name_id__in=self.doctor_ids,
+                booking_date__range=(first, last),
+                appointment_time__isnull=False,
+            )
+            .exclude(status__in=INACTIVE_STATUSES)
+            .values_list('doc_name_id', 'booking_date', 'appointment_time')
+        )
+        block_booked = {}
+        for doctor_id, date, time in rows:
+            block_booked.setdefault((doctor_id, date), []).append(to_minutes(time))
+        for key, minutes in block_booked.items():
+            self.booked[key] = sorted(minutes)
+        self.loaded_blocks.add(block)
+
+
+def _doctor_free_slots(doctor_id, weekly, buffer, tz, leave_dates, booked, start_date, end_date, now):
+    """Chronological (UTC instant, doctor id, local date, minute) of one doctor's free slots.
+
+    Dates and minutes are wall-clock values at the doctor's clinic; instants make
+    slots of clinics in different timezones comparable.
+    """
+    date = max(start_date, now.astimezone(tz).date())
+    while date <= end_date:
+        minutes = weekly.get(date.weekday())
+        if minutes and date not in leave_dates:
+            taken = booked.get(doctor_id, date)
+            instants = slot_instants(date, minutes, tz)
+            for minute in minutes:
+                instant = instants.get(minute)
+                if instant and instant > now and slot_state(minute, taken, buffer) == 'free':
+                    yield instant, doctor_id, date, minute
+        date += datetime.timedelta(days=1)
+
+
+def next_available_slots(doctors, start_date, end_date, limit=10, now=None):
+    """The `limit` earliest free slots across `doctors` (a Doctors queryset) in a date window.
+
+    A `start_date` of None starts from today at each doctor's clinic.
+
+    Each doctor gets a lazy generator of its free slots and the generators are
+    heap-merged, so only the days needed to fill `limit` results are visited.
+    """
+    now = now or timezone.now()
+    # No clinic is more than 12 hours behind UTC, so earlier dates are past everywhere
+    start_date = max(start_date or datetime.date.min, (now - datetime.timedelta(hours=12)).date())
+    if start_date > end_date:
+        return []
+
+    doctor_info = {
+        d['id']: d for d in doctors.values('id', 'doc_name', 'doc_spec', 'slot_minutes', 'buffer_minutes', 'dep_name__timezone', 'weekly_hours')
+    }
+    if not doctor_info:
+        return []
+    doctor_ids = list(doctor_info)
+
+    weekly = {}
+    for doctor_id, doctor in doctor_info.items():
+        step = doctor['slot_minutes']
+        for day, intervals in enumerate(doctor['weekly_hours']):
+            if intervals:
+                # Merged intervals are sorted and disjoint, so their slots come out sorted
+                weekly.setdefault(doctor_id, {})[day] = [m for start, end in intervals for m in interval_slots(start, end, step)]
+
+    leaves = {}
+    for doctor_id, date in DoctorLeave.objects.filter(doctor_id__in=doctor_ids, date__range=(start_date, end_date)).values_list('doctor_id', 'date'):
+        leaves.setdefault(doctor_id, set()).add(date)
+
+    booked = BookedIndex(doctor_ids, start_date, end_date)
+    generators = [
+        _doctor_free_slots(
+            doctor_id, weekly[doctor_id], doctor_info[doctor_id]['buffer_minutes'],
+            zoneinfo.ZoneInfo(doctor_info[doctor_id]['dep_name__timezone']),
+            leaves.get(doctor_id, set()), booked, start_date, end_date, now,
+        )
+        for doctor_id in doctor_ids if doctor_id in weekly
+    ]
+
+    results = []
+    for instant, doctor_id, date, minute in islice(heapq.merge(*generators), limit):
+        doctor = doctor_info[doctor_id]
+        slot = datetime.datetime.combine(date, from_minutes(minute))
+        results.append({
+            'doctor_id': doctor_id,
+            'doctor_name': doctor['doc_name'],
+            'doctor_spec': doctor['doc_spec'],
+            'date': date.isoformat(),
+            'time': slot.strftime('%H:%M'),
+            'starts_at': instant,
+            'timezone': doctor['dep_name__timezone'],
+            'display': f"Dr. {doctor['doc_name']} - {slot.strftime('%a, %b %d at %I:%M %p')}",
+        })
+    return results
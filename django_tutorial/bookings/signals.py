@@ -0,0 +1,78 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.tasks import run_in_background
+from doctors.models import Departments, DoctorAvailability, DoctorLeave, Doctors
+from .dayview import invalidate_department, invalidate_doctor_day
+from .live import publish_slot_change
+from .models import Booking, BookingEvent
+from .slots import INACTIVE_STATUSES
+from .waitlist import offer_freed_slot
+
+
+@receiver([post_save, post_delete], sender=Booking)
+def booking_changed(sender, instance, **kwargs):
+    doctor_id, date, tenant_id = instance.doc_name_id, instance.booking_date, instance.tenant_id
+    transaction.on_commit(lambda: invalidate_doctor_day(doctor_id, date, tenant_id))
+    transaction.on_commit(lambda: publish_slot_change(doctor_id, date, tenant_id))
+
+
+@receiver(post_delete, sender=Booking)
+def booking_deleted(sender, instance, origin=None, **kwargs):
+    # A doctor or department delete cascades to the doctor's events and rollups as
+    # well, so an event recorded here would point at a doctor that is going away
+    if getattr(origin, 'model', type(origin)) not in (Booking, type(None)):
+        return
+    # Sent inside the delete's transaction, so the event commits with it
+    BookingEvent.record(instance, 'deleted', instance.status)
+
+
+@receiver(post_save, sender=Booking)
+def booking_slot_freed(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_loaded_status', None)
+    instance._loaded_status = instance.status
+    if created or previous in INACTIVE_STATUSES or instance.status not in INACTIVE_STATUSES:
+        return
+    if instance.appointment_time:
+        # Offering the slot to the waitlist happens off the request path
+        run_in_background(offer_freed_slot, instance.doc_name_id, instance.booking_date, instance.appointment_time)
+
+
+@receiver([post_save, post_delete], sender=DoctorAvailability)
+@receiver([post_save, post_delete], sender=DoctorLeave)
+def schedule_changed(sender, instance, **kwargs):
+    doctor = Doctors.objects.filter(pk=instance.doctor_id).values_list('dep_name_id', 'tenant_id').first()
+    if doctor is not None:
+        department_id, tenant_id = doctor
+        transaction.on_commit(lambda: invalidate_department(department_id, tenant_id))
+
+
+@receiver(post_save, sender=Departments)
+def department_timezone_changed(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_loaded_timezone', None)
+    instance._loaded_timezone = instance.timezone
+    if created or previous == instance.timezone:
+        return
+    # The wall-clock times stay, so every booking's instant moves
+    tz = instance.tzinfo
+    bookings = Booking.objects.filter(doc_name__dep_name=instance, appointment_time__isnull=False).only(
+        'booking_date', 'appointment_time', 'starts_at',
+    )
+    stamped = []
+    for booking in bookings.iterator():
+        booking.stamp_starts_at(tz)
+        stamped.append(booking)
+    Booking.objects.bulk_update(stamped, ['starts_at'], batch_size=500)
+    department_id, tenant_id = instance.id, instance.tenant_id
+    transaction.on_commit(lambda: invalidate_department(department_id, tenant_id))
+
+
+@receiver([post_save, post_delete], sender=Doctors)
+def doctor_changed(sender, instance, **kwargs):
+    # A doctor moved between departments leaves both grids
+    department_ids = {instance.dep_name_id, getattr(instance, '_loaded_department_id', None)} - {None}
+    instance._loaded_department_id = instance.dep_name_id
+    tenant_id = instance.tenant_id
+    for department_id in department_ids:
+        transaction.on_commit(lambda department_id=department_id: invalidate_department(department_id, tenant_id))
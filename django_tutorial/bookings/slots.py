@@ -0,0 +1,77 @@
+import datetime
+from bisect import bisect_left, bisect_right
+
+# Defaults for doctors that keep the standard grid (see Doctors.slot_minutes/buffer_minutes)
+SLOT_MINUTES = 15
+BUFFER_MINUTES = 15
+
+# Bookings in these states no longer occupy their slot
+INACTIVE_STATUSES = ('rejected', 'cancelled')
+
+
+def to_utc(date, time, tz):
+    """Aware UTC instant of a wall-clock time at a clinic.
+
+    Ambiguous times (clocks going back) resolve to the first occurrence and
+    skipped times (clocks going forward) to the instant an hour later (PEP 495).
+    """
+    return datetime.datetime.combine(date, time, tzinfo=tz).astimezone(datetime.timezone.utc)
+
+
+def wall_time_exists(date, time, tz):
+    """False for wall-clock times skipped when the clocks go forward"""
+    wall = datetime.datetime.combine(date, time)
+    return to_utc(date, time, tz).astimezone(tz).replace(tzinfo=None) == wall
+
+
+def slot_instants(date, minutes, tz):
+    """{minute: aware UTC instant} for slot start minutes on one local date.
+
+    On the ~363 days a year without a clock change every slot shares midnight's
+    UTC offset, so the whole day is converted with one offset lookup. On
+    transition days each slot is converted and skipped ones are left out.
+    """
+    midnight = datetime.datetime.combine(date, datetime.time(), tzinfo=tz)
+    next_midnight = datetime.datetime.combine(date + datetime.timedelta(days=1), datetime.time(), tzinfo=tz)
+    if midnight.utcoffset() == next_midnight.utcoffset():
+        base = midnight.astimezone(datetime.timezone.utc)
+        return {minute: base + datetime.timedelta(minutes=minute) for minute in minutes}
+    instants = {}
+    for minute in minutes:
+        time = from_minutes(minute)
+        if wall_time_exists(date, time, tz):
+            instants[minute] = to_utc(date, time, tz)
+    return instants
+
+
+def to_minutes(value):
+    """Minutes since midnight for a datetime.time"""
+    return value.hour * 60 + value.minute
+
+
+def from_minutes(minutes):
+    return datetime.time(minutes // 60, minutes % 60)
+
+
+def window_slots(start, end, step=SLOT_MINUTES):
+    """Slot start minutes inside an availability window (both ends inclusive)"""
+    return interval_slots(to_minutes(start), to_minutes(end), step)
+
+
+def interval_slots(start, end, step=SLOT_MINUTES):
+    """window_slots() for a [start, end] pair of minutes, as stored in Doctors.weekly_hours"""
+    first = -(-start // step) * step
+    return range(first, end + 1, step)
+
+
+def nearby(booked, minute, buffer=BUFFER_MINUTES):
+    """Slice of the sorted `booked` minutes that lie within `buffer` of `minute`"""
+    return booked[bisect_left(booked, minute - buffer):bisect_right(booked, minute + buffer)]
+
+
+def slot_state(minute, booked, buffer=BUFFER_MINUTES):
+    """'booked', 'blocked' (inside another booking's buffer) or 'free'; `booked` must be sorted"""
+    near = nearby(booked, minute, buffer)
+    if not near:
+        return 'free'
+    return 'booked' if minute in near else 'blocked'
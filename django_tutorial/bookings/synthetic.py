@@ -0,0 +1,302 @@
+import datetime
+import random
+from itertools import accumulate, islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from accounts.provisioning import provision_users
+from core.inbox import invalidate_counts
+from core.models import Contact
+from doctors.directory import invalidate_directory
+from doctors.models import Departments, DoctorAvailability, DoctorLeave, Doctors
+from doctors.schedule import summarize
+from .capacity import weekday_counts
+from .dayview import invalidate_department
+from .models import Booking, BookingEvent
+from .slots import interval_slots, slot_instants
+
+# Rows handed to each bulk_create; generators are consumed one chunk at a time
+CHUNK_SIZE = 5000
+
+SCALES = {
+    'small': {
+        'departments': 5, 'doctors': 20, 'patients': 200, 'bookings': 20_000, 'contacts': 200,
+        'history_days': 180, 'future_days': 60,
+    },
+    'large': {
+        'departments': 20, 'doctors': 200, 'patients': 5_000, 'bookings': 1_000_000, 'contacts': 20_000,
+        'history_days': 730, 'future_days': 90,
+    },
+    'xl': {
+        'departments': 50, 'doctors': 1_000, 'patients': 20_000, 'bookings': 5_000_000, 'contacts': 100_000,
+        'history_days': 730, 'future_days': 90,
+    },
+}
+
+SPECIALTIES = (
+    'Cardiology', 'Neurology', 'Orthopedics', 'Pediatrics', 'Dermatology', 'Oncology', 'Gastroenterology',
+    'Nephrology', 'Pulmonology', 'Endocrinology', 'Ophthalmology', 'ENT', 'Psychiatry', 'Urology',
+    'Gynecology', 'Rheumatology', 'Radiology', 'General Medicine', 'General Surgery', 'Dentistry',
+)
+TITLES = ('Consultant', 'Senior Consultant', 'Associate', 'Specialist', 'Chief')
+FIRST_NAMES = (
+    'Anu', 'Arjun', 'Deepa', 'Faisal', 'Gita', 'Hari', 'Irfan', 'Jaya', 'Kiran', 'Lakshmi', 'Manu', 'Nisha',
+    'Omar', 'Priya', 'Rahul', 'Sana', 'Tara', 'Vivek', 'Zara', 'Meera', 'Joseph', 'Anil', 'Reshma', 'Thomas',
+)
+LAST_NAMES = (
+    'Menon', 'Nair', 'Pillai', 'Thomas', 'Varghese', 'Kurian', 'Iyer', 'Rao', 'Khan', 'Joseph', 'George',
+    'Mathew', 'Krishnan', 'Das', 'Shetty', 'Reddy', 'Kapoor', 'Abraham', 'Jacob', 'Sharma',
+)
+LEAVE_REASONS = ('', '', 'Conference', 'Personal leave', 'Sick leave', 'Training', 'Public holiday')
+CONTACT_SUBJECTS = (
+    'Appointment query', 'Billing question', 'Feedback', 'Insurance', 'Lost property', 'Reports request',
+    'Visiting hours', 'Complaint',
+)
+# (slot_minutes, buffer_minutes) pairs doctors are drawn from
+SLOT_SETTINGS = ((15, 0), (15, 15), (20, 10), (30, 0), (30, 15))
+# (start, end) hours of the shifts a doctor may work on a day
+SHIFTS = {'morning': ((9, 13),), 'afternoon': ((14, 18),), 'full': ((9, 13), (14, 18)), 'long': ((8, 16),)}
+# Status mixes for appointments already past and still to come
+PAST_STATUSES = (('completed', 70), ('accepted', 8), ('cancelled', 12), ('rejected', 6), ('pending', 4))
+FUTURE_STATUSES = (('pending', 35), ('accepted', 50), ('cancelled', 10), ('rejected', 5))
+LEAVE_RATE = 0.02
+
+
+def chunks(iterable, size=CHUNK_SIZE):
+    """Yield lists of up to `size` items, so only one chunk of a generator is in memory"""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _bulk_create(model, rows, on_chunk=None):
+    """bulk_create `rows` a chunk at a time; `on_chunk` gets each saved chunk inside its transaction"""
+    created = 0
+    for chunk in chunks(rows):
+        with transaction.atomic():
+            saved = model.objects.bulk_create(chunk)
+            if on_chunk:
+                on_chunk(saved)
+        created += len(chunk)
+    return created
+
+
+def _log_created(bookings):
+    # bulk_create skips Booking.save, which logs the event the cursor consumers
+    # (incremental rollups, ...) read
+    BookingEvent.objects.bulk_create([
+        BookingEvent(
+            booking=booking,
+            booking_ref=booking.pk,
+            doctor_id=booking.doc_name_id,
+            booking_date=booking.booking_date,
+            kind='created',
+            new_status=booking.status,
+        )
+        for booking in bookings
+    ])
+
+
+def _person(rng):
+    return f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+
+
+def _weighted(mix):
+    """(statuses, cumulative weights) for random.choices"""
+    statuses, weights = zip(*mix)
+    return statuses, list(accumulate(weights))
+
+
+def _weekly_windows(rng):
+    days = sorted(rng.sample(range(6), rng.randint(3, 5)))
+    # Some doctors also hold a Sunday clinic
+    if rng.random() < 0.1:
+        days.append(6)
+    windows = []
+    for day in days:
+        for start, end in SHIFTS[rng.choice(tuple(SHIFTS))]:
+            windows.append((day, datetime.time(start), datetime.time(end)))
+    return windows
+
+
+def _bookable_minutes(doctor, weekday):
+    """Slot minutes of a weekday that can all be booked without breaking the buffer rule"""
+    minutes = [m for start, end in doctor.weekly_hours[weekday] for m in interval_slots(start, end, doctor.slot_minutes)]
+    return minutes[::doctor.buffer_minutes // doctor.slot_minutes + 1]
+
+
+class SyntheticData:
+    """Generate a reproducible hospital for the active tenant.
+
+    The same `seed`, scale and `today` always produce the same rows. Doctors,
+    logins, schedules and leave are created first; bookings and contact messages
+    are then produced by generators and written CHUNK_SIZE rows at a time, so
+    memory stays flat however many millions of rows the scale asks for.
+    """
+
+    def __init__(self, scale='small', seed=0, today=None, password=''):
+        self.config = SCALES[scale]
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.today = today or datetime.date.today()
+        self.start = self.today - datetime.timedelta(days=self.config['history_days'])
+        self.end = self.today + datetime.timedelta(days=self.config['future_days'])
+        # One hash shared by every synthetic login; a blank password leaves them unusable
+        self.password = make_password(password) if password else ''
+        self.prefix = f'syn{seed}'
+
+    def already_seeded(self):
+        return User.objects.filter(username__startswith=f'{self.prefix}-').exists()
+
+    def run(self):
+        """Write everything and return the number of rows created per kind"""
+        totals = {}
+        departments = self.create_departments()
+        totals['departments'] = len(departments)
+        doctors, schedules = self.create_doctors(departments)
+        totals['doctors'] = len(doctors)
+        totals['availabilities'] = self.create_availability(doctors, schedules)
+        leaves = self.create_leaves(doctors)
+        totals['leaves'] = sum(len(dates) for dates in leaves.values())
+        patients = self.create_patients()
+        totals['users'] = len(doctors) + len(patients)
+        totals['bookings'] = _bulk_create(Booking, self.bookings(doctors, leaves, patients), on_chunk=_log_created)
+        totals['contacts'] = _bulk_create(Contact, self.contacts())
+
+        # bulk_create skips the signals that refresh the cached views and counts
+        invalidate_counts()
+        invalidate_directory()
+        for department in departments:
+            invalidate_department(department.id)
+        return totals
+
+    def create_departments(self):
+        departments = []
+        for i in range(self.config['departments']):
+            specialty = SPECIALTIES[i % len(SPECIALTIES)]
+            name = specialty if i < len(SPECIALTIES) else f'{specialty} {i // len(SPECIALTIES) + 1}'
+            departments.append(Departments(dep_name=name, dep_decription=f'Synthetic {specialty.lower()} department.'))
+        return Departments.objects.bulk_create(departments)
+
+    def create_doctors(self, departments):
+        rng = self.rng
+        count = self.config['doctors']
+        users = provision_users(
+            ({'username': f'{self.prefix}-dr{i}', 'email': f'{self.prefix}-dr{i}@example.com', 'password': self.password}
+             for i in range(count)),
+            workers=1,
+            keep_hashes=True,
+        )
+        doctors = []
+        schedules = []
+        for i, user in enumerate(users):
+            department = departments[i % len(departments)]
+            slot_minutes, buffer_minutes = rng.choice(SLOT_SETTINGS)
+            windows = _weekly_windows(rng)
+            weekly_hours, working_days = summarize(windows)
+            schedules.append(windows)
+            doctors.append(Doctors(
+                user=user,
+                doc_name=_person(rng),
+                doc_spec=f'{rng.choice(TITLES)} - {department.dep_name}',
+                dep_name=department,
+                slot_minutes=slot_minutes,
+                buffer_minutes=buffer_minutes,
+                weekly_hours=weekly_hours,
+                working_days=working_days,
+            ))
+        return Doctors.objects.bulk_create(doctors, batch_size=CHUNK_SIZE), schedules
+
+    def create_availability(self, doctors, schedules):
+        return _bulk_create(DoctorAvailability, (
+            DoctorAvailability(doctor=doctor, day=day, start_time=start, end_time=end)
+            for doctor, windows in zip(doctors, schedules)
+            for day, start, end in windows
+        ))
+
+    def create_leaves(self, doctors):
+        """Scatter leave over about LEAVE_RATE of each doctor's working days, returns {doctor id: dates}"""
+        rng = self.rng
+        leaves = {}
+        for doctor in doctors:
+            dates = set()
+            date = self.start
+            while date <= self.end:
+                if doctor.works_on(date.weekday()) and rng.random() < LEAVE_RATE:
+                    dates.add(date)
+                date += datetime.timedelta(days=1)
+            leaves[doctor.id] = dates
+        _bulk_create(DoctorLeave, (
+            DoctorLeave(doctor_id=doctor_id, date=date, reason=rng.choice(LEAVE_REASONS))
+            for doctor_id, dates in leaves.items()
+            for date in sorted(dates)
+        ))
+        return leaves
+
+    def create_patients(self):
+        rng = self.rng
+        return provision_users(
+            ({'username': f'{self.prefix}-p{i}', 'email': f'{self.prefix}-p{i}@example.com',
+              'first_name': _person(rng), 'password': self.password}
+             for i in range(self.config['patients'])),
+            workers=1,
+            keep_hashes=True,
+        )
+
+    def _fill_rate(self, doctors):
+        """Share of bookable slots to fill so the total comes out near the scale's booking count"""
+        counts = weekday_counts(self.start, self.end)
+        capacity = sum(
+            len(_bookable_minutes(doctor, day)) * counts[day]
+            for doctor in doctors for day in range(7)
+        )
+        return min(0.95, self.config['bookings'] / capacity) if capacity else 0
+
+    def bookings(self, doctors, leaves, patients):
+        """Yield unsaved bookings day by day, doctor by doctor"""
+        rng = self.rng
+        rate = self._fill_rate(doctors)
+        past = _weighted(PAST_STATUSES)
+        future = _weighted(FUTURE_STATUSES)
+        grids = {doctor.id: [_bookable_minutes(doctor, day) for day in range(7)] for doctor in doctors}
+        date = self.start
+        while date <= self.end:
+            statuses, weights = past if date < self.today else future
+            for doctor in doctors:
+                minutes = grids[doctor.id][date.weekday()]
+                if not minutes or date in leaves[doctor.id]:
+                    continue
+                booked = [m for m in minutes if rng.random() < rate]
+                if not booked:
+                    continue
+                instants = slot_instants(date, booked, doctor.dep_name.tzinfo)
+                for minute in booked:
+                    patient = rng.choice(patients) if patients and rng.random() < 0.7 else None
+                    name = patient.first_name if patient else _person(rng)
+                    yield Booking(
+                        user=patient,
+                        p_name=name,
+                        p_phone=f'9{rng.randrange(10 ** 9):09d}',
+                        p_email=patient.email if patient else f'{name.lower().replace(" ", ".")}@example.com',
+                        doc_name=doctor,
+                        booking_date=date,
+                        appointment_time=datetime.time(minute // 60, minute % 60),
+                        starts_at=instants.get(minute),
+                        status=rng.choices(statuses, cum_weights=weights)[0],
+                        tenant_id=doctor.tenant_id,
+                    )
+            date += datetime.timedelta(days=1)
+
+    def contacts(self):
+        rng = self.rng
+        for _ in range(self.config['contacts']):
+            name = _person(rng)
+            yield Contact(
+                name=name,
+                email=f'{name.lower().replace(" ", ".")}@example.com',
+                subject=rng.choice(CONTACT_SUBJECTS),
+                message=f'Synthetic message about {rng.choice(CONTACT_SUBJECTS).lower()}.',
+                is_read=rng.random() < 0.6,
+            )
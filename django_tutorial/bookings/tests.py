@@ -0,0 +1,696 @@
+import datetime
+import json
+import zoneinfo
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.inbox import unread_count
+from core.models import Contact
+from doctors.models import Departments, DoctorAvailability, DoctorLeave, Doctors
+from .board import day_board
+from .capacity import capacity_report, weekday_counts
+from .dayview import get_day_view
+from .forms import BookingForm
+from .live import publish_slot_change, slot_event_stream
+from .models import Booking, BookingDailyRollup, BookingEvent, WaitlistEntry
+from .rules import BookingContext, check_clock_change, validate_booking
+from .rollups import booking_rates, run_rollup
+from .slots import slot_instants, to_utc, wall_time_exists
+from .synthetic import SCALES, SyntheticData
+from .waitlist import accept_offer, expire_lapsed_holds, offer_freed_slot
+
+
+def next_weekday(weekday, weeks_ahead=1):
+    """A date `weeks_ahead` weeks from now falling on `weekday` (0 = Monday)"""
+    today = datetime.date.today()
+    return today + datetime.timedelta(days=(weekday - today.weekday()) % 7 + 7 * weeks_ahead)
+
+
+def make_doctor(slot_minutes=15, buffer_minutes=15, timezone_name='UTC', hours=((0, 9, 17),)):
+    """A doctor working (weekday, start hour, end hour) windows in a fresh department"""
+    department = Departments.objects.create(dep_name='Cardiology', dep_decription='Heart', timezone=timezone_name)
+    doctor = Doctors.objects.create(
+        doc_name='Asha Menon', doc_spec='Cardiologist', dep_name=department,
+        slot_minutes=slot_minutes, buffer_minutes=buffer_minutes,
+    )
+    for day, start, end in hours:
+        DoctorAvailability.objects.create(doctor=doctor, day=day, start_time=datetime.time(start), end_time=datetime.time(end))
+    # Reload for the weekly summary written by the availability signal
+    return Doctors.objects.select_related('dep_name').get(pk=doctor.pk)
+
+
+def make_booking(doctor, date, time, **kwargs):
+    fields = {'p_name': 'Patient', 'p_phone': '9876543210', 'p_email': 'patient@example.com', 'status': 'accepted'}
+    fields.update(kwargs)
+    return Booking.objects.create(doc_name=doctor, booking_date=date, appointment_time=time, **fields)
+
+
+def run_inline(func, *args, **kwargs):
+    func(*args, **kwargs)
+
+
+@mock.patch('bookings.signals.run_in_background', run_inline)
+class WaitlistThroughputTests(TestCase):
+    """A doctor's day being cleared at once must offer every freed slot, FIFO, at a flat query cost"""
+
+    CANCELLATIONS = 32
+    # Queries per cancellation: the save and its event, the offer's checks, lock and held booking
+    QUERY_BUDGET = 17
+
+    def setUp(self):
+        self.doctor = make_doctor(buffer_minutes=0, hours=((0, 8, 17),))
+        self.date = next_weekday(0)
+        start = datetime.datetime.combine(self.date, datetime.time(8))
+        self.bookings = [
+            make_booking(self.doctor, self.date, (start + datetime.timedelta(minutes=15 * i)).time())
+            for i in range(self.CANCELLATIONS)
+        ]
+        self.entries = [
+            WaitlistEntry.objects.create(
+                user=User.objects.create(username=f'waiter{i}'), doctor=self.doctor,
+                p_name=f'Waiter {i}', p_phone='9876543210', p_email=f'waiter{i}@example.com',
+                date_from=self.date, date_to=self.date,
+            )
+            for i in range(self.CANCELLATIONS)
+        ]
+
+    def cancel_all(self):
+        for booking in self.bookings:
+            booking.status = 'cancelled'
+            booking.save()
+
+    def test_mass_cancellation_offers_every_slot_in_queue_order(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.cancel_all()
+
+        offered = [WaitlistEntry.objects.select_related('offered_booking').get(pk=entry.pk) for entry in self.entries]
+        self.assertTrue(all(entry.status == 'offered' for entry in offered))
+        self.assertEqual(
+            [entry.offered_booking.appointment_time for entry in offered],
+            [booking.appointment_time for booking in self.bookings],
+        )
+        self.assertLessEqual(len(queries), self.CANCELLATIONS * self.QUERY_BUDGET)
+
+    def test_cancellations_on_a_leave_day_offer_nothing(self):
+        DoctorLeave.objects.create(doctor=self.doctor, date=self.date, reason='Conference')
+        self.cancel_all()
+        self.assertFalse(WaitlistEntry.objects.exclude(status='waiting').exists())
+
+
+class WaitlistHoldTests(TestCase):
+    def setUp(self):
+        self.doctor = make_doctor(buffer_minutes=0)
+        self.date = next_weekday(0)
+        self.time = datetime.time(10)
+        self.entries = [
+            WaitlistEntry.objects.create(
+                user=User.objects.create(username=f'waiter{i}'), doctor=self.doctor,
+                p_name=f'Waiter {i}', p_phone='9876543210', p_email=f'waiter{i}@example.com',
+                date_from=self.date, date_to=self.date,
+            )
+            for i in range(2)
+        ]
+        self.entry = offer_freed_slot(self.doctor.id, self.date, self.time)
+
+    def test_accept_within_the_hold(self):
+        self.assertTrue(accept_offer(self.entry))
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.status, 'booked')
+        self.assertEqual(self.entry.offered_booking.status, 'pending')
+
+    @mock.patch('bookings.signals.run_in_background', run_inline)
+    def test_accept_after_the_hold_lapsed_releases_the_slot(self):
+        later = self.entry.hold_expires_at + datetime.timedelta(seconds=1)
+        self.assertFalse(accept_offer(self.entry, now=later))
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.status, 'expired')
+        self.assertEqual(self.entry.offered_booking.status, 'cancelled')
+        # The freed slot cascaded to the next waiter
+        self.assertEqual(WaitlistEntry.objects.get(pk=self.entries[1].pk).status, 'offered')
+
+    def test_accept_after_release_fails(self):
+        # process_waitlist got there first with a stale copy of the entry in hand
+        stale = WaitlistEntry.objects.get(pk=self.entry.pk)
+        self.assertEqual(expire_lapsed_holds(now=self.entry.hold_expires_at + datetime.timedelta(seconds=1)), 1)
+        self.assertFalse(accept_offer(stale, now=timezone.now()))
+        self.assertEqual(WaitlistEntry.objects.get(pk=self.entry.pk).status, 'expired')
+
+
+class BookingFormQueryTests(TestCase):
+    """BookingForm validation stays within its query budget whatever the outcome.
+
+    is_valid() costs the doctor lookup, the model's foreign key check and the
+    rules' own queries: the doctor's leave and bookings that day.
+    """
+
+    def setUp(self):
+        self.doctor = make_doctor()
+        self.date = next_weekday(0)
+
+    def form(self, time):
+        return BookingForm(data={
+            'p_name': 'Patient', 'p_phone': '9876543210', 'p_email': 'patient@example.com',
+            'doc_name': self.doctor.pk, 'booking_date': self.date.isoformat(), 'appointment_time': time,
+        })
+
+    def test_valid_booking(self):
+        form = self.form('10:00')
+        with self.assertNumQueries(4):
+            self.assertTrue(form.is_valid())
+
+    def test_conflicting_booking(self):
+        make_booking(self.doctor, self.date, datetime.time(10))
+        form = self.form('10:00')
+        with self.assertNumQueries(4):
+            self.assertFalse(form.is_valid())
+        self.assertIn('already booked', ' '.join(form.errors['appointment_time']))
+
+    def test_buffer_conflict(self):
+        make_booking(self.doctor, self.date, datetime.time(10))
+        form = self.form('10:15')
+        with self.assertNumQueries(4):
+            self.assertFalse(form.is_valid())
+        self.assertIn('at least 15 minutes apart', ' '.join(form.errors['appointment_time']))
+
+    def test_rules_alone(self):
+        make_booking(self.doctor, self.date, datetime.time(10))
+        # Working hours come from the doctor row, so only leave and bookings are read
+        with self.assertNumQueries(2):
+            self.assertEqual(validate_booking(BookingContext(self.doctor, self.date, datetime.time(11))), [])
+        with self.assertNumQueries(1):
+            errors = validate_booking(BookingContext(self.doctor, self.date, datetime.time(18)))
+        self.assertIn('outside', errors[0][1])
+
+
+class SlotGridTests(TestCase):
+    """Interval and buffer rules follow each doctor's own settings"""
+
+    def setUp(self):
+        self.date = next_weekday(0)
+
+    def errors(self, doctor, hour, minute):
+        return validate_booking(BookingContext(doctor, self.date, datetime.time(hour, minute)))
+
+    def test_interval_follows_the_slot_length(self):
+        doctor = make_doctor(slot_minutes=10, buffer_minutes=0)
+        self.assertEqual(self.errors(doctor, 9, 10), [])
+        (field, message), = self.errors(doctor, 9, 15)
+        self.assertEqual(field, 'appointment_time')
+        self.assertIn('10-minute intervals (e.g., 9:00, 9:10, 9:20, 9:30)', message)
+
+    def test_examples_start_on_the_grid(self):
+        doctor = make_doctor(slot_minutes=45, buffer_minutes=0)
+        (_, message), = self.errors(doctor, 9, 30)
+        self.assertIn('(e.g., 9:00, 9:45, 10:30, 11:15)', message)
+
+    def test_zero_buffer_allows_back_to_back(self):
+        doctor = make_doctor(slot_minutes=20, buffer_minutes=0)
+        make_booking(doctor, self.date, datetime.time(10))
+        self.assertEqual(self.errors(doctor, 10, 20), [])
+        self.assertIn('already booked', self.errors(doctor, 10, 0)[0][1])
+
+    def test_buffer_wider_than_the_slot(self):
+        doctor = make_doctor(slot_minutes=10, buffer_minutes=30)
+        make_booking(doctor, self.date, datetime.time(10))
+        self.assertIn('at least 30 minutes apart', self.errors(doctor, 9, 40)[0][1])
+        self.assertIn('at least 30 minutes apart', self.errors(doctor, 10, 30)[0][1])
+        self.assertEqual(self.errors(doctor, 9, 20), [])
+        self.assertEqual(self.errors(doctor, 10, 40), [])
+
+    def test_cancelled_bookings_do_not_block(self):
+        doctor = make_doctor(slot_minutes=15, buffer_minutes=60)
+        make_booking(doctor, self.date, datetime.time(10), status='cancelled')
+        self.assertEqual(self.errors(doctor, 10, 15), [])
+
+    def test_form_uses_the_doctors_grid(self):
+        field = BookingForm().fields['appointment_time']
+        # Every slot length is a multiple of 5 minutes
+        self.assertEqual(field.widget.attrs['step'], '300')
+        doctor = make_doctor(slot_minutes=20)
+        form = BookingForm(data={
+            'p_name': 'Patient', 'p_phone': '9876543210', 'p_email': 'patient@example.com',
+            'doc_name': doctor.pk, 'booking_date': self.date.isoformat(), 'appointment_time': '10:10',
+        })
+        self.assertFalse(form.is_valid())
+        field = form.fields['appointment_time']
+        self.assertEqual(field.widget.attrs['step'], '1200')
+        self.assertEqual(field.help_text, 'Please select time in 20-minute intervals.')
+        self.assertIn('step="1200"', str(form['appointment_time']))
+
+    def test_slots_api_reports_the_grid(self):
+        doctor = make_doctor(slot_minutes=30, buffer_minutes=45)
+        self.client.force_login(User.objects.create(username='patient'))
+        data = self.client.get('/api/available-slots/', {'doctor_id': doctor.pk, 'date': self.date.isoformat()}).json()
+        self.assertEqual((data['slot_minutes'], data['buffer_minutes']), (30, 45))
+
+
+class CascadeDeleteTests(TestCase):
+    def setUp(self):
+        self.doctor = make_doctor()
+        self.date = next_weekday(0)
+        self.bookings = [make_booking(self.doctor, self.date, datetime.time(hour)) for hour in (10, 11)]
+
+    def test_deleting_a_booking_records_an_event(self):
+        booking_id = self.bookings[0].id
+        Booking.objects.filter(pk=booking_id).delete()
+        self.assertTrue(BookingEvent.objects.filter(booking_ref=booking_id, kind='deleted').exists())
+
+    def test_deleting_a_doctor_with_bookings(self):
+        self.doctor.delete()
+        self.assertFalse(Booking.objects.exists())
+        self.assertFalse(BookingEvent.objects.exists())
+
+    def test_deleting_a_department_with_bookings(self):
+        self.doctor.dep_name.delete()
+        self.assertFalse(Doctors.objects.exists())
+        self.assertFalse(Booking.objects.exists())
+        self.assertFalse(BookingEvent.objects.exists())
+
+
+def sse_data(chunk):
+    return json.loads(chunk.split('data: ', 1)[1])
+
+
+class SlotEventStreamTests(TestCase):
+    def setUp(self):
+        self.doctor = make_doctor()
+        self.date = next_weekday(0)
+        make_booking(self.doctor, self.date, datetime.time(10))
+
+    async def test_stream_starts_with_the_booked_times(self):
+        stream = slot_event_stream(self.doctor.id, self.date)
+        try:
+            self.assertTrue((await anext(stream)).startswith('retry:'))
+            snapshot = await anext(stream)
+            self.assertTrue(snapshot.startswith('event: slots'))
+            self.assertEqual(sse_data(snapshot)['booked_times'], ['10:00'])
+
+            # Later changes are still pushed
+            await sync_to_async(make_booking)(self.doctor, self.date, datetime.time(11))
+            await sync_to_async(publish_slot_change)(self.doctor.id, self.date)
+            self.assertEqual(sse_data(await anext(stream))['booked_times'], ['10:00', '11:00'])
+        finally:
+            await stream.aclose()
+
+
+class DayViewCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.first = make_doctor(buffer_minutes=0)
+        self.department = self.first.dep_name
+        self.second = Doctors.objects.create(
+            doc_name='Bina Das', doc_spec='Cardiologist', dep_name=self.department, buffer_minutes=0,
+        )
+        DoctorAvailability.objects.create(doctor=self.second, day=0, start_time=datetime.time(9), end_time=datetime.time(17))
+        self.date = next_weekday(0)
+        get_day_view(self.department.id, self.date)
+
+    def booked(self, grid):
+        return {
+            (row['doctor_id'], slot['time']) for row in grid['doctors'] for slot in row['slots'] if 'booking_id' in slot
+        }
+
+    def test_cached_day_costs_no_queries(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(len(get_day_view(self.department.id, self.date)['doctors']), 2)
+
+    def test_bookings_for_two_doctors_both_show(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            make_booking(self.first, self.date, datetime.time(10))
+        with self.captureOnCommitCallbacks(execute=True):
+            make_booking(self.second, self.date, datetime.time(11))
+        # Only the two dropped rows are rebuilt, together
+        with self.assertNumQueries(2):
+            grid = get_day_view(self.department.id, self.date)
+        self.assertEqual(self.booked(grid), {(self.first.id, '10:00'), (self.second.id, '11:00')})
+        self.assertEqual([row['doctor_name'] for row in grid['doctors']], ['Asha Menon', 'Bina Das'])
+
+    def test_changes_made_outside_the_tenant_reach_its_cache(self):
+        # Background tasks and commands may run without the request's tenant
+        with mock.patch('bookings.dayview.current_tenant_id', return_value=None):
+            with self.captureOnCommitCallbacks(execute=True):
+                make_booking(self.first, self.date, datetime.time(10))
+            with self.captureOnCommitCallbacks(execute=True):
+                DoctorLeave.objects.create(doctor=self.second, date=self.date)
+        grid = get_day_view(self.department.id, self.date)
+        self.assertEqual(self.booked(grid), {(self.first.id, '10:00')})
+        self.assertTrue(grid['doctors'][1]['on_leave'])
+
+    def test_moving_a_doctor_refreshes_both_departments(self):
+        other = Departments.objects.create(dep_name='Neurology', dep_decription='Brain')
+        get_day_view(other.id, self.date)
+        doctor = Doctors.objects.get(pk=self.second.pk)
+        doctor.dep_name = other
+        with self.captureOnCommitCallbacks(execute=True):
+            doctor.save()
+        self.assertEqual([row['doctor_id'] for row in get_day_view(self.department.id, self.date)['doctors']], [self.first.id])
+        self.assertEqual([row['doctor_id'] for row in get_day_view(other.id, self.date)['doctors']], [self.second.id])
+
+
+class DayBoardTests(TestCase):
+    def setUp(self):
+        self.doctor = make_doctor()
+        self.date = next_weekday(0)
+        self.kept, self.removed = (make_booking(self.doctor, self.date, datetime.time(hour)) for hour in (10, 11))
+
+    def test_delta_reports_deleted_bookings(self):
+        board = day_board(self.doctor.id, self.date)
+        self.assertEqual(board['deleted'], [])
+        removed_id = self.removed.id
+        self.removed.delete()
+
+        delta = day_board(self.doctor.id, self.date, since=board['version'])
+        self.assertEqual(delta['deleted'], [removed_id])
+        self.assertNotIn(removed_id, [row['id'] for row in delta['bookings']])
+
+    def test_delta_leaves_out_older_changes(self):
+        self.removed.delete()
+        board = day_board(self.doctor.id, self.date)
+        delta = day_board(self.doctor.id, self.date, since=board['version'])
+        self.assertEqual((delta['bookings'], delta['deleted'], delta['version']), ([], [], board['version']))
+
+    def test_delta_has_every_write_after_the_version(self):
+        board = day_board(self.doctor.id, self.date)
+        self.kept.status = 'completed'
+        self.kept.save()
+        self.removed.p_name = 'Renamed'
+        self.removed.save()
+        delta = day_board(self.doctor.id, self.date, since=board['version'])
+        self.assertFalse(delta['full'])
+        self.assertEqual([(row['id'], row['status'], row['patient']) for row in delta['bookings']], [
+            (self.kept.id, 'completed', 'Patient'), (self.removed.id, 'accepted', 'Renamed'),
+        ])
+        self.assertEqual(day_board(self.doctor.id, self.date, since=delta['version'])['bookings'], [])
+
+    def test_moved_bookings_leave_the_old_day(self):
+        board = day_board(self.doctor.id, self.date)
+        other_day = self.date + datetime.timedelta(days=7)
+        other_board = day_board(self.doctor.id, other_day)
+        self.removed.booking_date = other_day
+        self.removed.save()
+        delta = day_board(self.doctor.id, self.date, since=board['version'])
+        self.assertEqual((delta['bookings'], delta['deleted']), ([], [self.removed.id]))
+        delta = day_board(self.doctor.id, other_day, since=other_board['version'])
+        self.assertEqual([row['id'] for row in delta['bookings']], [self.removed.id])
+
+    def test_unknown_version_gets_the_full_board(self):
+        # e.g. a timestamp version served before the board used event ids
+        board = day_board(self.doctor.id, self.date, since=1_700_000_000_000_000)
+        self.assertTrue(board['full'])
+        self.assertEqual([row['id'] for row in board['bookings']], [self.kept.id, self.removed.id])
+
+
+class NextAvailableTests(TestCase):
+    def setUp(self):
+        self.doctor = make_doctor()
+        self.client.force_login(User.objects.create(username='patient'))
+
+    def test_invalid_department_is_a_bad_request(self):
+        response = self.client.get('/api/next-available/', {'department': 'cardiology'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Invalid parameters'})
+
+    def test_department_search(self):
+        response = self.client.get('/api/next-available/', {'department': self.doctor.dep_name_id})
+        self.assertEqual(response.status_code, 200)
+        slots = response.json()['slots']
+        self.assertTrue(slots)
+        self.assertTrue(all(slot['doctor_id'] == self.doctor.id for slot in slots))
+
+
+class DoctorSearchTests(TestCase):
+    def setUp(self):
+        cardiology = Departments.objects.create(dep_name='Cardiology', dep_decription='Heart')
+        aesthetics = Departments.objects.create(dep_name='Ästhetische Medizin', dep_decription='Skin')
+        for name, spec, department in (
+            ('Élodie Martin', 'Cardiologist', cardiology),
+            ('Øyvind Berg', 'Cardiologist', cardiology),
+            ('Asha Menon', 'Großhirnchirurgie', cardiology),
+            ('Ravi Kumar', 'Dermatologist', aesthetics),
+        ):
+            Doctors.objects.create(doc_name=name, doc_spec=spec, dep_name=department)
+        self.client.force_login(User.objects.create(username='patient'))
+
+    def search(self, query):
+        response = self.client.get('/api/doctors/search/', {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return sorted(result['label'].split(' - ')[0][3:] for result in response.json()['results'])
+
+    def test_non_ascii_prefixes_ignore_case(self):
+        self.assertEqual(self.search('élo'), ['Élodie Martin'])
+        self.assertEqual(self.search('ØY'), ['Øyvind Berg'])
+        # casefold() folds ß to ss on both sides
+        self.assertEqual(self.search('GROSSHIRN'), ['Asha Menon'])
+        self.assertEqual(self.search('ästh'), ['Ravi Kumar'])
+
+    def test_ascii_prefixes(self):
+        self.assertEqual(self.search('cardio'), ['Asha Menon', 'Élodie Martin', 'Øyvind Berg'])
+        self.assertEqual(self.search('ravi'), ['Ravi Kumar'])
+        self.assertEqual(self.search('lodie'), [])
+
+    def test_renames_refresh_the_key(self):
+        doctor = Doctors.objects.get(doc_name='Ravi Kumar')
+        doctor.doc_name = 'Ömer Şahin'
+        doctor.save()
+        self.assertEqual(self.search('öMER'), ['Ömer Şahin'])
+
+
+def utc(*args):
+    return datetime.datetime(*args, tzinfo=datetime.timezone.utc)
+
+
+class ClockChangeTests(SimpleTestCase):
+    """Slot instants around America/New_York's 2026 transitions (Mar 8 spring forward, Nov 1 fall back)"""
+
+    tz = zoneinfo.ZoneInfo('America/New_York')
+    half_hours = range(0, 24 * 60, 30)
+
+    def test_spring_forward_drops_skipped_slots(self):
+        date = datetime.date(2026, 3, 8)
+        instants = slot_instants(date, self.half_hours, self.tz)
+        # 02:00 and 02:30 never happen
+        self.assertEqual(len(instants), 46)
+        self.assertNotIn(120, instants)
+        self.assertNotIn(150, instants)
+        self.assertEqual(instants[90], utc(2026, 3, 8, 6, 30))   # 01:30 EST
+        self.assertEqual(instants[180], utc(2026, 3, 8, 7, 0))   # 03:00 EDT
+        self.assertFalse(wall_time_exists(date, datetime.time(2, 30), self.tz))
+        self.assertTrue(wall_time_exists(date, datetime.time(3), self.tz))
+
+    def test_fall_back_resolves_repeated_times_to_the_first_occurrence(self):
+        date = datetime.date(2026, 11, 1)
+        instants = slot_instants(date, self.half_hours, self.tz)
+        self.assertEqual(len(instants), 48)
+        self.assertEqual(instants[60], utc(2026, 11, 1, 5, 0))    # 01:00 EDT, not EST
+        self.assertEqual(instants[90], utc(2026, 11, 1, 5, 30))
+        self.assertEqual(instants[120], utc(2026, 11, 1, 7, 0))   # 02:00 EST
+        self.assertEqual(to_utc(date, datetime.time(1, 30), self.tz), utc(2026, 11, 1, 5, 30))
+        self.assertTrue(wall_time_exists(date, datetime.time(1, 30), self.tz))
+
+    def test_other_days_use_a_single_offset(self):
+        for date, offset in ((datetime.date(2026, 7, 15), 4), (datetime.date(2026, 1, 15), 5)):
+            with mock.patch('bookings.slots.to_utc') as per_slot:
+                instants = slot_instants(date, self.half_hours, self.tz)
+            per_slot.assert_not_called()
+            self.assertEqual(len(instants), 48)
+            self.assertEqual(instants[9 * 60], utc(date.year, date.month, date.day, 9 + offset))
+
+
+class ClinicTimezoneTests(TestCase):
+    """Bookings are stamped with their UTC start in the department's timezone"""
+
+    def setUp(self):
+        self.doctor = make_doctor(timezone_name='America/New_York', hours=((6, 0, 6),))
+
+    def test_repeated_time_is_stamped_with_the_first_occurrence(self):
+        booking = make_booking(self.doctor, datetime.date(2026, 11, 1), datetime.time(1, 30))
+        self.assertEqual(booking.starts_at, utc(2026, 11, 1, 5, 30))
+
+    def test_changing_the_department_timezone_restamps_its_bookings(self):
+        booking = make_booking(self.doctor, datetime.date(2026, 11, 1), datetime.time(1, 30))
+        department = Departments.objects.get(pk=self.doctor.dep_name_id)
+        department.timezone = 'America/Chicago'
+        department.save()
+        booking.refresh_from_db()
+        self.assertEqual(booking.starts_at, utc(2026, 11, 1, 6, 30))
+
+    def test_skipped_times_cannot_be_booked(self):
+        skipped = BookingContext(self.doctor, datetime.date(2026, 3, 8), datetime.time(2, 30))
+        self.assertIn('clocks go forward', check_clock_change(skipped)[0][1])
+        self.assertEqual(check_clock_change(BookingContext(self.doctor, datetime.date(2026, 3, 8), datetime.time(3))), [])
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        self.doctor = make_doctor()
+        self.other = make_doctor(timezone_name='Pacific/Kiritimati')
+        self.date = datetime.date(2026, 3, 10)
+        self.bookings = [
+            make_booking(doctor, self.date + datetime.timedelta(days=day), datetime.time(hour), status=status)
+            for doctor in (self.doctor, self.other)
+            for day, hour, status in ((0, 9, 'accepted'), (0, 10, 'completed'), (1, 9, 'cancelled'), (2, 9, 'pending'))
+        ]
+
+    def snapshot(self):
+        return sorted(BookingDailyRollup.objects.values_list('date', 'doctor_id', 'department_id', 'status', 'count'))
+
+    def test_incremental_run_matches_a_full_rebuild(self):
+        self.assertIsNone(run_rollup()[0])
+        first, moved, deleted, *_ = self.bookings
+        first.status = 'completed'
+        first.save()
+        moved.booking_date += datetime.timedelta(days=5)
+        moved.doc_name = self.other
+        moved.save()
+        deleted.delete()
+        make_booking(self.doctor, self.date + datetime.timedelta(days=9), datetime.time(9))
+
+        days, _ = run_rollup()
+        # The day of the status change and of the move's origin, its destination, the deletion and the new booking
+        self.assertEqual(days, 4)
+        incremental = self.snapshot()
+        run_rollup(full=True)
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_no_changes_recompute_nothing(self):
+        run_rollup()
+        before = self.snapshot()
+        self.assertEqual(run_rollup(), (0, 0))
+        self.assertEqual(self.snapshot(), before)
+
+    def test_no_shows_use_each_clinics_date(self):
+        run_rollup(full=True)
+        # Already the 11th in Kiritimati (UTC+14), still the 10th in UTC
+        with mock.patch('django.utils.timezone.now', return_value=utc(2026, 3, 10, 12)):
+            rates = {row['id']: row for row in booking_rates(self.date, self.date + datetime.timedelta(days=2))}
+        self.assertEqual(rates[self.doctor.id]['no_show'], 0)
+        self.assertEqual(rates[self.other.id]['no_show'], 1)
+        self.assertEqual(rates[self.other.id]['no_show_rate'], 50.0)
+        self.assertEqual(rates[self.other.id]['cancellation_rate'], 25.0)
+        # An explicit date applies everywhere
+        rates = booking_rates(self.date, self.date, by='department', today=datetime.date(2026, 3, 11))
+        self.assertEqual([row['no_show'] for row in rates], [1, 1])
+
+
+class CapacityTests(TestCase):
+    """The closed-form capacity maths agrees with walking the range day by day"""
+
+    def test_weekday_counts(self):
+        start = datetime.date(2026, 1, 1)
+        for offset in range(7):
+            for length in range(0, 40):
+                first = start + datetime.timedelta(days=offset)
+                last = first + datetime.timedelta(days=length)
+                counts = [0] * 7
+                for day in range(length + 1):
+                    counts[(first + datetime.timedelta(days=day)).weekday()] += 1
+                self.assertEqual(weekday_counts(first, last), counts, (first, last))
+
+    def test_empty_range(self):
+        for days_before in (1, 5, 30):
+            end = datetime.date(2026, 1, 2) - datetime.timedelta(days=days_before)
+            self.assertEqual(weekday_counts(datetime.date(2026, 1, 2), end), [0] * 7)
+
+    def test_offered_minutes_match_a_day_by_day_count(self):
+        # Overlapping Monday windows merge into 9:00-13:00
+        doctor = make_doctor(slot_minutes=20, hours=((0, 9, 12), (0, 11, 13), (2, 14, 17), (5, 8, 9)))
+        start, end = datetime.date(2026, 1, 7), datetime.date(2026, 3, 19)
+        leave = [datetime.date(2026, 1, 12), datetime.date(2026, 1, 13), datetime.date(2026, 2, 14)]
+        for date in leave:
+            DoctorLeave.objects.create(doctor=doctor, date=date)
+        make_booking(doctor, datetime.date(2026, 1, 19), datetime.time(9))
+        make_booking(doctor, datetime.date(2026, 1, 19), datetime.time(9, 20), status='cancelled')
+
+        expected = 0
+        date = start
+        while date <= end:
+            if date not in leave:
+                for window_start, window_end in doctor.hours_on(date.weekday()):
+                    minutes = window_start.hour * 60 + window_start.minute
+                    while minutes <= window_end.hour * 60 + window_end.minute:
+                        expected += 20
+                        minutes += 20
+            date += datetime.timedelta(days=1)
+
+        with self.assertNumQueries(3):
+            report = capacity_report(start, end)
+        row, = report['doctors']
+        self.assertEqual(row['offered_minutes'], expected)
+        self.assertEqual(row['booked_minutes'], 20)
+        self.assertEqual(report['departments'][0]['offered_minutes'], expected)
+        self.assertEqual(report['totals']['utilization'], round(100 * 20 / expected, 1))
+
+
+TINY_SCALE = {
+    'departments': 2, 'doctors': 4, 'patients': 10, 'bookings': 300, 'contacts': 12,
+    'history_days': 20, 'future_days': 10,
+}
+
+
+@mock.patch.dict(SCALES, {'tiny': TINY_SCALE})
+class SyntheticDataTests(TestCase):
+    today = datetime.date(2026, 6, 15)
+
+    def seed(self, seed=0):
+        return SyntheticData('tiny', seed=seed, today=self.today).run()
+
+    def snapshot(self):
+        """Everything generated, without the database ids"""
+        return {
+            'doctors': list(Doctors.objects.order_by('id').values_list(
+                'doc_name', 'doc_spec', 'dep_name__dep_name', 'slot_minutes', 'buffer_minutes', 'weekly_hours', 'user__username',
+            )),
+            'leaves': list(DoctorLeave.objects.order_by('doctor_id', 'date').values_list('doctor__doc_name', 'date', 'reason')),
+            'bookings': list(Booking.objects.order_by('id').values_list(
+                'doc_name__doc_name', 'booking_date', 'appointment_time', 'starts_at', 'status',
+                'p_name', 'p_phone', 'p_email', 'user__username',
+            )),
+            'contacts': list(Contact.objects.order_by('id').values_list('name', 'email', 'subject', 'message', 'is_read')),
+        }
+
+    def clear(self):
+        Departments.objects.all().delete()
+        Contact.objects.all().delete()
+        User.objects.all().delete()
+
+    def test_same_seed_gives_identical_rows(self):
+        totals = self.seed()
+        first = self.snapshot()
+        self.assertEqual(len(first['bookings']), totals['bookings'])
+        self.assertTrue(first['bookings'])
+        self.clear()
+        self.assertEqual(self.seed(), totals)
+        self.assertEqual(self.snapshot(), first)
+
+    def test_other_seeds_differ(self):
+        self.seed()
+        first = self.snapshot()
+        self.clear()
+        self.seed(seed=1)
+        self.assertNotEqual(self.snapshot()['bookings'], first['bookings'])
+
+    def test_seeded_bookings_reach_event_consumers(self):
+        run_rollup()
+        self.seed()
+        self.assertEqual(
+            set(BookingEvent.objects.filter(kind='created').values_list('booking_ref', flat=True)),
+            set(Booking.objects.values_list('id', flat=True)),
+        )
+        # The incremental run picks every seeded day up
+        days, _ = run_rollup()
+        self.assertEqual(days, Booking.objects.values('booking_date').distinct().count())
+        self.assertEqual(
+            sum(BookingDailyRollup.objects.values_list('count', flat=True)), Booking.objects.count(),
+        )
+
+    def test_unread_count_is_fresh_after_seeding(self):
+        self.assertEqual(unread_count(), 0)
+        self.seed()
+        self.assertEqual(unread_count(), Contact.objects.filter(is_read=False).count())
@@ -3,8 +3,15 @@ from . import views
 
 urlpatterns = [
     path('booking', views.booking, name='booking'),
+    path('booking/confirmation/<int:booking_id>/', views.booking_confirmation, name='booking_confirmation'),
     path('my-bookings/', views.my_bookings, name='my_bookings'),
     path('cancel-booking/<int:booking_id>/', views.cancel_booking, name='cancel_booking'),
+    path('waitlist/', views.waitlist, name='waitlist'),
+    path('waitlist/leave/<int:entry_id>/', views.leave_waitlist, name='leave_waitlist'),
+    path('waitlist/offer/<int:booking_id>/<str:action>/', views.respond_waitlist_offer, name='respond_waitlist_offer'),
     path('api/available-slots/', views.get_available_slots, name='get_available_slots'),
+    path('api/slot-events/', views.slot_events, name='slot_events'),
+    path('api/next-available/', views.next_available, name='next_available'),
+    path('api/doctors/search/', views.search_doctors, name='search_doctors'),
 ]
 
@@ -1,26 +1,55 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
-from .forms import BookingForm
-from doctors.models import DoctorAvailability, DoctorLeave, Doctors
-from .models import Booking
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+from django.utils import timezone
+from .forms import BookingForm, WaitlistForm
+from doctors.models import Departments, DoctorLeave, Doctors
+from doctors.search import search_key
+from .models import Booking, WaitlistEntry
+from .waitlist import accept_offer, decline_offer
+from .search import next_available_slots
+from .idempotency import create_once, find_replay, valid_key
+from .live import slot_event_stream
+from core.ratelimit import rate_limit
+from core.tenancy import tenant_lookup
 import datetime
 
 @login_required
 def booking(request):
     # Redirect admins and doctors to their dashboard
-    if request.user.is_superuser or hasattr(request.user, 'doctors'):
+    if request.is_privileged:
         return redirect('custom_admin_dashboard')
     
     if request.method == "POST":
+        key = request.POST.get('idempotency_key', '')
+        if not valid_key(key):
+            key = ''
+        # A refresh or retry of a submission that already went through
+        existing = find_replay(request.user, key) if key else None
+        if existing:
+            return redirect('booking_confirmation', booking_id=existing.booking_id)
+
         form = BookingForm(request.POST)
         if form.is_valid():
-            booking_instance = form.save(commit=False)
-            booking_instance.user = request.user  # Link booking to current user
-            booking_instance.save()
+            def create():
+                booking_instance = form.save(commit=False)
+                booking_instance.user = request.user  # Link booking to current user
+                booking_instance.save()
+                return booking_instance
+
+            if key:
+                record, replayed = create_once(request.user, key, create)
+                if replayed:
+                    return redirect('booking_confirmation', booking_id=record.booking_id)
+                booking_instance = record.booking
+            else:
+                booking_instance = create()
             messages.success(request, f'✅ Appointment booked successfully with Dr. {booking_instance.doc_name.doc_name} on {booking_instance.booking_date.strftime("%B %d, %Y")} at {booking_instance.appointment_time.strftime("%I:%M %p")}!')
-            return render(request, 'confirmation.html')
+            return redirect('booking_confirmation', booking_id=booking_instance.id)
     else:
         form = BookingForm()
     
@@ -29,6 +58,13 @@ def booking(request):
     }
     return render(request, 'booking.html', dict_form)
 
+@login_required
+def booking_confirmation(request, booking_id):
+    """Landing page after a booking POST, safe to refresh"""
+    booking = get_object_or_404(Booking.objects.select_related('doc_name'), id=booking_id, user=request.user)
+    return render(request, 'confirmation.html', {'booking': booking})
+
+@rate_limit('get_available_slots', json=True)
 @login_required
 def get_available_slots(request):
     """AJAX endpoint to get available time slots for a doctor on a specific date"""
@@ -39,11 +75,11 @@ def get_available_slots(request):
         return JsonResponse({'error': 'Missing parameters'}, status=400)
     
     try:
-        doctor = Doctors.objects.get(id=doctor_id)
+        doctor = Doctors.objects.select_related('dep_name').get(id=doctor_id)
         booking_date = datetime.datetime.strptime(date_str, '%Y-%m-%d').date()
         
-        # Check if date is in the past
-        if booking_date < datetime.date.today():
+        # Check if date is in the past at the doctor's clinic
+        if booking_date < doctor.dep_name.local_today():
             return JsonResponse({
                 'available': False,
                 'message': 'Cannot book for past dates'
@@ -60,12 +96,11 @@ def get_available_slots(request):
         # Get availability for the day
         day_of_week = booking_date.weekday()
         day_name = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'][day_of_week]
-        availability_slots = DoctorAvailability.objects.filter(doctor=doctor, day=day_of_week)
+        availability_slots = doctor.hours_on(day_of_week)
         
-        if not availability_slots.exists():
+        if not availability_slots:
             # Get available days
-            available_days = DoctorAvailability.objects.filter(doctor=doctor).values_list('day', flat=True).distinct()
-            day_names = [['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'][d] for d in available_days]
+            day_names = doctor.working_day_names
             
             return JsonResponse({
                 'available': False,
@@ -84,17 +119,21 @@ def get_available_slots(request):
         
         # Format available slots
         slots = []
-        for slot in availability_slots:
+        for start_time, end_time in availability_slots:
             slots.append({
-                'start': slot.start_time.strftime('%H:%M'),
-                'end': slot.end_time.strftime('%H:%M'),
-                'display': f"{slot.start_time.strftime('%I:%M %p')} - {slot.end_time.strftime('%I:%M %p')}"
+                'start': start_time.strftime('%H:%M'),
+                'end': end_time.strftime('%H:%M'),
+                'display': f"{start_time.strftime('%I:%M %p')} - {end_time.strftime('%I:%M %p')}"
             })
         
         return JsonResponse({
             'available': True,
             'slots': slots,
             'booked_times': booked_times_str,
+            'slot_minutes': doctor.slot_minutes,
+            'buffer_minutes': doctor.buffer_minutes,
+            # Slot and booked times are wall-clock times in this timezone
+            'timezone': doctor.dep_name.timezone,
             'message': f'Dr. {doctor.doc_name} is available on {day_name}'
         })
         
@@ -103,15 +142,104 @@ def get_available_slots(request):
     except ValueError:
         return JsonResponse({'error': 'Invalid date format'}, status=400)
 
+async def slot_events(request):
+    """Server-Sent Events stream of booked times for one doctor and date, pushed on every change"""
+    if not isinstance(request, ASGIRequest):
+        # Long-lived streams need the ASGI app; 204 tells EventSource not to reconnect
+        return HttpResponse(status=204)
+
+    is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+    if not is_authenticated:
+        return JsonResponse({'error': 'Login required'}, status=403)
+
+    try:
+        doctor_id = int(request.GET.get('doctor_id', ''))
+        booking_date = datetime.datetime.strptime(request.GET.get('date', ''), '%Y-%m-%d').date()
+    except ValueError:
+        return JsonResponse({'error': 'Invalid parameters'}, status=400)
+
+    response = StreamingHttpResponse(slot_event_stream(doctor_id, booking_date), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+@login_required
+def next_available(request):
+    """AJAX endpoint returning the earliest free slots across a department or specialty"""
+    department_id = request.GET.get('department')
+    specialty = request.GET.get('spec', '').strip()
+
+    if not department_id and not specialty:
+        return JsonResponse({'error': 'Missing parameters'}, status=400)
+
+    try:
+        department_id = int(department_id) if department_id else None
+        date_str = request.GET.get('date_from')
+        # Without a date, search from today at each doctor's clinic
+        start_date = datetime.datetime.strptime(date_str, '%Y-%m-%d').date() if date_str else None
+        days = min(max(int(request.GET.get('days', 14)), 1), 90)
+        limit = min(max(int(request.GET.get('limit', 10)), 1), 50)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid parameters'}, status=400)
+
+    doctors = Doctors.objects.all()
+    if department_id:
+        doctors = doctors.filter(dep_name_id=department_id)
+    if specialty:
+        doctors = doctors.filter(doc_spec__icontains=specialty)
+
+    end_date = (start_date or timezone.localdate()) + datetime.timedelta(days=days - 1)
+    slots = next_available_slots(doctors, start_date, end_date, limit=limit)
+    return JsonResponse({
+        'slots': slots,
+        'message': f'{len(slots)} slot(s) found' if slots else 'No free slots in this period',
+    })
+
+@login_required
+def search_doctors(request):
+    """AJAX typeahead for the booking form's doctor picker.
+
+    Matches doctors whose name or specialty starts with the query, ignoring case,
+    and every doctor of a department whose name starts with it. Names and the
+    query are folded by doctors.search.search_key, so this works beyond ASCII.
+    Prefixes are range scans on the (tenant, name_key/spec_key) indexes; a
+    substring search could not use an index.
+    """
+    query = search_key(request.GET.get('q', '').strip())
+    doctors = Doctors.objects.all()
+    if query:
+        # Sorts after every string starting with the prefix
+        upper = query + '\U0010ffff'
+        # Departments are few; resolving them first keeps every OR branch indexed
+        departments = list(Departments.objects.filter(name_key__gte=query, name_key__lt=upper).values_list('id', flat=True))
+        doctors = doctors.filter(
+            Q(name_key__gte=query, name_key__lt=upper) |
+            Q(spec_key__gte=query, spec_key__lt=upper) |
+            Q(dep_name_id__in=departments)
+        )
+    results = doctors.order_by('doc_name').values('id', 'doc_name', 'doc_spec', 'dep_name__dep_name')[:20]
+
+    return JsonResponse({
+        'results': [
+            {
+                'id': d['id'],
+                'label': f"Dr {d['doc_name']} - ({d['doc_spec']})",
+                'department': d['dep_name__dep_name'],
+            }
+            for d in results
+        ]
+    })
+
 @login_required
 def my_bookings(request):
     """View for users to see their booking history"""
     # Redirect admins and doctors to their dashboard
-    if request.user.is_superuser or hasattr(request.user, 'doctors'):
+    if request.is_privileged:
         return redirect('custom_admin_dashboard')
     
     # Get all bookings for current user
-    bookings = Booking.objects.filter(user=request.user)
+    bookings = Booking.objects.filter(user=request.user).select_related('doc_name', 'waitlist_offer')
     
     # Filter by status if provided
     status_filter = request.GET.get('status', 'all')
@@ -121,7 +249,6 @@ def my_bookings(request):
     # Search by doctor name or date
     search_query = request.GET.get('search', '').strip()
     if search_query:
-        from django.db.models import Q
         bookings = bookings.filter(
             Q(doc_name__doc_name__icontains=search_query) |
             Q(doc_name__doc_spec__icontains=search_query)
@@ -164,4 +291,56 @@ def cancel_booking(request, booking_id):
     
     return redirect('my_bookings')
 
+@login_required
+def waitlist(request):
+    """Join the waitlist for a doctor and see your waitlist entries"""
+    if request.is_privileged:
+        return redirect('custom_admin_dashboard')
+
+    if request.method == "POST":
+        form = WaitlistForm(request.POST)
+        if form.is_valid():
+            entry = form.save(commit=False)
+            entry.user = request.user
+            entry.save()
+            messages.success(request, f'✅ You are on the waitlist for Dr. {entry.doctor.doc_name}. We will hold the first freed slot between {entry.date_from.strftime("%B %d")} and {entry.date_to.strftime("%B %d, %Y")} for you.')
+            return redirect('waitlist')
+    else:
+        form = WaitlistForm()
 
+    entries = WaitlistEntry.objects.filter(user=request.user, **tenant_lookup('doctor__')).select_related('doctor', 'offered_booking').order_by('-created_at')
+    context = {
+        'form': form,
+        'entries': entries,
+    }
+    return render(request, 'waitlist.html', context)
+
+@login_required
+def leave_waitlist(request, entry_id):
+    """Remove yourself from a waitlist you are still waiting on"""
+    entry = get_object_or_404(WaitlistEntry, id=entry_id, user=request.user)
+    if request.method == 'POST' and entry.status == 'waiting':
+        entry.status = 'cancelled'
+        entry.save(update_fields=['status'])
+        messages.success(request, f'✅ You have left the waitlist for Dr. {entry.doctor.doc_name}.')
+    return redirect('waitlist')
+
+@login_required
+def respond_waitlist_offer(request, booking_id, action):
+    """Confirm or decline a slot held for you from the waitlist"""
+    entry = get_object_or_404(
+        WaitlistEntry.objects.select_related('offered_booking', 'doctor'),
+        offered_booking_id=booking_id, user=request.user, status='offered',
+    )
+
+    if request.method == 'POST':
+        if action == 'accept':
+            if not accept_offer(entry):
+                messages.error(request, '⌛ Sorry, this hold has expired and the slot has been released.')
+                return redirect('my_bookings')
+            messages.success(request, f'✅ Your appointment with Dr. {entry.doctor.doc_name} on {entry.offered_booking.booking_date.strftime("%B %d, %Y")} at {entry.offered_booking.appointment_time.strftime("%I:%M %p")} is confirmed!')
+        elif action == 'decline':
+            decline_offer(entry)
+            messages.info(request, 'The held slot has been released.')
+
+    return redirect('my_bookings')
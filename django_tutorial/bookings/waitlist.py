@@ -0,0 +1,113 @@
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.tenancy import tenant_lookup
+from doctors.models import Doctors
+from .models import Booking, WaitlistEntry
+from .rules import BookingContext, check_buffer, check_leave, validate_booking
+from .slots import to_utc
+
+# How long an offered slot is held for a waiting patient before it moves on
+HOLD_MINUTES = getattr(settings, 'WAITLIST_HOLD_MINUTES', 30)
+
+
+def next_waiter(doctor_id, date):
+    """Oldest waiting entry for the doctor whose range covers the date.
+
+    Served by the (doctor, status, created_at) index, so the lookup is an index
+    seek followed by a scan in queue order instead of a table scan.
+    """
+    return (
+        WaitlistEntry.objects.select_for_update()
+        .filter(doctor_id=doctor_id, status='waiting', date_from__lte=date, date_to__gte=date)
+        .order_by('created_at', 'id')
+        .first()
+    )
+
+
+def offer_freed_slot(doctor_id, date, time, now=None):
+    """Hold a freed slot for the first matching waiter; returns the entry or None"""
+    now = now or timezone.now()
+    expire_lapsed_holds(now)
+
+    doctor = Doctors.objects.select_related('dep_name').filter(pk=doctor_id).first()
+    if doctor is None or to_utc(date, time, doctor.dep_name.tzinfo) <= now:
+        return None
+
+    with transaction.atomic():
+        # Someone may have booked the slot (or the doctor taken leave) meanwhile
+        if validate_booking(BookingContext(doctor, date, time), rules=[check_leave, check_buffer]):
+            return None
+        entry = next_waiter(doctor_id, date)
+        if entry is None:
+            return None
+
+        entry.offered_booking = Booking.objects.create(
+            user=entry.user,
+            p_name=entry.p_name,
+            p_phone=entry.p_phone,
+            p_email=entry.p_email,
+            doc_name=doctor,
+            booking_date=date,
+            appointment_time=time,
+            status='held',
+        )
+        entry.status = 'offered'
+        entry.hold_expires_at = now + datetime.timedelta(minutes=HOLD_MINUTES)
+        entry.save(update_fields=['offered_booking', 'status', 'hold_expires_at'])
+    return entry
+
+
+def _locked_offer(entry, **filters):
+    """Re-read an open offer under a row lock (inside a transaction), None if it closed meanwhile.
+
+    Accepting, declining and expiring all go through here, so a patient's accept
+    and process_waitlist releasing the same hold cannot both win.
+    """
+    return WaitlistEntry.objects.select_for_update().filter(pk=entry.pk, status='offered', **filters).first()
+
+
+def _release(entry, entry_status, **filters):
+    """Close an offer and free its held booking, which cascades to the next waiter; False if already closed"""
+    with transaction.atomic():
+        entry = _locked_offer(entry, **filters)
+        if entry is None:
+            return False
+        entry.status = entry_status
+        entry.save(update_fields=['status'])
+        booking = entry.offered_booking
+        if booking and booking.status == 'held':
+            booking.status = 'cancelled'
+            booking.save()
+    return True
+
+
+def expire_lapsed_holds(now=None):
+    """Expire the active tenant's offers whose hold has lapsed; returns how many were expired"""
+    now = now or timezone.now()
+    lapsed = WaitlistEntry.objects.filter(status='offered', hold_expires_at__lt=now, **tenant_lookup('doctor__'))
+    return sum(_release(entry, 'expired', hold_expires_at__lt=now) for entry in lapsed)
+
+
+def accept_offer(entry, now=None):
+    """Turn a held slot into a pending booking; False if the hold has lapsed or the offer is closed"""
+    now = now or timezone.now()
+    with transaction.atomic():
+        locked = _locked_offer(entry, hold_expires_at__gte=now)
+        if locked is not None:
+            booking = locked.offered_booking
+            booking.status = 'pending'
+            booking.save()
+            locked.status = 'booked'
+            locked.save(update_fields=['status'])
+            return True
+    # Lapsed: free the slot now instead of waiting for process_waitlist
+    _release(entry, 'expired', hold_expires_at__lt=now)
+    return False
+
+
+def decline_offer(entry):
+    return _release(entry, 'cancelled')
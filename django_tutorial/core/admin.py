@@ -1,5 +1,10 @@
 from django.contrib import admin
-from .models import Contact
+from .models import Contact, Tenant
+
+@admin.register(Tenant)
+class TenantAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug', 'domain', 'database')
+    search_fields = ('name', 'slug', 'domain')
 
 @admin.register(Contact)
 class ContactAdmin(admin.ModelAdmin):
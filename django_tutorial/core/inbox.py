@@ -0,0 +1,74 @@
+from django.core.cache import cache
+
+from .models import Contact
+from .tenancy import current_tenant_id
+
+UNREAD_CACHE_KEY = 'contact-inbox:unread'
+TOTAL_CACHE_KEY = 'contact-inbox:total'
+# Safety net for changes made outside these helpers (e.g. Django admin deletes)
+UNREAD_CACHE_TIMEOUT = 300
+
+
+def _unread_key(tenant_id=None):
+    return f'{UNREAD_CACHE_KEY}:{tenant_id or current_tenant_id()}'
+
+
+def _total_key(tenant_id=None):
+    return f'{TOTAL_CACHE_KEY}:{tenant_id or current_tenant_id()}'
+
+
+def unread_count():
+    """Number of unread contact messages of the active tenant, counted once and then kept in the cache"""
+    return cache.get_or_set(
+        _unread_key(),
+        lambda: Contact.objects.filter(is_read=False).count(),
+        UNREAD_CACHE_TIMEOUT,
+    )
+
+
+def total_count():
+    """Number of contact messages of the active tenant, cached like unread_count()"""
+    return cache.get_or_set(_total_key(), Contact.objects.count, UNREAD_CACHE_TIMEOUT)
+
+
+def _adjust(key, delta):
+    if not delta:
+        return
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # Not cached yet, the next count recounts
+        pass
+
+
+def adjust_unread(delta, tenant_id=None):
+    _adjust(_unread_key(tenant_id), delta)
+
+
+def message_created(is_read, tenant_id=None):
+    _adjust(_total_key(tenant_id), 1)
+    if not is_read:
+        adjust_unread(1, tenant_id)
+
+
+def invalidate_unread(tenant_id=None):
+    cache.delete(_unread_key(tenant_id))
+
+
+def invalidate_counts(tenant_id=None):
+    cache.delete_many([_unread_key(tenant_id), _total_key(tenant_id)])
+
+
+def mark_read(queryset, is_read=True):
+    """Set is_read on every message in `queryset` with one UPDATE, returns rows changed"""
+    changed = queryset.filter(is_read=not is_read).update(is_read=is_read)
+    adjust_unread(-changed if is_read else changed)
+    return changed
+
+
+def delete_messages(queryset):
+    """Delete every message in `queryset` with one DELETE, returns rows deleted"""
+    deleted, _ = queryset.delete()
+    if deleted:
+        invalidate_counts()
+    return deleted
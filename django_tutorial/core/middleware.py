@@ -0,0 +1,123 @@
+import json
+import mimetypes
+import os
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+# Content-Encoding name -> file suffix, in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+DEFAULT_CACHE_CONTROL = 'public, max-age=60'
+
+
+def accepted_encodings(header):
+    """Return the set of content codings the client accepts (q > 0)"""
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if q > 0:
+            accepted.add(coding)
+    return accepted
+
+
+class StaticAssetMiddleware:
+    """Serve collected static files from STATIC_ROOT without hitting the URL resolver.
+
+    Files listed in the staticfiles manifest carry a content hash in their name and
+    are sent with immutable cache headers. Precompressed .br/.gz siblings written by
+    CompressedManifestStaticFilesStorage are picked via Accept-Encoding.
+    The file index is built once per process, so restart after collectstatic.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = urlparse(settings.STATIC_URL).path
+        self.root = settings.STATIC_ROOT
+        self._index = None
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD') and request.path_info.startswith(self.prefix):
+            response = self.serve(request, request.path_info[len(self.prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = self.build_index()
+        return self._index
+
+    def build_index(self):
+        """Map each collected file to its variants and whether it is content-hashed"""
+        index = {}
+        if not self.root or not os.path.isdir(self.root):
+            return index
+
+        immutable = set()
+        manifest_path = os.path.join(self.root, 'staticfiles.json')
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                immutable.update(json.load(f).get('paths', {}).values())
+
+        compressed_suffixes = tuple(suffix for _, suffix in ENCODINGS)
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                name = os.path.relpath(path, self.root).replace(os.sep, '/')
+                if name.endswith(compressed_suffixes):
+                    continue
+                variants = {}
+                for encoding, suffix in ENCODINGS:
+                    if os.path.exists(path + suffix):
+                        variants[encoding] = path + suffix
+                stat = os.stat(path)
+                index[name] = {
+                    'path': path,
+                    'variants': variants,
+                    'mtime': stat.st_mtime,
+                    'immutable': name in immutable,
+                    'content_type': mimetypes.guess_type(name)[0] or 'application/octet-stream',
+                }
+        return index
+
+    def serve(self, request, name):
+        entry = self.index.get(name)
+        if entry is None:
+            return None
+
+        if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), entry['mtime']):
+            response = HttpResponseNotModified()
+        else:
+            path, encoding = entry['path'], None
+            if entry['variants']:
+                accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+                for candidate, _ in ENCODINGS:
+                    if candidate in accepted and candidate in entry['variants']:
+                        path, encoding = entry['variants'][candidate], candidate
+                        break
+            response = FileResponse(
+                open(path, 'rb'), content_type=entry['content_type'], filename=os.path.basename(name),
+            )
+            if encoding:
+                response['Content-Encoding'] = encoding
+
+        response['Last-Modified'] = http_date(entry['mtime'])
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if entry['immutable'] else DEFAULT_CACHE_CONTROL
+        if entry['variants']:
+            response['Vary'] = 'Accept-Encoding'
+        return response
@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-19 14:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="contact",
+            index=models.Index(
+                fields=["is_read", "-submitted_at"], name="contact_read_submitted_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="contact",
+            index=models.Index(fields=["-submitted_at"], name="contact_submitted_idx"),
+        ),
+    ]
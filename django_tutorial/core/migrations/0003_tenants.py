@@ -0,0 +1,79 @@
+# Generated by Django 4.2 on 2026-10-19 15:13
+
+import core.tenancy
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_default_tenant(apps, schema_editor):
+    # Existing rows (and new ones created outside a tenant context) belong to this tenant
+    Tenant = apps.get_model('core', 'Tenant')
+    Tenant.objects.using(schema_editor.connection.alias).get_or_create(slug=core.tenancy.DEFAULT_TENANT_SLUG, defaults={'name': 'Default hospital'})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_contact_inbox_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tenant",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                ("slug", models.SlugField(unique=True)),
+                (
+                    "domain",
+                    models.CharField(
+                        blank=True, max_length=253, null=True, unique=True
+                    ),
+                ),
+                ("database", models.CharField(default="default", max_length=50)),
+            ],
+        ),
+        migrations.RunPython(
+            create_default_tenant, migrations.RunPython.noop, hints={'model_name': 'tenant'},
+        ),
+        migrations.AddField(
+            model_name="contact",
+            name="tenant",
+            field=models.ForeignKey(
+                db_constraint=False,
+                default=core.tenancy.current_tenant_id,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="core.tenant",
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="contact",
+            name="contact_read_submitted_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="contact",
+            name="contact_submitted_idx",
+        ),
+        migrations.AddIndex(
+            model_name="contact",
+            index=models.Index(
+                fields=["tenant", "is_read", "-submitted_at"],
+                name="contact_read_submitted_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="contact",
+            index=models.Index(
+                fields=["tenant", "-submitted_at"], name="contact_submitted_idx"
+            ),
+        ),
+    ]
@@ -1,6 +1,40 @@
 from django.db import models
 
-class Contact(models.Model):
+from .tenancy import TenantManager, current_tenant_id
+
+class Tenant(models.Model):
+    """A hospital served by this deployment, picked by the request's host"""
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(unique=True)
+    domain = models.CharField(max_length=253, unique=True, null=True, blank=True)
+    # settings.DATABASES alias holding this hospital's data
+    database = models.CharField(max_length=50, default='default')
+
+    def __str__(self):
+        return self.name
+
+class TenantModel(models.Model):
+    """Rows that belong to one tenant; `objects` only sees the active tenant's rows"""
+    # No database constraint: tenants with their own database don't hold the Tenant table
+    tenant = models.ForeignKey(
+        Tenant, on_delete=models.CASCADE, db_constraint=False, default=current_tenant_id, related_name='+',
+    )
+
+    objects = TenantManager()
+    all_tenants = models.Manager()
+
+    # Relation whose tenant a new row copies, so e.g. bookings made by a background task follow their doctor
+    tenant_parent = None
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.tenant_parent:
+            self.tenant_id = getattr(self, self.tenant_parent).tenant_id
+        super().save(*args, **kwargs)
+
+class Contact(TenantModel):
     name = models.CharField(max_length=100)
     email = models.EmailField()
     subject = models.CharField(max_length=200)
@@ -10,6 +44,10 @@ class Contact(models.Model):
     
     class Meta:
         ordering = ['-submitted_at']
+        indexes = [
+            models.Index(fields=['tenant', 'is_read', '-submitted_at'], name='contact_read_submitted_idx'),
+            models.Index(fields=['tenant', '-submitted_at'], name='contact_submitted_idx'),
+        ]
         verbose_name = 'Contact Message'
         verbose_name_plural = 'Contact Messages'
     
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+DEFAULT_BACKEND = 'core.pubsub.InProcessBroker'
+
+
+class InProcessBroker:
+    """Fan messages out to asyncio subscribers living in this process.
+
+    publish() may be called from any thread (e.g. a sync view's post_save handler);
+    each subscriber gets the message on its own event loop. A subscriber that falls
+    more than `queue_size` messages behind loses the oldest ones, which is fine for
+    messages that each carry the full current state.
+
+    Only pages served by this process are reached; deployments running several
+    ASGI processes should point PUBSUB_BACKEND at a shared (e.g. Redis) broker
+    with the same publish/subscribe/has_subscribers interface.
+    """
+
+    def __init__(self, queue_size=16):
+        self.queue_size = queue_size
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def has_subscribers(self, channel):
+        return bool(self._subscribers.get(channel))
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(self._deliver, queue, message)
+        return len(subscribers)
+
+    def _deliver(self, queue, message):
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(message)
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        """Async context manager yielding an asyncio.Queue of messages for `channel`"""
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(self.queue_size))
+        with self._lock:
+            self._subscribers[channel].add(subscriber)
+        try:
+            yield subscriber[1]
+        finally:
+            with self._lock:
+                self._subscribers[channel].discard(subscriber)
+                if not self._subscribers[channel]:
+                    del self._subscribers[channel]
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    """The process-wide broker configured by settings.PUBSUB_BACKEND"""
+    return import_string(getattr(settings, 'PUBSUB_BACKEND', DEFAULT_BACKEND))()
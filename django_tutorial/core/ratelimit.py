@@ -0,0 +1,134 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+from django.urls import Resolver404, resolve
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """Parse a '<count>/<period>' rate such as '60/m' into (count, seconds)"""
+    count, _, period = rate.partition('/')
+    return int(count), PERIODS[period[:1].lower()]
+
+
+def _consume(key, limit, period, now):
+    """Count one hit against a bucket, return seconds to wait or 0 if allowed.
+
+    The bucket refills continuously: hits from the previous window are weighted by
+    how much of it still overlaps the last `period` seconds. Each hit is a single
+    atomic cache.incr, so concurrent workers never lose counts.
+    """
+    window = int(now // period)
+    current_key = f'ratelimit:{key}:{window}'
+    # Keep each window for two periods so it can still be read as the previous one
+    cache.add(current_key, 0, period * 2)
+    try:
+        count = cache.incr(current_key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(current_key, 1, period * 2)
+        count = 1
+    previous = cache.get(f'ratelimit:{key}:{window - 1}', 0)
+    elapsed = (now % period) / period
+    if previous * (1 - elapsed) + count <= limit:
+        return 0
+    return max(1, int(period - now % period))
+
+
+def _client_ip(request):
+    """The address of the client, as seen by the outermost of RATE_LIMIT_PROXY_COUNT trusted proxies"""
+    proxies = getattr(settings, 'RATE_LIMIT_PROXY_COUNT', 0)
+    if proxies:
+        # Each proxy appends the address it received the request from; earlier entries can be forged
+        forwarded = [part.strip() for part in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if part.strip()]
+        if len(forwarded) >= proxies:
+            return forwarded[-proxies]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _session_key(request):
+    """A digest of the session cookie, so a browser is limited without loading its session"""
+    cookie = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    return hashlib.sha256(cookie.encode()).hexdigest()[:32] if cookie else None
+
+
+def check_rate(request, name, rate, now=None):
+    """Consume from the per-IP bucket and, when the client has a session cookie, the per-session bucket.
+
+    Only the request headers are read, no session, cache lookup of the tenant or
+    database query. Returns the Retry-After seconds, or 0 when the request is allowed.
+    """
+    limit, period = parse_rate(rate)
+    now = now if now is not None else time.time()
+    retry_after = _consume(f'{name}:ip:{_client_ip(request)}', limit, period, now)
+    session = _session_key(request)
+    if session:
+        retry_after = max(retry_after, _consume(f'{name}:session:{session}', limit, period, now))
+    return retry_after
+
+
+def _enforce(request, name, methods, json):
+    """The 429 response for a request over its limit, or None"""
+    rate = getattr(settings, 'RATE_LIMITS', {}).get(name)
+    if not rate or (methods is not None and request.method not in methods):
+        return None
+    retry_after = check_rate(request, name, rate)
+    if not retry_after:
+        return None
+    message = 'Too many requests, please try again later.'
+    if json:
+        response = JsonResponse({'error': message}, status=429)
+    else:
+        response = HttpResponse(message, status=429, content_type='text/plain')
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def rate_limit(name, methods=None, json=False):
+    """Reject requests over settings.RATE_LIMITS[name] with a 429 before the view runs.
+
+    `methods` restricts limiting to e.g. ('POST',) so form pages can still be viewed;
+    `json` returns the 429 as a JSON error for AJAX endpoints. RateLimitMiddleware
+    applies the limit before the tenant, session and role middleware run; without
+    it the view checks it here.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            if not getattr(request, 'rate_limit_checked', False):
+                response = _enforce(request, name, methods, json)
+                if response is not None:
+                    return response
+            return view_func(request, *args, **kwargs)
+        wrapped.rate_limit = (name, methods, json)
+        return wrapped
+    return decorator
+
+
+class RateLimitMiddleware:
+    """Apply the @rate_limit of the view a URL resolves to before any ORM or cache work.
+
+    Goes ahead of TenantMiddleware so a rejected request never resolves its tenant,
+    loads a session or looks up the user's role.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return self.get_response(request)
+        limit = getattr(match.func, 'rate_limit', None)
+        if limit is not None:
+            request.rate_limit_checked = True
+            response = _enforce(request, *limit)
+            if response is not None:
+                return response
+        return self.get_response(request)
@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .inbox import invalidate_unread, message_created
+from .models import Contact, Tenant
+from .tenancy import invalidate_tenant_hosts
+
+
+@receiver(post_save, sender=Contact)
+def contact_saved(sender, instance, created, **kwargs):
+    if created:
+        message_created(instance.is_read, instance.tenant_id)
+    else:
+        # A single-row save may have flipped is_read
+        invalidate_unread(instance.tenant_id)
+
+
+@receiver([post_save, post_delete], sender=Tenant)
+def tenant_changed(sender, instance, **kwargs):
+    # The old domain is unknown here, cached lookups of it expire on their own
+    invalidate_tenant_hosts(instance.domain)
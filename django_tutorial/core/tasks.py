@@ -0,0 +1,28 @@
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+# Shared pool for work that should not block the request/response cycle
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='background-task')
+
+
+def _run(func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception('Background task %s failed', getattr(func, '__name__', func))
+    finally:
+        # Worker threads keep their own DB connection, release it between tasks
+        close_old_connections()
+
+
+def run_in_background(func, *args, **kwargs):
+    """Run func in the background pool once the current transaction commits.
+
+    The task runs in a copy of the caller's context, so it keeps the active tenant.
+    """
+    transaction.on_commit(lambda: _executor.submit(contextvars.copy_context().run, _run, func, args, kwargs))
@@ -0,0 +1,162 @@
+import contextvars
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+
+# The hospital the current request (or task) works for, None outside a tenant context
+_current_tenant = contextvars.ContextVar('current_tenant', default=None)
+
+TENANT_HOST_CACHE_TIMEOUT = 300
+DEFAULT_TENANT_SLUG = getattr(settings, 'DEFAULT_TENANT', 'default')
+
+_default_tenant_id = None
+
+
+def get_current_tenant():
+    return _current_tenant.get()
+
+
+def set_current_tenant(tenant):
+    """Activate `tenant`, returns a token for reset_current_tenant()"""
+    return _current_tenant.set(tenant)
+
+
+def reset_current_tenant(token):
+    _current_tenant.reset(token)
+
+
+@contextmanager
+def tenant_context(tenant):
+    """Scope queries, new rows and database routing to `tenant` (e.g. in a management command)"""
+    token = set_current_tenant(tenant)
+    try:
+        yield tenant
+    finally:
+        reset_current_tenant(token)
+
+
+def each_tenant():
+    """Yield every tenant, active while the caller handles it (for cron-style commands)"""
+    from .models import Tenant
+
+    for tenant in Tenant.objects.order_by('id'):
+        with tenant_context(tenant):
+            yield tenant
+
+
+def default_tenant_id():
+    global _default_tenant_id
+    if _default_tenant_id is None:
+        from .models import Tenant
+        _default_tenant_id = Tenant.objects.filter(slug=DEFAULT_TENANT_SLUG).values_list('id', flat=True).first()
+    return _default_tenant_id
+
+
+def current_tenant_id():
+    """Default for TenantModel.tenant: the active tenant, else the default one"""
+    tenant = get_current_tenant()
+    return tenant.id if tenant is not None else default_tenant_id()
+
+
+def tenant_lookup(prefix=''):
+    """Filter kwargs limiting a related lookup to the active tenant, e.g. tenant_lookup('doctor__')"""
+    tenant = get_current_tenant()
+    return {f'{prefix}tenant_id': tenant.id} if tenant is not None else {}
+
+
+def tenant_cache_key(key):
+    """Per-tenant variant of a cache key for values built from tenant-scoped queries"""
+    tenant = get_current_tenant()
+    return f'{key}:{tenant.id}' if tenant is not None else key
+
+
+class TenantQuerySet(models.QuerySet):
+    def for_tenant(self, tenant):
+        return self.filter(tenant=tenant)
+
+
+class TenantManager(models.Manager.from_queryset(TenantQuerySet)):
+    """Default manager that only sees the active tenant's rows.
+
+    Outside a tenant context (management commands, migrations, the shell) it
+    sees every row. Related-object access goes through the plain base manager,
+    so a booking's doctor is found whichever tenant is active.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        tenant = get_current_tenant()
+        if tenant is not None:
+            queryset = queryset.filter(tenant_id=tenant.id)
+        return queryset
+
+
+def resolve_tenant(host):
+    """Tenant serving `host` (cached), falling back to the default tenant"""
+    from .models import Tenant
+
+    host = host.split(':', 1)[0].lower()
+    key = f'tenant-host:{host}'
+    tenant = cache.get(key)
+    if tenant is None:
+        tenant = Tenant.objects.filter(domain=host).first() or Tenant.objects.filter(slug=DEFAULT_TENANT_SLUG).first()
+        if tenant is not None:
+            cache.set(key, tenant, TENANT_HOST_CACHE_TIMEOUT)
+    return tenant
+
+
+def invalidate_tenant_hosts(*hosts):
+    cache.delete_many([f'tenant-host:{host.lower()}' for host in hosts if host])
+
+
+class TenantMiddleware:
+    """Activate the tenant owning the request's host for the rest of the request.
+
+    Goes before SessionMiddleware so sessions and users are read from the
+    tenant's database when it has one (see TenantRouter).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.tenant = resolve_tenant(request.get_host())
+        token = set_current_tenant(request.tenant)
+        try:
+            return self.get_response(request)
+        finally:
+            reset_current_tenant(token)
+
+
+class TenantRouter:
+    """Send every query of a tenant with its own database (Tenant.database) there.
+
+    The tenant registry itself always lives in 'default'. Tenants without a
+    dedicated database share 'default' and are separated by the tenant column.
+    """
+
+    def _tenant_db(self, model):
+        if model._meta.label == 'core.Tenant':
+            return 'default'
+        tenant = get_current_tenant()
+        if tenant is not None and tenant.database != 'default':
+            return tenant.database
+        return None
+
+    def db_for_read(self, model, **hints):
+        return self._tenant_db(model)
+
+    def db_for_write(self, model, **hints):
+        return self._tenant_db(model)
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if app_label == 'core' and model_name == 'tenant':
+            return db == 'default'
+        # Data migrations written before tenants query through the router, which sends
+        # them to 'default'. Tenant databases start empty, so they only run the ones
+        # marked with hints={'tenant_databases': True}
+        if model_name is None and db != 'default' and not hints.get('tenant_databases'):
+            return False
+        return None
@@ -0,0 +1,228 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils.http import http_date
+
+from .inbox import delete_messages, mark_read, total_count, unread_count
+from .middleware import DEFAULT_CACHE_CONTROL, IMMUTABLE_CACHE_CONTROL, StaticAssetMiddleware, accepted_encodings
+
+from .models import Contact
+from .ratelimit import _consume
+
+CSS = b'body { color: #333; }\n' * 50
+
+
+class AcceptedEncodingsTests(SimpleTestCase):
+    def test_parsing(self):
+        self.assertEqual(accepted_encodings('gzip, deflate, br'), {'gzip', 'deflate', 'br'})
+        self.assertEqual(accepted_encodings('br;q=0, GZIP;q=0.5'), {'gzip'})
+        self.assertEqual(accepted_encodings('br;q=oops, gzip'), {'gzip'})
+        self.assertEqual(accepted_encodings(''), set())
+
+
+class StaticAssetMiddlewareTests(SimpleTestCase):
+    """A collected STATIC_ROOT with one hashed, precompressed file and one plain file"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.write('css/app.0123abcd.css', CSS)
+        self.write('css/app.0123abcd.css.gz', gzip.compress(CSS))
+        self.write('css/app.0123abcd.css.br', b'brotli bytes')
+        self.write('robots.txt', b'User-agent: *\n')
+        self.write('staticfiles.json', json.dumps({'paths': {'css/app.css': 'css/app.0123abcd.css'}}).encode())
+        self.mtime = os.stat(os.path.join(self.root, 'css/app.0123abcd.css')).st_mtime
+
+        settings = override_settings(STATIC_ROOT=self.root, STATIC_URL='/static/')
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.middleware = StaticAssetMiddleware(lambda request: HttpResponse('from the view'))
+        self.factory = RequestFactory()
+
+    def write(self, name, content):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(content)
+
+    def get(self, path, **headers):
+        response = self.middleware(self.factory.get(path, **headers))
+        self.addCleanup(response.close)
+        return response
+
+    def body(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_prefers_brotli(self):
+        response = self.get('/static/css/app.0123abcd.css', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(self.body(response), b'brotli bytes')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response['Content-Type'], 'text/css')
+
+    def test_gzip_when_brotli_is_refused(self):
+        response = self.get('/static/css/app.0123abcd.css', HTTP_ACCEPT_ENCODING='br;q=0, gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(self.body(response)), CSS)
+
+    def test_identity_without_accept_encoding(self):
+        response = self.get('/static/css/app.0123abcd.css')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(self.body(response), CSS)
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_hashed_files_are_immutable(self):
+        self.assertEqual(self.get('/static/css/app.0123abcd.css')['Cache-Control'], IMMUTABLE_CACHE_CONTROL)
+        plain = self.get('/static/robots.txt')
+        self.assertEqual(plain['Cache-Control'], DEFAULT_CACHE_CONTROL)
+        self.assertNotIn('Vary', plain)
+
+    def test_not_modified(self):
+        response = self.get('/static/css/app.0123abcd.css', HTTP_IF_MODIFIED_SINCE=http_date(self.mtime + 60))
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['Cache-Control'], IMMUTABLE_CACHE_CONTROL)
+        self.assertEqual(response['Last-Modified'], http_date(self.mtime))
+
+    def test_modified(self):
+        response = self.get('/static/css/app.0123abcd.css', HTTP_IF_MODIFIED_SINCE=http_date(self.mtime - 60))
+        self.assertEqual(response.status_code, 200)
+
+    def test_other_requests_reach_the_view(self):
+        for response in (
+            self.get('/static/css/missing.css'),
+            self.get('/static/css/app.0123abcd.css.gz'),
+            self.get('/doctors'),
+            self.middleware(self.factory.post('/static/robots.txt')),
+        ):
+            self.assertEqual(response.content, b'from the view')
+
+
+class UncollectedStaticTests(TestCase):
+    def test_pages_render_before_collectstatic(self):
+        response = self.client.get('/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '/static/css/style.css')
+
+
+def make_contact(**kwargs):
+    return Contact.objects.create(name='Ravi', email='ravi@example.com', subject='Hello', message='Hi', **kwargs)
+
+
+class InboxCounterTests(TestCase):
+    """The cached counts follow every change without recounting"""
+
+    def setUp(self):
+        cache.clear()
+        self.messages = [make_contact() for _ in range(3)] + [make_contact(is_read=True)]
+        self.assertEqual((unread_count(), total_count()), (3, 4))
+
+    def assertCounts(self, unread, total, queries=0):
+        with self.assertNumQueries(queries):
+            self.assertEqual((unread_count(), total_count()), (unread, total))
+
+    def test_counts_are_cached(self):
+        self.assertCounts(3, 4)
+
+    def test_new_messages_increment(self):
+        make_contact()
+        make_contact(is_read=True)
+        self.assertCounts(4, 6)
+
+    def test_marking_read_and_unread_adjusts(self):
+        self.assertEqual(mark_read(Contact.objects.filter(pk__in=[m.pk for m in self.messages[:2]])), 2)
+        self.assertCounts(1, 4)
+        self.assertEqual(mark_read(Contact.objects.all(), is_read=False), 3)
+        self.assertCounts(4, 4)
+
+    def test_single_save_recounts_unread(self):
+        message = self.messages[0]
+        message.is_read = True
+        message.save()
+        self.assertCounts(2, 4, queries=1)
+
+    def test_deleting_recounts(self):
+        self.assertEqual(delete_messages(Contact.objects.filter(pk=self.messages[0].pk)), 1)
+        self.assertCounts(2, 3, queries=2)
+
+
+class BulkMessagesTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        self.message = make_contact()
+
+    def test_non_numeric_ids_are_ignored(self):
+        response = self.client.post('/custom-admin/messages/bulk/', {
+            'action': 'mark_read', 'selected': [str(self.message.pk), 'abc', '1.5', '²'],
+        })
+        self.assertRedirects(response, '/custom-admin/messages/', fetch_redirect_response=False)
+        self.message.refresh_from_db()
+        self.assertTrue(self.message.is_read)
+
+
+
+class SlidingWindowTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def hits(self, now, count):
+        return [_consume('test', 10, 60, now) for _ in range(count)]
+
+    def test_limit_within_a_window(self):
+        self.assertEqual(self.hits(120, 10), [0] * 10)
+        # Retry when the window rolls over
+        self.assertEqual(self.hits(150, 1), [30])
+
+    def test_previous_window_is_weighted_by_its_overlap(self):
+        self.hits(120, 10)
+        # Halfway into the next window the 10 earlier hits count as 5
+        self.assertEqual(self.hits(210, 6), [0] * 5 + [30])
+        # A full window later they no longer count
+        self.assertEqual(self.hits(300, 10), [0] * 10)
+
+
+@override_settings(RATE_LIMITS={'signup': '2/m', 'get_available_slots': '1/m'})
+class RateLimitMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_rejected_before_any_query(self):
+        for _ in range(2):
+            self.assertNotEqual(self.client.post('/accounts/signup/', {}).status_code, 429)
+        with self.assertNumQueries(0):
+            response = self.client.post('/accounts/signup/', {})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Content-Type'], 'text/plain')
+        self.assertTrue(1 <= int(response['Retry-After']) <= 60)
+
+    def test_only_limited_methods_count(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get('/accounts/signup/').status_code, 200)
+
+    def test_json_endpoints_get_a_json_error(self):
+        self.client.get('/api/available-slots/')
+        response = self.client.get('/api/available-slots/')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json(), {'error': 'Too many requests, please try again later.'})
+        self.assertIn('Retry-After', response)
+
+    @override_settings(RATE_LIMIT_PROXY_COUNT=1)
+    def test_clients_behind_a_proxy_have_their_own_bucket(self):
+        self.client.get('/api/available-slots/', HTTP_X_FORWARDED_FOR='spoofed, 10.0.0.1')
+        response = self.client.get('/api/available-slots/', HTTP_X_FORWARDED_FOR='10.0.0.2')
+        self.assertNotEqual(response.status_code, 429)
+        response = self.client.get('/api/available-slots/', HTTP_X_FORWARDED_FOR='10.0.0.1')
+        self.assertEqual(response.status_code, 429)
+
+    def test_a_session_is_limited_across_addresses(self):
+        self.client.force_login(User.objects.create_user('patient'))
+        self.client.get('/api/available-slots/', REMOTE_ADDR='10.0.0.1')
+        response = self.client.get('/api/available-slots/', REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, 429)
+
@@ -1,29 +1,28 @@
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from .models import Contact
+from .ratelimit import rate_limit
 
 def index(request):
     # Redirect logged-in doctors and admins to their dashboards
-    if request.user.is_authenticated:
-        if request.user.is_superuser or hasattr(request.user, 'doctors'):
-            return redirect('custom_admin_dashboard')
+    if request.is_privileged:
+        return redirect('custom_admin_dashboard')
     
     # Homepage accessible to everyone else (public or regular users)
     return render(request, 'index.html')
     
 def about(request):
     # Redirect logged-in doctors and admins to their dashboards
-    if request.user.is_authenticated:
-        if request.user.is_superuser or hasattr(request.user, 'doctors'):
-            return redirect('custom_admin_dashboard')
+    if request.is_privileged:
+        return redirect('custom_admin_dashboard')
     
     return render(request, 'about.html')
 
+@rate_limit('contact', methods=('POST',))
 def contact(request):
     # Redirect logged-in doctors and admins to their dashboards
-    if request.user.is_authenticated:
-        if request.user.is_superuser or hasattr(request.user, 'doctors'):
-            return redirect('custom_admin_dashboard')
+    if request.is_privileged:
+        return redirect('custom_admin_dashboard')
     
     if request.method == 'POST':
         name = request.POST.get('name')
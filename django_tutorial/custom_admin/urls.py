@@ -7,6 +7,7 @@ urlpatterns = [
     # Doctor Management
     path('doctors/', views.manage_doctors, name='manage_doctors'),
     path('doctors/add/', views.add_doctor, name='add_doctor'),
+    path('doctors/import/', views.import_directory, name='import_directory'),
     path('doctors/edit/<int:doctor_id>/', views.edit_doctor, name='edit_doctor'),
     path('doctors/delete/<int:doctor_id>/', views.delete_doctor, name='delete_doctor'),
     
@@ -16,13 +17,23 @@ urlpatterns = [
     path('departments/edit/<int:dept_id>/', views.edit_department, name='edit_department'),
     path('departments/delete/<int:dept_id>/', views.delete_department, name='delete_department'),
     
+    # Clinic Day View
+    path('day-view/', views.day_view, name='day_view'),
+    path('api/day-view/', views.day_view_api, name='day_view_api'),
+    path('analytics/', views.analytics, name='analytics'),
+    path('capacity/', views.capacity, name='capacity'),
+    path('api/capacity/', views.capacity_api, name='capacity_api'),
+
     # Contact Messages
     path('messages/', views.manage_messages, name='manage_messages'),
+    path('messages/bulk/', views.bulk_messages, name='bulk_messages'),
     path('messages/view/<int:message_id>/', views.view_message, name='view_message'),
     path('messages/delete/<int:message_id>/', views.delete_message, name='delete_message'),
 
     # Doctor Portal
     path('my-appointments/', views.my_appointments, name='my_appointments'),
+    path('today/', views.today_board, name='today_board'),
+    path('api/today/', views.today_board_api, name='today_board_api'),
     path('booking/status/<int:booking_id>/<str:new_status>/', views.update_booking_status, name='update_booking_status'),
     path('my-schedule/', views.schedule_management, name='schedule_management'),
     path('schedule/delete/<int:schedule_id>/', views.delete_schedule, name='delete_schedule'),
@@ -2,10 +2,35 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import user_passes_test
 from django.contrib import messages
 from django.contrib.auth.models import User
-from doctors.models import Doctors, Departments, DoctorAvailability, DoctorLeave
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse
+from doctors.models import Doctors, Departments, DoctorAvailability, DoctorLeave, timezone_names, validate_timezone
 from bookings.models import Booking
+from bookings.dayview import get_day_view
+from bookings.board import day_board
+from bookings.capacity import capacity_report
+from bookings.rollups import booking_rates
 from core.models import Contact
+from core.inbox import delete_messages, mark_read, total_count, unread_count
+from core.tasks import run_in_background
+from doctors import importer
+from doctors.directory import get_department_directory
+from doctors.thumbnails import generate_thumbnails
+from django.core.paginator import Paginator
+from django.utils.http import url_has_allowed_host_and_scheme
 from django.db.models import Q
+import datetime
+
+SLOT_SETTING_FIELDS = ('slot_minutes', 'buffer_minutes')
+
+def _read_slot_settings(request, doctor):
+    """Set the posted slot length and buffer on `doctor`, validated against the model's choices and bounds"""
+    for field in SLOT_SETTING_FIELDS:
+        value = request.POST.get(field, '').strip()
+        if value:
+            setattr(doctor, field, value)
+    doctor.clean_fields(exclude=[f.name for f in Doctors._meta.fields if f.name not in SLOT_SETTING_FIELDS])
 
 def is_privileged(user):
     """Allow both superusers and doctors to access the dashboard"""
@@ -26,7 +51,7 @@ def admin_dashboard(request):
         completed_bookings = Booking.objects.filter(doc_name=doctor, status='completed').count()
         
         # Recent bookings for this doctor only
-        recent_bookings = Booking.objects.filter(doc_name=doctor).order_by('-booked_on')[:5]
+        recent_bookings = Booking.objects.filter(doc_name=doctor).order_by('-created_at')[:5]
         
         context = {
             'is_doctor': True,
@@ -41,9 +66,9 @@ def admin_dashboard(request):
         total_doctors = Doctors.objects.count()
         total_bookings = Booking.objects.count()
         total_departments = Departments.objects.count()
-        total_messages = Contact.objects.count()
-        unread_messages = Contact.objects.filter(is_read=False).count()
-        recent_bookings = Booking.objects.all().order_by('-booked_on')[:5]
+        total_messages = total_count()
+        unread_messages = unread_count()
+        recent_bookings = Booking.objects.all().order_by('-created_at')[:5]
         recent_messages = Contact.objects.all()[:5]
         
         context = {
@@ -97,6 +122,8 @@ def add_doctor(request):
         
         try:
             department = Departments.objects.get(id=dep_name_id)
+            doctor = Doctors(doc_name=doc_name, doc_spec=doc_spec, dep_name=department, doc_image=doc_image)
+            _read_slot_settings(request, doctor)
             
             # Create user if credentials provided
             user = None
@@ -109,23 +136,48 @@ def add_doctor(request):
                 )
             
             # Create doctor
-            doctor = Doctors.objects.create(
-                user=user,
-                doc_name=doc_name,
-                doc_spec=doc_spec,
-                dep_name=department,
-                doc_image=doc_image
-            )
+            doctor.user = user
+            doctor.save()
+            # Resized thumbnails are built off the request path
+            if doctor.doc_image:
+                run_in_background(generate_thumbnails, doctor.id)
             
             messages.success(request, f'Doctor {doc_name} added successfully!')
             return redirect('manage_doctors')
+        except ValidationError as e:
+            messages.error(request, f'Error adding doctor: {" ".join(e.messages)}')
         except Exception as e:
             messages.error(request, f'Error adding doctor: {str(e)}')
     
     departments = Departments.objects.all()
-    context = {'departments': departments}
+    context = {'departments': departments, 'slot_choices': Doctors.SLOT_LENGTH_CHOICES}
     return render(request, 'custom_admin/add_doctor.html', context)
 
+@user_passes_test(is_superuser)
+def import_directory(request):
+    """Bulk import departments, doctors, logins and schedules from an uploaded CSV or JSON file"""
+    errors = []
+    if request.method == 'POST':
+        upload = request.FILES.get('file')
+        if not upload:
+            messages.error(request, 'Please choose a file to import.')
+        else:
+            fmt = 'json' if upload.name.lower().endswith('.json') else 'csv'
+            try:
+                totals = importer.import_directory(importer.read_rows(importer.text_stream(upload), fmt), dry_run=bool(request.POST.get('dry_run')))
+                verb = 'Validated' if request.POST.get('dry_run') else 'Imported'
+                messages.success(request, f"{verb} {totals['doctors']} doctor(s), {totals['departments']} new department(s), {totals['users']} login(s) and {totals['availabilities']} schedule slot(s); skipped {totals['skipped']} doctor(s) already in the directory.")
+                if not request.POST.get('dry_run'):
+                    return redirect('manage_doctors')
+            except importer.DirectoryImportError as e:
+                errors = e.errors
+                messages.error(request, f'Import aborted, {len(errors)} error(s) found. Nothing was saved.')
+            except (ValueError, UnicodeDecodeError) as e:
+                messages.error(request, f'Could not read the file: {str(e)}')
+
+    context = {'errors': errors[:200], 'error_count': len(errors), 'columns': importer.COLUMNS}
+    return render(request, 'custom_admin/import_directory.html', context)
+
 @user_passes_test(is_superuser)
 def edit_doctor(request, doctor_id):
     """Edit an existing doctor"""
@@ -136,8 +188,10 @@ def edit_doctor(request, doctor_id):
         doctor.doc_spec = request.POST.get('doc_spec')
         dep_name_id = request.POST.get('dep_name')
         
-        if request.FILES.get('doc_image'):
-            doctor.doc_image = request.FILES.get('doc_image')
+        new_image = request.FILES.get('doc_image')
+        if new_image:
+            doctor.doc_image = new_image
+            doctor.doc_image_hash = ''  # Old thumbnails no longer match
         
         # Handle user account creation/update
         username = request.POST.get('username', '').strip()
@@ -146,6 +200,7 @@ def edit_doctor(request, doctor_id):
         
         try:
             doctor.dep_name = Departments.objects.get(id=dep_name_id)
+            _read_slot_settings(request, doctor)
             
             # Determine if we should create/update user account
             if doctor.user:
@@ -185,7 +240,11 @@ def edit_doctor(request, doctor_id):
                     messages.success(request, f'✓ Doctor {doctor.doc_name} updated successfully!')
             
             doctor.save()
+            if new_image:
+                run_in_background(generate_thumbnails, doctor.id)
             return redirect('manage_doctors')
+        except ValidationError as e:
+            messages.error(request, f'Error updating doctor: {" ".join(e.messages)}')
         except Exception as e:
             messages.error(request, f'Error updating doctor: {str(e)}')
     
@@ -196,6 +255,7 @@ def edit_doctor(request, doctor_id):
         'departments': departments,
         'selected_dept_id': doctor.dep_name_id,  # Pass ID directly to avoid template comparison issues
         'users_without_doctors': users_without_doctors,
+        'slot_choices': Doctors.SLOT_LENGTH_CHOICES,
     }
     return render(request, 'custom_admin/edit_doctor.html', context)
 
@@ -218,11 +278,7 @@ def delete_doctor(request, doctor_id):
 @user_passes_test(is_superuser)
 def manage_departments(request):
     """View all departments"""
-    departments = Departments.objects.all()
-    
-    # Count doctors in each department
-    for dept in departments:
-        dept.doctor_count = Doctors.objects.filter(dep_name=dept).count()
+    departments = get_department_directory()
     
     context = {'departments': departments}
     return render(request, 'custom_admin/manage_departments.html', context)
@@ -233,18 +289,24 @@ def add_department(request):
     if request.method == 'POST':
         dep_name = request.POST.get('dep_name')
         dep_description = request.POST.get('dep_description')
+        dep_timezone = request.POST.get('timezone') or settings.TIME_ZONE
         
         try:
+            validate_timezone(dep_timezone)
             Departments.objects.create(
                 dep_name=dep_name,
-                dep_decription=dep_description
+                dep_decription=dep_description,
+                timezone=dep_timezone
             )
             messages.success(request, f'Department {dep_name} added successfully!')
             return redirect('manage_departments')
+        except ValidationError as e:
+            messages.error(request, f'Error adding department: {e.messages[0]}')
         except Exception as e:
             messages.error(request, f'Error adding department: {str(e)}')
     
-    return render(request, 'custom_admin/add_department.html')
+    context = {'timezones': timezone_names(), 'default_timezone': settings.TIME_ZONE}
+    return render(request, 'custom_admin/add_department.html', context)
 
 @user_passes_test(is_superuser)
 def edit_department(request, dept_id):
@@ -254,15 +316,20 @@ def edit_department(request, dept_id):
     if request.method == 'POST':
         department.dep_name = request.POST.get('dep_name')
         department.dep_decription = request.POST.get('dep_description')
+        department.timezone = request.POST.get('timezone') or department.timezone
         
         try:
+            validate_timezone(department.timezone)
+            # Changing the timezone re-stamps the department's bookings (see bookings.signals)
             department.save()
             messages.success(request, f'Department {department.dep_name} updated successfully!')
             return redirect('manage_departments')
+        except ValidationError as e:
+            messages.error(request, f'Error updating department: {e.messages[0]}')
         except Exception as e:
             messages.error(request, f'Error updating department: {str(e)}')
     
-    context = {'department': department}
+    context = {'department': department, 'timezones': timezone_names()}
     return render(request, 'custom_admin/edit_department.html', context)
 
 @user_passes_test(is_superuser)
@@ -279,16 +346,160 @@ def delete_department(request, dept_id):
     context = {'department': department}
     return render(request, 'custom_admin/delete_department.html', context)
 
+# ============= CLINIC DAY VIEW =============
+
+def _day_view_params(request):
+    """Department id and date from the query string (defaults: first department, today at that clinic)"""
+    department_id = request.GET.get('department') or Departments.objects.order_by('id').values_list('id', flat=True).first()
+    department_id = int(department_id) if department_id else None
+    date_str = request.GET.get('date')
+    if date_str:
+        date = datetime.datetime.strptime(date_str, '%Y-%m-%d').date()
+    else:
+        department = Departments.objects.filter(pk=department_id).only('timezone').first()
+        date = department.local_today() if department else datetime.date.today()
+    return department_id, date
+
+@user_passes_test(is_superuser)
+def day_view(request):
+    """Front-desk timeline of every doctor's slots in a department for one day"""
+    try:
+        department_id, date = _day_view_params(request)
+    except ValueError:
+        messages.error(request, 'Invalid department or date.')
+        return redirect('day_view')
+
+    grid = get_day_view(department_id, date) if department_id else {'doctors': []}
+
+    # Pivot into one row per time with a cell per doctor for the table
+    times = sorted({slot['time'] for row in grid['doctors'] for slot in row['slots']})
+    cells = {(row['doctor_id'], slot['time']): slot for row in grid['doctors'] for slot in row['slots']}
+    timeline = [
+        (time, [cells.get((row['doctor_id'], time)) for row in grid['doctors']])
+        for time in times
+    ]
+
+    context = {
+        'departments': Departments.objects.all(),
+        'selected_department_id': department_id,
+        'selected_date': date,
+        'doctors': grid['doctors'],
+        'timeline': timeline,
+    }
+    return render(request, 'custom_admin/day_view.html', context)
+
+@user_passes_test(is_superuser)
+def day_view_api(request):
+    """JSON version of the clinic day view"""
+    try:
+        department_id, date = _day_view_params(request)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid department or date'}, status=400)
+    if not department_id:
+        return JsonResponse({'error': 'No departments found'}, status=404)
+    return JsonResponse(get_day_view(department_id, date))
+
+def _date_range_params(request, days=30):
+    """Start and end dates from the query string (default: the last `days` days)"""
+    today = datetime.date.today()
+    start_str, end_str = request.GET.get('start'), request.GET.get('end')
+    start = datetime.datetime.strptime(start_str, '%Y-%m-%d').date() if start_str else today - datetime.timedelta(days=days)
+    end = datetime.datetime.strptime(end_str, '%Y-%m-%d').date() if end_str else today
+    if start > end:
+        raise ValueError('start is after end')
+    return start, end
+
+@user_passes_test(is_superuser)
+def analytics(request):
+    """Cancellation, rejection and no-show rates per doctor and department, read from the nightly rollups"""
+    try:
+        start, end = _date_range_params(request)
+    except ValueError:
+        messages.error(request, 'Invalid date range.')
+        return redirect('analytics')
+
+    context = {
+        'start': start,
+        'end': end,
+        'doctor_rates': booking_rates(start, end, by='doctor'),
+        'department_rates': booking_rates(start, end, by='department'),
+    }
+    return render(request, 'custom_admin/analytics.html', context)
+
+@user_passes_test(is_superuser)
+def capacity(request):
+    """Offered capacity vs booked slot-minutes per doctor and department"""
+    try:
+        start, end = _date_range_params(request)
+    except ValueError:
+        messages.error(request, 'Invalid date range.')
+        return redirect('capacity')
+
+    context = {'report': capacity_report(start, end), 'start': start, 'end': end}
+    return render(request, 'custom_admin/capacity.html', context)
+
+@user_passes_test(is_superuser)
+def capacity_api(request):
+    """JSON version of the capacity report"""
+    try:
+        start, end = _date_range_params(request)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid date range'}, status=400)
+    return JsonResponse(capacity_report(start, end))
+
 # ============= CONTACT MESSAGE MANAGEMENT =============
 
+MESSAGES_PER_PAGE = 25
+
 @user_passes_test(is_superuser)
 def manage_messages(request):
-    """View all contact messages"""
-    messages_list = Contact.objects.all()
-    
-    context = {'messages_list': messages_list}
+    """View contact messages a page at a time, optionally only read or unread ones"""
+    status = request.GET.get('status', '')
+    messages_list = Contact.objects.defer('message')
+    if status == 'unread':
+        messages_list = messages_list.filter(is_read=False)
+    elif status == 'read':
+        messages_list = messages_list.filter(is_read=True)
+
+    page_obj = Paginator(messages_list, MESSAGES_PER_PAGE).get_page(request.GET.get('page'))
+
+    context = {
+        'messages_list': page_obj,
+        'page_obj': page_obj,
+        'status': status,
+        'unread_messages': unread_count(),
+    }
     return render(request, 'custom_admin/manage_messages.html', context)
 
+@user_passes_test(is_superuser)
+def bulk_messages(request):
+    """Mark read/unread or delete the selected contact messages in one query"""
+    if request.method != 'POST':
+        return redirect('manage_messages')
+
+    action = request.POST.get('action')
+    # Tampered ids are ignored rather than reaching the query
+    selected_ids = [value for value in request.POST.getlist('selected') if value.isdecimal()]
+    selected = Contact.objects.filter(id__in=selected_ids)
+
+    if action == 'mark_read':
+        count = mark_read(selected)
+        messages.success(request, f'{count} message(s) marked as read.')
+    elif action == 'mark_unread':
+        count = mark_read(selected, is_read=False)
+        messages.success(request, f'{count} message(s) marked as unread.')
+    elif action == 'delete':
+        count = delete_messages(selected)
+        messages.success(request, f'{count} message(s) deleted.')
+    else:
+        messages.error(request, 'Please choose an action.')
+
+    # Return to the same inbox page and filter
+    next_url = request.POST.get('next')
+    if next_url and url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        return redirect(next_url)
+    return redirect('manage_messages')
+
 @user_passes_test(is_superuser)
 def view_message(request, message_id):
     """View a single contact message in detail"""
@@ -296,8 +507,8 @@ def view_message(request, message_id):
     
     # Mark as read when viewed
     if not message.is_read:
+        mark_read(Contact.objects.filter(id=message.id))
         message.is_read = True
-        message.save()
     
     context = {'message': message}
     return render(request, 'custom_admin/view_message.html', context)
@@ -308,7 +519,7 @@ def delete_message(request, message_id):
     message = get_object_or_404(Contact, id=message_id)
     
     if request.method == 'POST':
-        message.delete()
+        delete_messages(Contact.objects.filter(id=message.id))
         messages.success(request, 'Message deleted successfully!')
         return redirect('manage_messages')
     
@@ -353,7 +564,7 @@ def my_appointments(request):
         bookings = bookings.filter(booking_date__lte=date_to)
     
     # Order by booking date (most recent first)
-    bookings = bookings.order_by('-booking_date', '-booked_on')
+    bookings = bookings.order_by('-booking_date', '-created_at')
     
     # Count statistics
     total_count = Booking.objects.filter(doc_name=doctor).count()
@@ -374,6 +585,24 @@ def my_appointments(request):
     }
     return render(request, 'custom_admin/doctor/my_appointments.html', context)
 
+@user_passes_test(is_doctor)
+def today_board(request):
+    """Today's queue for the logged-in doctor, kept fresh by polling today_board_api"""
+    doctor = request.user.doctors
+    board = day_board(doctor.id, doctor.dep_name.local_today())
+    return render(request, 'custom_admin/doctor/today.html', {'board': board})
+
+@user_passes_test(is_doctor)
+def today_board_api(request):
+    """Today's bookings for the logged-in doctor; with ?since=<version> only the ones changed since"""
+    since = request.GET.get('since')
+    try:
+        since = int(since) if since else None
+    except ValueError:
+        return JsonResponse({'error': 'Invalid version'}, status=400)
+    doctor = request.user.doctors
+    return JsonResponse(day_board(doctor.id, doctor.dep_name.local_today(), since))
+
 @user_passes_test(is_doctor)
 def update_booking_status(request, booking_id, new_status):
     """Update status of a specific booking"""
@@ -384,6 +613,8 @@ def update_booking_status(request, booking_id, new_status):
         booking.save()
         messages.success(request, f'Appointment marked as {new_status}.')
     
+    if request.GET.get('next') == 'today':
+        return redirect('today_board')
     return redirect('my_appointments')
 
 @user_passes_test(is_doctor)
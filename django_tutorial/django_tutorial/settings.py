@@ -51,14 +51,19 @@ INSTALLED_APPS = [
     'crispy_forms',
     'crispy_bootstrap4',
     'custom_admin',
+    'api',
     ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.StaticAssetMiddleware',
+    'core.ratelimit.RateLimitMiddleware',
+    'core.tenancy.TenantMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.middleware.UserRoleMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -94,6 +99,48 @@ DATABASES = {
     }
 }
 
+# Hospitals are picked by host (core.Tenant.domain); unknown hosts get the
+# DEFAULT_TENANT one. A tenant whose `database` names another alias above has
+# all of its queries routed there.
+DEFAULT_TENANT = 'default'
+DATABASE_ROUTERS = ['core.tenancy.TenantRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Sessions are read from the cache and only fall back to the DB on a miss
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Per-view request limits ('<count>/<s|m|h|d>'), applied per client IP and per
+# session cookie. Counters live in the default cache, so use a shared cache
+# (e.g. Redis) when running several worker processes.
+RATE_LIMITS = {
+    'get_available_slots': '60/m',
+    'contact': '5/h',
+    'signup': '10/h',
+    'api': '300/m',
+}
+
+# Reverse proxies in front of the site; the client IP is then read from
+# X-Forwarded-For instead of REMOTE_ADDR (0 when clients connect directly)
+RATE_LIMIT_PROXY_COUNT = 0
+
+# Fan-out for live slot updates (Server-Sent Events, served by the ASGI app).
+# The in-process broker only reaches pages held by the same process.
+PUBSUB_BACKEND = 'core.pubsub.InProcessBroker'
+
+# Loads the doctor profile with the user so role checks need no extra query
+AUTHENTICATION_BACKENDS = [
+    'accounts.backends.RoleAwareModelBackend',
+]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
@@ -114,6 +161,20 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# New hashes use the first entry, the same on every host whatever libraries it has.
+# The others only verify existing hashes (Argon2 and bcrypt need argon2-cffi and
+# bcrypt installed) and are upgraded to the first on the next login.
+
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.0/topics/i18n/
 
@@ -135,6 +196,17 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = BASE_DIR / 'assets'
 
+# collectstatic writes content-hashed copies plus .gz/.br siblings into STATIC_ROOT,
+# which core.middleware.StaticAssetMiddleware serves with immutable cache headers
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'core.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.0/ref/settings/#default-auto-field
 
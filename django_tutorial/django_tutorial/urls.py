@@ -18,6 +18,7 @@ from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from django.conf.urls.static import static
+from doctors.views import doctor_thumbnail
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -26,4 +27,7 @@ urlpatterns = [
     path('', include('bookings.urls')),
     path('accounts/', include('accounts.urls')),
     path('custom-admin/', include('custom_admin.urls')),
+    path('api/', include('api.urls')),
+    # Thumbnail names are content hashes, so they can be cached forever
+    path(settings.MEDIA_URL.lstrip('/') + 'doctors/thumbs/<path:path>', doctor_thumbnail, name='doctor_thumbnail'),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -2,7 +2,7 @@ from django.contrib import admin
 from .models import Departments, Doctors, DoctorAvailability, DoctorLeave
 
 class DoctorsAdmin(admin.ModelAdmin):
-    list_display = ('id', 'doc_name', 'doc_spec', 'dep_name', 'user')
+    list_display = ('id', 'doc_name', 'doc_spec', 'dep_name', 'slot_minutes', 'buffer_minutes', 'user')
 
 admin.site.register(Departments)
 admin.site.register(Doctors, DoctorsAdmin)
@@ -0,0 +1,87 @@
+import datetime
+import zoneinfo
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils.timezone import localdate
+
+from core.tenancy import current_tenant_id, tenant_lookup
+from .models import Departments, DoctorLeave, Doctors
+
+DIRECTORY_CACHE_KEY = 'department-directory'
+# How far ahead to look for a department's next working day
+LOOKAHEAD_DAYS = 14
+
+
+def _build(today=None):
+    """The directory and the {timezone: local date} it was built for"""
+    departments = list(Departments.objects.annotate(doctor_count=Count('doctors')).order_by('id'))
+    # "Today" at each clinic, unless the caller fixed it
+    dates = {department.timezone: today or department.local_today() for department in departments}
+
+    # Working-day bitmask of each doctor, grouped by department
+    working = defaultdict(dict)
+    for department_id, doctor_id, mask in Doctors.objects.filter(working_days__gt=0).values_list('dep_name_id', 'id', 'working_days'):
+        working[department_id][doctor_id] = mask
+
+    on_leave = set()
+    if dates:
+        last = max(dates.values()) + datetime.timedelta(days=LOOKAHEAD_DAYS - 1)
+        on_leave = set(
+            DoctorLeave.objects.filter(date__range=(min(dates.values()), last), **tenant_lookup('doctor__'))
+            .values_list('doctor_id', 'date')
+        )
+
+    def on_duty(department_id, date):
+        return sum(
+            1 for doctor_id, mask in working[department_id].items()
+            if mask >> date.weekday() & 1 and (doctor_id, date) not in on_leave
+        )
+
+    directory = []
+    for department in departments:
+        local_today = dates[department.timezone]
+        window = [local_today + datetime.timedelta(days=offset) for offset in range(LOOKAHEAD_DAYS)]
+        directory.append({
+            'id': department.id,
+            'dep_name': department.dep_name,
+            'dep_decription': department.dep_decription,
+            'doctor_count': department.doctor_count,
+            'on_duty_today': on_duty(department.id, local_today),
+            'next_available': next((date for date in window if on_duty(department.id, date)), None),
+        })
+    return directory, dates
+
+
+def _current(dates):
+    """Whether it is still the same day in every timezone the directory was built for"""
+    return all(localdate(timezone=zoneinfo.ZoneInfo(name)) == date for name, date in dates.items())
+
+
+def get_department_directory(today=None):
+    """Departments with doctor counts, doctors on duty today and the next day anyone is on duty.
+
+    "Today" is the date at each department's clinic, or `today` for every
+    department when given (not cached). Built with three queries for the active
+    tenant and kept in the cache until a department, doctor, availability or
+    leave changes (see doctors.signals) or the day rolls over at any clinic.
+    """
+    if today is not None:
+        return _build(today)[0]
+    key = _cache_key()
+    cached = cache.get(key)
+    # Entries cached before the per-clinic dates carry none and are rebuilt
+    if cached is not None and cached.get('dates') and _current(cached['dates']):
+        return cached['departments']
+    directory, dates = _build()
+    cache.set(key, {'dates': dates, 'departments': directory}, None)
+    return directory
+
+
+def _cache_key(tenant_id=None):
+    return f'{DIRECTORY_CACHE_KEY}:{tenant_id or current_tenant_id()}'
+
+
+def invalidate_directory(tenant_id=None):
+    cache.delete(_cache_key(tenant_id))
@@ -0,0 +1,330 @@
+import csv
+import datetime
+import io
+import json
+import posixpath
+import re
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.core.validators import get_available_image_extensions, validate_email
+from django.db import transaction
+
+from accounts.provisioning import provision_users
+from bookings.dayview import invalidate_department
+from .directory import invalidate_directory
+from .models import Departments, DoctorAvailability, Doctors
+from .schedule import summarize
+
+BATCH_SIZE = 500
+
+# JSON uploads are decoded a chunk at a time; one row may not be longer than this
+JSON_CHUNK_SIZE = 64 * 1024
+MAX_JSON_ROW_SIZE = 1024 * 1024
+
+COLUMNS = (
+    'doctor_name', 'specialization', 'department', 'department_description',
+    'slot_minutes', 'buffer_minutes', 'image', 'username', 'email', 'password', 'schedule',
+)
+
+DAY_ALIASES = {
+    name[:3].lower(): number for number, name in DoctorAvailability.DAYS_OF_WEEK
+}
+
+# "Mon 09:00-13:00" entries separated by ';' or '|'
+SCHEDULE_ENTRY = re.compile(r'^\s*([A-Za-z]+)\s+(\d{1,2}:\d{2})\s*-\s*(\d{1,2}:\d{2})\s*$')
+
+
+class DirectoryImportError(Exception):
+    """Raised with every row error found; nothing is written when it is raised"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(f'{len(errors)} invalid row(s)')
+
+
+def _json_items(stream):
+    """Yield the items of a top-level JSON list, decoding the stream a chunk at a time"""
+    decoder = json.JSONDecoder()
+    whitespace = re.compile(r'\s*')
+    buffer, position, eof = '', 0, False
+
+    def read_more():
+        nonlocal buffer, position, eof
+        if len(buffer) - position > MAX_JSON_ROW_SIZE:
+            raise ValueError(f'a JSON row is malformed or longer than {MAX_JSON_ROW_SIZE // 1024} KB')
+        chunk = stream.read(JSON_CHUNK_SIZE)
+        eof = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+    def peek():
+        """The next non-space character, '' at the end of the stream"""
+        nonlocal position
+        while True:
+            position = whitespace.match(buffer, position).end()
+            if position < len(buffer) or eof:
+                return buffer[position:position + 1]
+            read_more()
+
+    if peek() != '[':
+        raise ValueError('expected a JSON list of objects')
+    position += 1
+    if peek() == ']':
+        position += 1
+    else:
+        while True:
+            peek()
+            while True:
+                try:
+                    item, end = decoder.raw_decode(buffer, position)
+                    # A number cut off at the end of the buffer decodes too, so only trust what ends before it
+                    if end < len(buffer) or eof:
+                        break
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                read_more()
+            position = end
+            yield item
+            separator = peek()
+            position += 1
+            if separator == ']':
+                break
+            if separator != ',':
+                raise ValueError('expected "," or "]" after a JSON row')
+    if peek():
+        raise ValueError('unexpected data after the JSON list')
+
+
+def read_rows(stream, fmt='csv'):
+    """Yield (line number, row dict) from a CSV or JSON text stream.
+
+    Neither format is read into memory as a whole; a JSON row may be at most
+    MAX_JSON_ROW_SIZE characters.
+    """
+    if fmt == 'json':
+        for number, row in enumerate(_json_items(stream), start=1):
+            if not isinstance(row, dict):
+                raise DirectoryImportError([f'Row {number}: expected an object'])
+            if isinstance(row.get('schedule'), list):
+                row['schedule'] = '; '.join(row['schedule'])
+            yield number, {key: '' if value is None else str(value) for key, value in row.items()}
+    else:
+        # Line 1 is the header
+        for number, row in enumerate(csv.DictReader(stream), start=2):
+            yield number, {key: (value or '').strip() for key, value in row.items() if key}
+
+
+def text_stream(uploaded_file):
+    """Decode an uploaded file lazily instead of reading it into memory"""
+    return io.TextIOWrapper(uploaded_file, encoding='utf-8-sig', newline='')
+
+
+def parse_schedule(value):
+    """'Mon 09:00-13:00; Wed 14:00-18:00' -> [(0, time(9), time(13)), (2, time(14), time(18))]"""
+    windows = []
+    for entry in filter(None, (part.strip() for part in re.split(r'[;|]', value))):
+        match = SCHEDULE_ENTRY.match(entry)
+        if not match:
+            raise ValueError(f'cannot read schedule entry "{entry}"')
+        day, start, end = match.groups()
+        if day[:3].lower() not in DAY_ALIASES:
+            raise ValueError(f'unknown day "{day}"')
+        start = datetime.datetime.strptime(start, '%H:%M').time()
+        end = datetime.datetime.strptime(end, '%H:%M').time()
+        if start >= end:
+            raise ValueError(f'"{entry}" ends before it starts')
+        windows.append((DAY_ALIASES[day[:3].lower()], start, end))
+    return windows
+
+
+def _check_image(name):
+    """Normalise an image column, which names a file already in the media folder; returns (name, error)"""
+    path = posixpath.normpath(name)
+    if name.startswith('/') or '\\' in name or path == '..' or path.startswith('../'):
+        return name, 'image must be a path inside the media folder'
+    if posixpath.splitext(path)[1][1:].lower() not in get_available_image_extensions():
+        return name, f'image "{name}" is not an image file'
+    if len(path) > Doctors._meta.get_field('doc_image').max_length:
+        return name, 'image path is too long'
+    if not default_storage.exists(path):
+        return name, f'image "{name}" is not in the media folder'
+    return path, None
+
+
+def _validate(number, row, seen_usernames, seen_doctors):
+    """Clean one row, returns (cleaned row, errors)"""
+    errors = []
+    cleaned = {
+        'line': number,
+        'doctor_name': row.get('doctor_name', ''),
+        'specialization': row.get('specialization', ''),
+        'department': row.get('department', ''),
+        'department_description': row.get('department_description', ''),
+        'image': row.get('image', ''),
+        'username': row.get('username', ''),
+        'email': row.get('email', ''),
+        'password': row.get('password', ''),
+    }
+    for field in ('doctor_name', 'specialization', 'department'):
+        if not cleaned[field]:
+            errors.append(f'{field} is required')
+
+    doctor_key = (cleaned['doctor_name'].lower(), cleaned['department'].lower())
+    if doctor_key in seen_doctors:
+        errors.append(f'"{cleaned["doctor_name"]}" appears more than once in {cleaned["department"]}')
+    seen_doctors.add(doctor_key)
+
+    if cleaned['image']:
+        cleaned['image'], error = _check_image(cleaned['image'])
+        if error:
+            errors.append(error)
+
+    slot_choices = {value for value, _ in Doctors.SLOT_LENGTH_CHOICES}
+    try:
+        cleaned['slot_minutes'] = int(row.get('slot_minutes') or 15)
+        if cleaned['slot_minutes'] not in slot_choices:
+            errors.append(f'slot_minutes must be one of {sorted(slot_choices)}')
+        cleaned['buffer_minutes'] = int(row.get('buffer_minutes') or 15)
+        if not 0 <= cleaned['buffer_minutes'] <= Doctors.MAX_BUFFER_MINUTES:
+            errors.append(f'buffer_minutes must be between 0 and {Doctors.MAX_BUFFER_MINUTES}')
+    except ValueError:
+        errors.append('slot_minutes and buffer_minutes must be whole numbers')
+
+    try:
+        cleaned['schedule'] = parse_schedule(row.get('schedule', ''))
+    except ValueError as e:
+        errors.append(str(e))
+
+    if cleaned['username']:
+        if cleaned['username'] in seen_usernames:
+            errors.append(f'username "{cleaned["username"]}" appears more than once')
+        seen_usernames.add(cleaned['username'])
+        try:
+            validate_email(cleaned['email'])
+        except ValidationError:
+            errors.append('a valid email is required with a username')
+    return cleaned, [f'Line {number}: {error}' for error in errors]
+
+
+def _write_batch(rows, departments, workers, keep_hashes):
+    """bulk_create the departments, users, doctors and availability rows of one batch"""
+    new_departments = {}
+    for row in rows:
+        key = row['department'].lower()
+        if key not in departments and key not in new_departments:
+            new_departments[key] = Departments(dep_name=row['department'], dep_decription=row['department_description'])
+    Departments.objects.bulk_create(new_departments.values())
+    departments.update(new_departments)
+
+    users = provision_users(
+        ({'username': row['username'], 'email': row['email'], 'first_name': row['doctor_name'], 'password': row['password']}
+         for row in rows if row['username']),
+        workers=workers,
+        keep_hashes=keep_hashes,
+    )
+    users_by_name = {user.username: user for user in users}
+
+    # bulk_create skips the signal that keeps the weekly summary current, so build it here
+    summaries = [summarize(row['schedule']) for row in rows]
+    doctors = Doctors.objects.bulk_create([
+        Doctors(
+            user=users_by_name.get(row['username']),
+            doc_name=row['doctor_name'],
+            doc_spec=row['specialization'],
+            dep_name=departments[row['department'].lower()],
+            doc_image=row['image'],
+            slot_minutes=row['slot_minutes'],
+            buffer_minutes=row['buffer_minutes'],
+            weekly_hours=week,
+            working_days=mask,
+        )
+        for row, (week, mask) in zip(rows, summaries)
+    ])
+
+    availabilities = DoctorAvailability.objects.bulk_create([
+        DoctorAvailability(doctor=doctor, day=day, start_time=start, end_time=end)
+        for doctor, row in zip(doctors, rows)
+        for day, start, end in row['schedule']
+    ], batch_size=BATCH_SIZE)
+
+    return {
+        'departments': len(new_departments),
+        'users': len(users),
+        'doctors': len(doctors),
+        'availabilities': len(availabilities),
+    }
+
+
+def import_directory(rows, dry_run=False, workers=1, keep_hashes=False):
+    """Validate and import (line number, row) pairs in batches inside one transaction.
+
+    Departments are matched by name (case-insensitive) and created when missing.
+    A row naming a doctor that already exists in its department is skipped, so a
+    file can be imported again. Every row is validated; if any fails,
+    DirectoryImportError lists all errors and nothing is saved. Returns counts of
+    the created (or, for a dry run, valid) objects and of the skipped rows.
+
+    Passwords are plain text, which costs one PBKDF2 hash per login; with
+    `keep_hashes` values that are Django hashes (e.g. exported from another site)
+    are stored as they are. A blank password leaves the
+    login unusable until one is set. Hashing stays in the calling process unless
+    `workers` asks for more (None for one process per CPU); only the management
+    command does, a web request must not fork a process pool.
+    """
+    departments = {dept.dep_name.lower(): dept for dept in Departments.objects.all()}
+    existing = {
+        (name.lower(), department.lower())
+        for name, department in Doctors.objects.values_list('doc_name', 'dep_name__dep_name')
+    }
+    totals = {'departments': 0, 'users': 0, 'doctors': 0, 'availabilities': 0, 'skipped': 0}
+    errors = []
+    seen_usernames = set()
+    seen_doctors = set()
+    touched_departments = set()
+
+    def flush(batch):
+        clashes = set(User.objects.filter(username__in=[row['username'] for row in batch if row['username']]).values_list('username', flat=True))
+        for row in batch:
+            if row['username'] in clashes:
+                errors.append(f'Line {row["line"]}: username "{row["username"]}" is already taken')
+        if errors:
+            return
+        if dry_run:
+            totals['departments'] += len({row['department'].lower() for row in batch} - departments.keys())
+            departments.update({row['department'].lower(): None for row in batch})
+            totals['users'] += sum(1 for row in batch if row['username'])
+            totals['doctors'] += len(batch)
+            totals['availabilities'] += sum(len(row['schedule']) for row in batch)
+            return
+        for key, count in _write_batch(batch, departments, workers, keep_hashes).items():
+            totals[key] += count
+        touched_departments.update(departments[row['department'].lower()].id for row in batch)
+
+    with transaction.atomic():
+        batch = []
+        for number, row in rows:
+            cleaned, row_errors = _validate(number, row, seen_usernames, seen_doctors)
+            errors.extend(row_errors)
+            if (cleaned['doctor_name'].lower(), cleaned['department'].lower()) in existing:
+                totals['skipped'] += 1
+                continue
+            batch.append(cleaned)
+            if len(batch) >= BATCH_SIZE:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+
+        if errors:
+            raise DirectoryImportError(errors)
+        if dry_run:
+            return totals
+
+        # bulk_create skips post_save, so refresh the cached views here
+        transaction.on_commit(invalidate_directory)
+        for department_id in touched_departments:
+            transaction.on_commit(lambda department_id=department_id: invalidate_department(department_id))
+    return totals
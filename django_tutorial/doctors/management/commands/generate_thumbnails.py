@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from doctors.models import Doctors
+from doctors.thumbnails import generate_thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Generate resized thumbnails for doctor photos that do not have them yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Regenerate thumbnails for every doctor')
+
+    def handle(self, *args, **options):
+        doctors = Doctors.objects.exclude(doc_image='')
+        if not options['all']:
+            doctors = doctors.filter(doc_image_hash='')
+
+        count = 0
+        for doctor_id in doctors.values_list('id', flat=True):
+            if generate_thumbnails(doctor_id):
+                count += 1
+        self.stdout.write(self.style.SUCCESS(f'Generated thumbnails for {count} doctor(s).'))
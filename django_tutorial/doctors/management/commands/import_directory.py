@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Tenant
+from core.tenancy import DEFAULT_TENANT_SLUG, tenant_context
+from doctors.importer import DirectoryImportError, import_directory, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Import departments, doctors, doctor logins and weekly schedules from a CSV or JSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV (with a header row) or JSON file (a list of objects)')
+        parser.add_argument('--format', choices=['csv', 'json'], help='Defaults to the file extension')
+        parser.add_argument('--dry-run', action='store_true', help='Validate everything, then roll back')
+        parser.add_argument('--tenant', default=DEFAULT_TENANT_SLUG, help='Slug of the hospital to import into')
+        parser.add_argument(
+            '--hashed-passwords', action='store_true',
+            help='Store password values that are Django hashes as they are instead of hashing them',
+        )
+        parser.add_argument('--workers', type=int, help='Password hashing processes (default: one per CPU)')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('json' if path.lower().endswith('.json') else 'csv')
+        tenant = Tenant.objects.filter(slug=options['tenant']).first()
+        if tenant is None:
+            raise CommandError(f'No tenant with slug "{options["tenant"]}".')
+
+        try:
+            with open(path, encoding='utf-8-sig', newline='') as stream, tenant_context(tenant):
+                totals = import_directory(
+                    read_rows(stream, fmt), dry_run=options['dry_run'], workers=options['workers'],
+                    keep_hashes=options['hashed_passwords'],
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+        except DirectoryImportError as e:
+            for error in e.errors:
+                self.stderr.write(error)
+            raise CommandError(f'Import aborted, {len(e.errors)} error(s) found. Nothing was saved.')
+
+        prefix = 'Dry run OK, would import' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {totals['doctors']} doctor(s), {totals['departments']} new department(s), "
+            f"{totals['users']} login(s) and {totals['availabilities']} schedule slot(s); "
+            f"skipped {totals['skipped']} doctor(s) already in the directory."
+        ))
@@ -0,0 +1,58 @@
+import csv
+import secrets
+import sys
+
+from django.contrib.auth.hashers import get_hasher
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.provisioning import reset_passwords
+
+
+class Command(BaseCommand):
+    help = 'Reset passwords for the given users or every doctor login, hashing across all CPU cores'
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='*', help='Users to reset')
+        parser.add_argument('--doctors', action='store_true', help='Reset every user linked to a doctor')
+        parser.add_argument('--password', help='Give every user this password instead of a random one')
+        parser.add_argument('--hasher', default='default', help="Hasher algorithm, e.g. pbkdf2_sha256, argon2, bcrypt_sha256")
+        parser.add_argument('--workers', type=int, help='Hashing processes (default: one per CPU)')
+        parser.add_argument('--output', help='Write username,password CSV here instead of printing it')
+
+    def handle(self, *args, **options):
+        if not options['usernames'] and not options['doctors']:
+            raise CommandError('Give one or more usernames or --doctors.')
+        try:
+            hasher = get_hasher(options['hasher'])
+            # Fail here on a missing library (argon2-cffi, bcrypt), not in every hashing worker
+            if hasher.library:
+                hasher._load_library()
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        users = User.objects.none()
+        if options['usernames']:
+            users = User.objects.filter(username__in=options['usernames'])
+            missing = set(options['usernames']) - set(users.values_list('username', flat=True))
+            if missing:
+                raise CommandError(f"Unknown user(s): {', '.join(sorted(missing))}")
+        if options['doctors']:
+            users = users | User.objects.filter(doctors__isnull=False)
+        users = list(users.distinct().order_by('username'))
+
+        passwords = [options['password'] or secrets.token_urlsafe(9) for _ in users]
+        count = reset_passwords(users, passwords, hasher=options['hasher'], workers=options['workers'])
+
+        if options['output']:
+            with open(options['output'], 'w', newline='') as f:
+                self._write_credentials(f, users, passwords)
+        else:
+            self._write_credentials(sys.stdout, users, passwords)
+        self.stderr.write(self.style.SUCCESS(f'Reset {count} password(s).'))
+
+    def _write_credentials(self, stream, users, passwords):
+        writer = csv.writer(stream)
+        writer.writerow(['username', 'password'])
+        for user, password in zip(users, passwords):
+            writer.writerow([user.username, password])
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 14:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("doctors", "0003_doctoravailability_doctorleave"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="doctors",
+            name="doc_image_hash",
+            field=models.CharField(blank=True, editable=False, max_length=16),
+        ),
+    ]
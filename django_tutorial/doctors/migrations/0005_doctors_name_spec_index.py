@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-19 14:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("doctors", "0004_doctors_doc_image_hash"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="doctors",
+            name="doc_name",
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name="doctors",
+            name="doc_spec",
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+    ]
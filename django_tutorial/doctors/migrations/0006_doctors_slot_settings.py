@@ -0,0 +1,34 @@
+# Generated by Django 4.2 on 2026-10-19 14:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("doctors", "0005_doctors_name_spec_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="doctors",
+            name="buffer_minutes",
+            field=models.PositiveSmallIntegerField(default=15),
+        ),
+        migrations.AddField(
+            model_name="doctors",
+            name="slot_minutes",
+            field=models.PositiveSmallIntegerField(
+                choices=[
+                    (5, "5 minutes"),
+                    (10, "10 minutes"),
+                    (15, "15 minutes"),
+                    (20, "20 minutes"),
+                    (30, "30 minutes"),
+                    (45, "45 minutes"),
+                    (60, "60 minutes"),
+                ],
+                default=15,
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-19 15:10
+
+from django.db import migrations, models
+import doctors.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("doctors", "0006_doctors_slot_settings"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="departments",
+            name="timezone",
+            field=models.CharField(
+                default="UTC",
+                max_length=63,
+                validators=[doctors.models.validate_timezone],
+            ),
+        ),
+    ]
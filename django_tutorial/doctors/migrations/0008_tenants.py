@@ -0,0 +1,50 @@
+# Generated by Django 4.2 on 2026-10-19 15:13
+
+import core.tenancy
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_tenants"),
+        ("doctors", "0007_clinic_timezones"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="departments",
+            name="tenant",
+            field=models.ForeignKey(
+                db_constraint=False,
+                default=core.tenancy.current_tenant_id,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="core.tenant",
+            ),
+        ),
+        migrations.AddField(
+            model_name="doctors",
+            name="tenant",
+            field=models.ForeignKey(
+                db_constraint=False,
+                default=core.tenancy.current_tenant_id,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="core.tenant",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="departments",
+            index=models.Index(
+                fields=["tenant", "dep_name"], name="department_tenant_name_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="doctors",
+            index=models.Index(
+                fields=["tenant", "doc_name"], name="doctor_tenant_name_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2 on 2026-10-19 15:15
+
+from django.db import migrations, models
+import doctors.schedule
+
+
+def summarize_availability(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
+    Doctors = apps.get_model('doctors', 'Doctors')
+    DoctorAvailability = apps.get_model('doctors', 'DoctorAvailability')
+    windows = {}
+    for doctor_id, day, start, end in DoctorAvailability.objects.using(db_alias).values_list('doctor_id', 'day', 'start_time', 'end_time'):
+        windows.setdefault(doctor_id, []).append((day, start, end))
+    summarized = []
+    for doctor in Doctors.objects.using(db_alias).filter(pk__in=windows):
+        doctor.weekly_hours, doctor.working_days = doctors.schedule.summarize(windows[doctor.pk])
+        summarized.append(doctor)
+    Doctors.objects.using(db_alias).bulk_update(summarized, ['weekly_hours', 'working_days'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("doctors", "0008_tenants"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="doctors",
+            name="weekly_hours",
+            field=models.JSONField(default=doctors.schedule.empty_week, editable=False),
+        ),
+        migrations.AddField(
+            model_name="doctors",
+            name="working_days",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(summarize_availability, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2 on 2026-10-19 15:33
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("doctors", "0009_doctor_weekly_hours"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="doctors",
+            name="buffer_minutes",
+            field=models.PositiveSmallIntegerField(
+                default=15,
+                validators=[
+                    django.core.validators.MinValueValidator(0),
+                    django.core.validators.MaxValueValidator(240),
+                ],
+            ),
+        ),
+    ]
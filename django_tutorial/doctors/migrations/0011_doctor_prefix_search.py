@@ -0,0 +1,40 @@
+# Generated by Django 4.2 on 2026-10-19 15:35
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("doctors", "0010_doctor_buffer_bounds"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="doctors",
+            name="doc_name",
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AlterField(
+            model_name="doctors",
+            name="doc_spec",
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name="doctors",
+            index=models.Index(
+                models.F("tenant"),
+                django.db.models.functions.text.Lower("doc_name"),
+                name="doctor_name_prefix_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="doctors",
+            index=models.Index(
+                models.F("tenant"),
+                django.db.models.functions.text.Lower("doc_spec"),
+                name="doctor_spec_prefix_idx",
+            ),
+        ),
+    ]
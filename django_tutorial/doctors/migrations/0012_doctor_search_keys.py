@@ -0,0 +1,61 @@
+# Generated by Django 4.2 on 2026-10-19 15:55
+
+from django.db import migrations, models
+import doctors.search
+
+
+def fill_search_keys(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
+    for model, fields in (('Departments', {'name_key': 'dep_name'}), ('Doctors', {'name_key': 'doc_name', 'spec_key': 'doc_spec'})):
+        rows = apps.get_model('doctors', model).objects.using(db_alias)
+        changed = []
+        for row in rows.iterator():
+            for key, source in fields.items():
+                setattr(row, key, doctors.search.search_key(getattr(row, source)))
+            changed.append(row)
+        rows.bulk_update(changed, list(fields), batch_size=500)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("doctors", "0011_doctor_prefix_search"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="doctors",
+            name="doctor_name_prefix_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="doctors",
+            name="doctor_spec_prefix_idx",
+        ),
+        migrations.AddField(
+            model_name="departments",
+            name="name_key",
+            field=doctors.search.SearchKeyField(default="", source="dep_name"),
+        ),
+        migrations.AddField(
+            model_name="doctors",
+            name="name_key",
+            field=doctors.search.SearchKeyField(default="", source="doc_name"),
+        ),
+        migrations.AddField(
+            model_name="doctors",
+            name="spec_key",
+            field=doctors.search.SearchKeyField(default="", source="doc_spec"),
+        ),
+        migrations.AddIndex(
+            model_name="doctors",
+            index=models.Index(
+                fields=["tenant", "name_key"], name="doctor_name_prefix_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="doctors",
+            index=models.Index(
+                fields=["tenant", "spec_key"], name="doctor_spec_prefix_idx"
+            ),
+        ),
+        migrations.RunPython(fill_search_keys, migrations.RunPython.noop, hints={'tenant_databases': True}),
+    ]
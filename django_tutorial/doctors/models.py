@@ -1,32 +1,154 @@
+import zoneinfo
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils.timezone import localdate
+from core.models import TenantModel
+from .schedule import DAY_NAMES, empty_week, hours_as_times
+from .search import SearchKeyField
+from .thumbnails import THUMBNAIL_SIZES, thumbnail_name
+
+@lru_cache(maxsize=None)
+def timezone_names():
+    """Sorted IANA timezone names (the tz database is only scanned once)"""
+    return sorted(zoneinfo.available_timezones())
 
-class Departments(models.Model):
+def validate_timezone(value):
+    if value not in timezone_names():
+        raise ValidationError(f'"{value}" is not a known timezone.')
+
+class Departments(TenantModel):
     dep_name = models.CharField(max_length=100)
     dep_decription = models.TextField()
+    # Where the clinic is; booking dates and appointment times are wall-clock times here
+    timezone = models.CharField(max_length=63, default=settings.TIME_ZONE, validators=[validate_timezone])
+    # Folded dep_name for the doctor search (see doctors.search)
+    name_key = SearchKeyField('dep_name', default='')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['tenant', 'dep_name'], name='department_tenant_name_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets the post_save handler re-stamp bookings only when the timezone changed
+        instance._loaded_timezone = instance.__dict__.get('timezone')
+        return instance
+
+    @property
+    def tzinfo(self):
+        return zoneinfo.ZoneInfo(self.timezone)
+
+    def local_today(self):
+        return localdate(timezone=self.tzinfo)
 
     def __str__(self):
         return self.dep_name
 
-class Doctors(models.Model):
+class Doctors(TenantModel):
+    SLOT_LENGTH_CHOICES = [
+        (5, '5 minutes'), (10, '10 minutes'), (15, '15 minutes'), (20, '20 minutes'),
+        (30, '30 minutes'), (45, '45 minutes'), (60, '60 minutes'),
+    ]
+    MAX_BUFFER_MINUTES = 240
     user = models.OneToOneField(User, on_delete=models.CASCADE, null=True, blank=True)
     doc_name = models.CharField(max_length=255)
     doc_spec = models.CharField(max_length=255)
     dep_name = models.ForeignKey(Departments, on_delete=models.CASCADE)
     doc_image = models.ImageField(upload_to='doctors')
+    # Content hash of doc_image, set once its thumbnails have been generated
+    doc_image_hash = models.CharField(max_length=16, blank=True, editable=False)
+    # Appointment grid for this doctor and the minimum gap between two bookings
+    slot_minutes = models.PositiveSmallIntegerField(choices=SLOT_LENGTH_CHOICES, default=15)
+    buffer_minutes = models.PositiveSmallIntegerField(
+        default=15, validators=[MinValueValidator(0), MaxValueValidator(MAX_BUFFER_MINUTES)],
+    )
+    # Summary of the availabilities, kept current by doctors.signals (see doctors.schedule):
+    # 7 lists (Monday first) of merged [start, end] minutes and a bitmask of working weekdays
+    weekly_hours = models.JSONField(default=empty_week, editable=False)
+    working_days = models.PositiveSmallIntegerField(default=0, editable=False)
+    # Folded doc_name and doc_spec for the prefix search (see doctors.search)
+    name_key = SearchKeyField('doc_name', default='')
+    spec_key = SearchKeyField('doc_spec', default='')
+
+    tenant_parent = 'dep_name'
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['tenant', 'doc_name'], name='doctor_tenant_name_idx'),
+            # Case-insensitive prefix search (see bookings.views.search_doctors)
+            models.Index(fields=['tenant', 'name_key'], name='doctor_name_prefix_idx'),
+            models.Index(fields=['tenant', 'spec_key'], name='doctor_spec_prefix_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets the post_save handlers see which department and login the doctor left
+        instance._loaded_department_id = instance.__dict__.get('dep_name_id')
+        instance._loaded_user_id = instance.__dict__.get('user_id')
+        return instance
 
     def __str__(self):
         return 'Dr ' +  self.doc_name + ' - (' + self.doc_spec + ')'
 
+    def thumbnail_url(self, size, ext='jpg'):
+        if not self.doc_image_hash:
+            return self.doc_image.url if self.doc_image else ''
+        return settings.MEDIA_URL + thumbnail_name(self.doc_image_hash, size, ext)
+
+    def _srcset(self, ext):
+        if not self.doc_image_hash:
+            return ''
+        return ', '.join(f'{self.thumbnail_url(size, ext)} {size}w' for size in THUMBNAIL_SIZES)
+
+    @property
+    def thumbnail_srcset_webp(self):
+        return self._srcset('webp')
+
+    @property
+    def thumbnail_srcset_jpg(self):
+        return self._srcset('jpg')
+
+    @property
+    def thumbnail_small_url(self):
+        return self.thumbnail_url(128)
+
+    @property
+    def thumbnail_large_url(self):
+        return self.thumbnail_url(640)
+
+    def works_on(self, weekday):
+        return bool(self.working_days >> weekday & 1)
+
+    def hours_on(self, weekday):
+        """Merged (start, end) times the doctor works on a weekday"""
+        return hours_as_times(self.weekly_hours[weekday])
+
+    @property
+    def working_day_names(self):
+        return [name for day, name in enumerate(DAY_NAMES) if self.works_on(day)]
+
+    @property
+    def weekly_schedule(self):
+        """(day name, [(start, end), ...]) for each working day, for templates"""
+        return [(name, self.hours_on(day)) for day, name in enumerate(DAY_NAMES) if self.works_on(day)]
+
     @property
     def current_status(self):
-        from datetime import date
-        today = date.today()
+        # Today at the doctor's clinic, not on the server; .all() uses prefetched rows when present
+        today = self.dep_name.local_today()
         # Check if on leave today
-        if self.leaves.filter(date=today).exists():
+        if any(leave.date == today for leave in self.leaves.all()):
             return "Absent"
         # Check if has availability today
-        if self.availabilities.filter(day=today.weekday()).exists():
+        if self.works_on(today.weekday()):
             return "Present"
         return "Not Scheduled"
 
@@ -0,0 +1,54 @@
+import datetime
+
+DAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+
+def empty_week():
+    return [[] for _ in DAY_NAMES]
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def summarize(windows):
+    """(weekly hours, working-day bitmask) from (day, start time, end time) windows.
+
+    Weekly hours are 7 lists, Monday first, of [start, end] minute pairs with
+    overlapping or touching windows merged. Bit d of the mask is set when the
+    doctor works on weekday d.
+    """
+    by_day = empty_week()
+    for day, start, end in windows:
+        by_day[day].append((_minutes(start), _minutes(end)))
+
+    week = empty_week()
+    mask = 0
+    for day, intervals in enumerate(by_day):
+        for start, end in sorted(intervals):
+            if week[day] and start <= week[day][-1][1]:
+                week[day][-1][1] = max(week[day][-1][1], end)
+            else:
+                week[day].append([start, end])
+        if week[day]:
+            mask |= 1 << day
+    return week, mask
+
+
+def hours_as_times(intervals):
+    return [(datetime.time(start // 60, start % 60), datetime.time(end // 60, end % 60)) for start, end in intervals]
+
+
+def refresh_weekly_hours(doctor_ids):
+    """Recompute the stored summary of `doctor_ids` with one read and one write per doctor"""
+    from .models import DoctorAvailability, Doctors
+
+    doctor_ids = list(doctor_ids)
+    windows = {doctor_id: [] for doctor_id in doctor_ids}
+    rows = DoctorAvailability.objects.filter(doctor_id__in=doctor_ids).values_list('doctor_id', 'day', 'start_time', 'end_time')
+    for doctor_id, day, start, end in rows:
+        windows[doctor_id].append((day, start, end))
+    for doctor_id, doctor_windows in windows.items():
+        week, mask = summarize(doctor_windows)
+        # update() so the Doctors post_save handlers (cache invalidation) don't run again
+        Doctors.all_tenants.filter(pk=doctor_id).update(weekly_hours=week, working_days=mask)
@@ -0,0 +1,32 @@
+import unicodedata
+
+from django.db import models
+
+
+def search_key(text):
+    """Fold case and compatibility forms the same way for stored names and typed queries.
+
+    Database LOWER() only folds ASCII on SQLite, so comparing it with Python's
+    lower() never matched names like "Élodie" or "Øyvind".
+    """
+    return unicodedata.normalize('NFKC', text).casefold()
+
+
+class SearchKeyField(models.TextField):
+    """search_key() of another field, refreshed on save() and bulk_create()"""
+
+    def __init__(self, source, **kwargs):
+        self.source = source
+        kwargs.setdefault('editable', False)
+        super().__init__(**kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source'] = self.source
+        kwargs.pop('editable', None)
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = search_key(getattr(model_instance, self.source))
+        setattr(model_instance, self.attname, value)
+        return value
@@ -0,0 +1,34 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.roles import invalidate_roles
+from .directory import invalidate_directory
+from .models import Departments, DoctorAvailability, DoctorLeave, Doctors
+from .schedule import refresh_weekly_hours
+
+
+@receiver([post_save, post_delete], sender=DoctorAvailability)
+def availability_changed(sender, instance, **kwargs):
+    refresh_weekly_hours([instance.doctor_id])
+
+
+@receiver([post_save, post_delete], sender=Departments)
+@receiver([post_save, post_delete], sender=Doctors)
+@receiver([post_save, post_delete], sender=DoctorAvailability)
+@receiver([post_save, post_delete], sender=DoctorLeave)
+def directory_changed(sender, instance, **kwargs):
+    # Availability and leave rows carry no tenant, they change within their tenant's requests
+    tenant_id = getattr(instance, 'tenant_id', None)
+    transaction.on_commit(lambda: invalidate_directory(tenant_id))
+
+
+@receiver([post_save, post_delete], sender=Doctors)
+def doctor_link_changed(sender, instance, signal, **kwargs):
+    previous = getattr(instance, '_loaded_user_id', None)
+    instance._loaded_user_id = instance.user_id
+    if signal is post_save and not kwargs['created'] and previous == instance.user_id:
+        return
+    # Both the login the profile left and the one it moved to change role
+    user_ids = {previous, instance.user_id}
+    transaction.on_commit(lambda: invalidate_roles(user_ids))
@@ -0,0 +1,332 @@
+import datetime
+import hashlib
+import io
+import json
+import pathlib
+import random
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import SimpleTestCase, TestCase, override_settings
+from PIL import Image
+
+from . import importer, thumbnails
+from .directory import get_department_directory
+from .importer import DirectoryImportError, import_directory, read_rows
+from .models import Departments, DoctorAvailability, DoctorLeave, Doctors
+from .schedule import empty_week, summarize
+from .thumbnails import THUMBNAIL_FORMATS, THUMBNAIL_SIZES, generate_thumbnails, thumbnail_name
+
+CSV_HEADER = 'doctor_name,specialization,department,image,username,email,password,schedule\n'
+
+
+def csv_rows(*lines):
+    return read_rows(io.StringIO(CSV_HEADER + ''.join(line + '\n' for line in lines)))
+
+
+def photo_bytes(color='red', size=(800, 600)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class JsonRowsTests(SimpleTestCase):
+    def rows(self, text):
+        return [row for _, row in read_rows(io.StringIO(text), 'json')]
+
+    def test_rows_span_chunks(self):
+        data = [{'doctor_name': f'Doctor {i}', 'slot_minutes': 10 * i, 'schedule': ['Mon 09:00-13:00']} for i in range(50)]
+        with mock.patch.object(importer, 'JSON_CHUNK_SIZE', 7):
+            rows = self.rows(json.dumps(data, indent=2))
+        self.assertEqual(len(rows), 50)
+        # A number split across two chunks is not cut short
+        self.assertEqual(rows[49]['slot_minutes'], '490')
+        self.assertEqual(rows[0]['schedule'], 'Mon 09:00-13:00')
+
+    def test_empty_list(self):
+        self.assertEqual(self.rows(' [ ] '), [])
+
+    def test_malformed_json(self):
+        for text in ('{"doctor_name": "x"}', '[{"doctor_name": "x"} {}]', '[{}] []', '[{"doctor_name": '):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                self.rows(text)
+
+    def test_oversized_row(self):
+        with mock.patch.object(importer, 'JSON_CHUNK_SIZE', 8), mock.patch.object(importer, 'MAX_JSON_ROW_SIZE', 16):
+            with self.assertRaisesMessage(ValueError, 'longer than'):
+                self.rows('[{"doctor_name": "' + 'x' * 100 + '"}]')
+
+
+class DirectoryImportTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        settings = override_settings(MEDIA_ROOT=self.media)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        with open(f'{self.media}/asha.jpg', 'wb') as f:
+            f.write(b'not checked')
+
+    def test_import(self):
+        totals = import_directory(csv_rows(
+            'Asha Menon,Cardiologist,Cardiology,asha.jpg,dr-asha,asha@example.com,secret,Mon 09:00-13:00; Wed 14:00-18:00',
+            'Ravi Kumar,Surgeon,cardiology,,,,,Tue 09:00-12:00',
+        ))
+        self.assertEqual(totals, {'departments': 1, 'users': 1, 'doctors': 2, 'availabilities': 3, 'skipped': 0})
+        asha = Doctors.objects.get(doc_name='Asha Menon')
+        self.assertEqual(asha.doc_image.name, 'asha.jpg')
+        # bulk_create fills the search keys too
+        self.assertEqual((asha.name_key, asha.spec_key), ('asha menon', 'cardiologist'))
+        self.assertTrue(asha.user.check_password('secret'))
+        self.assertEqual(Departments.objects.count(), 1)
+
+    def test_dry_run_counts_without_saving(self):
+        Departments.objects.create(dep_name='Cardiology', dep_decription='Heart')
+        totals = import_directory(csv_rows(
+            'Asha Menon,Cardiologist,Cardiology,,dr-asha,asha@example.com,,Mon 09:00-13:00',
+            'Ravi Kumar,Surgeon,Neurology,,,,,Tue 09:00-12:00; Thu 09:00-12:00',
+        ), dry_run=True)
+        self.assertEqual(totals, {'departments': 1, 'users': 1, 'doctors': 2, 'availabilities': 3, 'skipped': 0})
+        self.assertFalse(Doctors.objects.exists())
+        self.assertFalse(User.objects.exists())
+        self.assertEqual(Departments.objects.count(), 1)
+
+    def test_every_error_is_reported(self):
+        with self.assertRaises(DirectoryImportError) as raised:
+            import_directory(csv_rows(
+                ',Cardiologist,Cardiology,,,,,',
+                'Asha Menon,Cardiologist,Cardiology,,dr-asha,not-an-email,,Fri 09:00-08:00',
+                'Ravi Kumar,Surgeon,Cardiology,../settings.py,,,,',
+                'Mira Das,Surgeon,Cardiology,missing.png,,,,',
+                'Asha Menon,Cardiologist,Cardiology,,,,,',
+            ))
+        errors = raised.exception.errors
+        self.assertEqual([error.split(':')[0] for error in errors], ['Line 2', 'Line 3', 'Line 3', 'Line 4', 'Line 5', 'Line 6'])
+        self.assertIn('doctor_name is required', errors[0])
+        self.assertIn('media folder', errors[3])
+        self.assertIn('not in the media folder', errors[4])
+        self.assertIn('more than once', errors[5])
+        self.assertFalse(Doctors.objects.exists())
+
+    def test_a_late_error_rolls_back_earlier_batches(self):
+        User.objects.create_user('taken')
+        rows = [f'Doctor {i},Surgeon,Surgery,,,,,Mon 09:00-10:00' for i in range(5)]
+        with mock.patch.object(importer, 'BATCH_SIZE', 2), self.assertRaises(DirectoryImportError) as raised:
+            import_directory(csv_rows(*rows, 'Asha Menon,Cardiologist,Cardiology,,taken,asha@example.com,,'))
+        self.assertEqual(raised.exception.errors, ['Line 7: username "taken" is already taken'])
+        self.assertFalse(Departments.objects.exists())
+        self.assertFalse(Doctors.objects.exists())
+        self.assertFalse(DoctorAvailability.objects.exists())
+
+    def test_importing_again_skips_existing_doctors(self):
+        lines = (
+            'Asha Menon,Cardiologist,Cardiology,,dr-asha,asha@example.com,,Mon 09:00-13:00',
+            'Ravi Kumar,Surgeon,Cardiology,,,,,Tue 09:00-12:00',
+        )
+        import_directory(csv_rows(*lines))
+        totals = import_directory(csv_rows(*lines, 'Ravi Kumar,Surgeon,Neurology,,,,,'))
+        self.assertEqual(totals, {'departments': 1, 'users': 0, 'doctors': 1, 'availabilities': 0, 'skipped': 2})
+        self.assertEqual(Doctors.objects.filter(doc_name='Ravi Kumar').count(), 2)
+        self.assertEqual(DoctorAvailability.objects.count(), 2)
+
+
+class ThumbnailTests(TestCase):
+    def setUp(self):
+        self.media = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.media)
+        settings = override_settings(MEDIA_ROOT=self.media)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.department = Departments.objects.create(dep_name='Cardiology', dep_decription='Heart')
+
+    def make_doctor(self, data):
+        doctor = Doctors(doc_name='Asha Menon', doc_spec='Cardiologist', dep_name=self.department)
+        doctor.doc_image.save('asha.png', ContentFile(data))
+        return doctor
+
+    def test_thumbnails_are_named_by_content_hash(self):
+        data = photo_bytes()
+        doctor = self.make_doctor(data)
+        image_hash = generate_thumbnails(doctor.id)
+        self.assertEqual(image_hash, hashlib.sha256(data).hexdigest()[:16])
+        doctor.refresh_from_db()
+        self.assertEqual(doctor.doc_image_hash, image_hash)
+        for size in THUMBNAIL_SIZES:
+            for ext in THUMBNAIL_FORMATS:
+                with default_storage.open(thumbnail_name(image_hash, size, ext)) as f, Image.open(f) as thumb:
+                    self.assertEqual(thumb.size, (size, size))
+        self.assertEqual(doctor.thumbnail_small_url, f'/media/doctors/thumbs/{image_hash}-128.jpg')
+        self.assertIn(f'/media/doctors/thumbs/{image_hash}-640.webp 640w', doctor.thumbnail_srcset_webp)
+
+    def test_same_photo_reuses_the_thumbnails(self):
+        data = photo_bytes()
+        first = generate_thumbnails(self.make_doctor(data).id)
+        with mock.patch.object(thumbnails, 'render_thumbnails') as render:
+            self.assertEqual(generate_thumbnails(self.make_doctor(data).id), first)
+        render.assert_not_called()
+        self.assertNotEqual(generate_thumbnails(self.make_doctor(photo_bytes('blue')).id), first)
+
+    def test_photo_replaced_while_rendering_keeps_no_hash(self):
+        doctor = self.make_doctor(photo_bytes())
+        render = thumbnails.render_thumbnails
+
+        def replace_then_render(source_bytes):
+            Doctors.objects.filter(pk=doctor.pk).update(doc_image='doctors/other.png')
+            return render(source_bytes)
+
+        with mock.patch.object(thumbnails, 'render_thumbnails', replace_then_render):
+            generate_thumbnails(doctor.id)
+        doctor.refresh_from_db()
+        self.assertEqual(doctor.doc_image_hash, '')
+        self.assertEqual(doctor.thumbnail_srcset_jpg, '')
+
+    def test_thumbnails_are_cached_forever(self):
+        image_hash = generate_thumbnails(self.make_doctor(photo_bytes()).id)
+        response = self.client.get(f'/media/doctors/thumbs/{image_hash}-64.webp')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            sorted(response['Cache-Control'].split(', ')), ['immutable', 'max-age=31536000', 'public'],
+        )
+        response = self.client.get('/media/doctors/thumbs/0000000000000000-64.webp')
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('immutable', response.get('Cache-Control', ''))
+
+
+class DirectoryCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.department = Departments.objects.create(dep_name='Cardiology', dep_decription='Heart')
+        self.doctor = Doctors.objects.create(doc_name='Asha Menon', doc_spec='Cardiologist', dep_name=self.department)
+        # Every weekday, so today's duty only depends on leave
+        for day in range(7):
+            DoctorAvailability.objects.create(doctor=self.doctor, day=day, start_time=datetime.time(9), end_time=datetime.time(17))
+
+    def directory(self, queries):
+        with self.assertNumQueries(queries):
+            return {row['dep_name']: row for row in get_department_directory()}
+
+    def test_served_from_the_cache(self):
+        self.assertEqual(self.directory(3)['Cardiology']['on_duty_today'], 1)
+        self.directory(0)
+
+    def test_changes_invalidate_it(self):
+        today = self.department.local_today()
+        changes = (
+            lambda: Departments.objects.create(dep_name='Neurology', dep_decription='Brain'),
+            lambda: DoctorLeave.objects.create(doctor=self.doctor, date=today),
+            lambda: Doctors.objects.create(doc_name='Ravi Kumar', doc_spec='Surgeon', dep_name=self.department),
+            lambda: DoctorAvailability.objects.filter(doctor=self.doctor, day=today.weekday()).delete(),
+            lambda: Departments.objects.filter(dep_name='Neurology').delete(),
+        )
+        expected = (
+            (2, 1, 1), (2, 1, 0), (2, 2, 0), (2, 2, 0), (1, 2, 0),
+        )
+        self.directory(3)
+        for change, (departments, doctors, on_duty) in zip(changes, expected):
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+            directory = self.directory(3)
+            row = directory['Cardiology']
+            self.assertEqual((len(directory), row['doctor_count'], row['on_duty_today']), (departments, doctors, on_duty))
+            self.directory(0)
+
+    def test_leave_moves_the_next_available_day(self):
+        today = self.department.local_today()
+        with self.captureOnCommitCallbacks(execute=True):
+            DoctorLeave.objects.create(doctor=self.doctor, date=today)
+            DoctorLeave.objects.create(doctor=self.doctor, date=today + datetime.timedelta(days=1))
+        row = self.directory(3)['Cardiology']
+        self.assertEqual((row['on_duty_today'], row['next_available']), (0, today + datetime.timedelta(days=2)))
+
+    def test_rebuilt_when_the_day_rolls_over_at_a_clinic(self):
+        Departments.objects.create(dep_name='Kiribati', dep_decription='Far east', timezone='Pacific/Kiritimati')
+        cache.clear()
+        # 09:30 UTC is 23:30 in Kiritimati (UTC+14); half an hour later it is the next day there
+        with mock.patch('django.utils.timezone.now', return_value=datetime.datetime(2026, 3, 10, 9, 30, tzinfo=datetime.timezone.utc)):
+            self.directory(3)
+            self.directory(0)
+        with mock.patch('django.utils.timezone.now', return_value=datetime.datetime(2026, 3, 10, 10, 0, 1, tzinfo=datetime.timezone.utc)):
+            self.directory(3)
+
+    def test_a_fixed_date_is_not_cached(self):
+        self.directory(3)
+        with self.assertNumQueries(3):
+            get_department_directory(today=datetime.date(2026, 3, 10))
+        self.directory(0)
+
+
+def at(minutes):
+    return datetime.time(minutes // 60, minutes % 60)
+
+
+class WeeklySummaryTests(SimpleTestCase):
+    def test_merging(self):
+        week, mask = summarize([
+            (0, at(540), at(720)), (0, at(660), at(780)),  # overlapping
+            (2, at(840), at(900)), (2, at(900), at(960)),  # touching
+            (4, at(480), at(1020)), (4, at(600), at(660)),  # nested
+            (6, at(900), at(960)), (6, at(480), at(540)),  # apart, given out of order
+        ])
+        self.assertEqual(week, [[[540, 780]], [], [[840, 960]], [], [[480, 1020]], [], [[480, 540], [900, 960]]])
+        self.assertEqual(mask, 0b1010101)
+
+    def test_no_windows(self):
+        self.assertEqual(summarize([]), (empty_week(), 0))
+
+    def test_matches_minute_by_minute_coverage(self):
+        rng = random.Random(49)
+        for _ in range(200):
+            windows = []
+            for _ in range(rng.randint(0, 8)):
+                start = rng.randrange(0, 19 * 4) * 15
+                windows.append((rng.randrange(7), at(start), at(start + rng.randint(1, 16) * 15)))
+            week, mask = summarize(windows)
+
+            for day in range(7):
+                # Closed intervals on a doubled axis, so touching windows share a point and merge
+                covered = set()
+                for window_day, start, end in windows:
+                    if window_day == day:
+                        first, last = start.hour * 60 + start.minute, end.hour * 60 + end.minute
+                        covered.update(range(2 * first, 2 * last + 1))
+                runs = []
+                for point in sorted(covered):
+                    if runs and point == runs[-1][1] + 1:
+                        runs[-1][1] = point
+                    else:
+                        runs.append([point, point])
+                self.assertEqual(week[day], [[start // 2, end // 2] for start, end in runs], windows)
+                self.assertEqual(bool(mask >> day & 1), bool(runs))
+
+
+class WeeklySummarySignalTests(TestCase):
+    def setUp(self):
+        department = Departments.objects.create(dep_name='Cardiology', dep_decription='Heart')
+        self.doctor = Doctors.objects.create(doc_name='Asha Menon', doc_spec='Cardiologist', dep_name=department)
+
+    def add(self, day, start, end):
+        return DoctorAvailability.objects.create(doctor=self.doctor, day=day, start_time=at(start), end_time=at(end))
+
+    def test_availability_changes_refresh_the_summary(self):
+        monday = self.add(0, 540, 720)
+        self.add(0, 700, 780)
+        self.add(3, 840, 960)
+        self.doctor.refresh_from_db()
+        self.assertEqual(self.doctor.working_days, 0b1001)
+        self.assertEqual(self.doctor.working_day_names, ['Monday', 'Thursday'])
+        self.assertEqual(self.doctor.hours_on(0), [(at(540), at(780))])
+        self.assertFalse(self.doctor.works_on(1))
+
+        monday.delete()
+        DoctorAvailability.objects.filter(day=3).update(day=4)
+        # update() sends no signal, saving one row refreshes the whole week
+        DoctorAvailability.objects.get(day=4).save()
+        self.doctor.refresh_from_db()
+        self.assertEqual(self.doctor.working_days, 0b10001)
+        self.assertEqual(self.doctor.hours_on(0), [(at(700), at(780))])
+        self.assertEqual(self.doctor.hours_on(4), [(at(840), at(960))])
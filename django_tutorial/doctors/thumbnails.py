@@ -0,0 +1,57 @@
+import hashlib
+import io
+import posixpath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+# Square thumbnail widths (px) generated for every doctor photo
+THUMBNAIL_SIZES = (64, 128, 320, 640)
+THUMBNAIL_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+THUMBNAIL_DIR = 'doctors/thumbs'
+
+
+def thumbnail_name(image_hash, size, ext):
+    return posixpath.join(THUMBNAIL_DIR, f'{image_hash}-{size}.{ext}')
+
+
+def render_thumbnails(source_bytes):
+    """Yield (size, ext, bytes) for every derivative of the given image"""
+    with Image.open(io.BytesIO(source_bytes)) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+        for size in THUMBNAIL_SIZES:
+            thumb = ImageOps.fit(img, (size, size), Image.LANCZOS)
+            for ext, (fmt, options) in THUMBNAIL_FORMATS.items():
+                buffer = io.BytesIO()
+                thumb.save(buffer, fmt, **options)
+                yield size, ext, buffer.getvalue()
+
+
+def generate_thumbnails(doctor_id):
+    """Build the hashed thumbnail set for a doctor's photo and record its hash"""
+    from .models import Doctors
+
+    doctor = Doctors.objects.filter(pk=doctor_id).only('doc_image').first()
+    if not doctor or not doctor.doc_image:
+        return None
+
+    with doctor.doc_image.open('rb') as source:
+        source_bytes = source.read()
+    image_hash = hashlib.sha256(source_bytes).hexdigest()[:16]
+
+    # Same content always maps to the same names, so existing files are reused
+    if not default_storage.exists(thumbnail_name(image_hash, THUMBNAIL_SIZES[-1], 'jpg')):
+        for size, ext, data in render_thumbnails(source_bytes):
+            name = thumbnail_name(image_hash, size, ext)
+            if not default_storage.exists(name):
+                default_storage.save(name, ContentFile(data))
+
+    # Only record the hash if the photo wasn't replaced while we were working
+    Doctors.objects.filter(pk=doctor_id, doc_image=doctor.doc_image.name).update(doc_image_hash=image_hash)
+    return image_hash
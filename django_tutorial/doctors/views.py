@@ -1,6 +1,10 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.conf import settings
+from django.views.decorators.cache import cache_control
+from django.views.static import serve
+from .directory import get_department_directory
 from .models import Departments, Doctors, DoctorAvailability, DoctorLeave
 from .forms import AvailabilityForm, LeaveForm
 from bookings.models import Booking
@@ -12,10 +16,10 @@ def doctors(request):
     
     # Filter doctors by department if specified
     if department_id:
-        doctors_list = Doctors.objects.filter(dep_name_id=department_id).prefetch_related('availabilities', 'leaves')
+        doctors_list = Doctors.objects.filter(dep_name_id=department_id).select_related('dep_name').prefetch_related('leaves')
         selected_department = get_object_or_404(Departments, id=department_id)
     else:
-        doctors_list = Doctors.objects.all().prefetch_related('availabilities', 'leaves')
+        doctors_list = Doctors.objects.select_related('dep_name').prefetch_related('leaves')
     
     dict_docs = {
         'doctors': doctors_list,
@@ -26,8 +30,11 @@ def doctors(request):
 
 def department(request):
     dict_dept={
-        'dept': Departments.objects.all()
+        'dept': get_department_directory()
     }
     return render(request, 'department.html', dict_dept)
 
-
+@cache_control(public=True, max_age=31536000, immutable=True)
+def doctor_thumbnail(request, path):
+    """Serve content-hashed doctor thumbnails with far-future cache headers"""
+    return serve(request, path, document_root=settings.MEDIA_ROOT / 'doctors' / 'thumbs')
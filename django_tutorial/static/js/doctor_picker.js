@@ -0,0 +1,53 @@
+// Typeahead for DoctorPickerWidget: search as the user types, store the chosen id
+// in the hidden input and fire a "change" event on it.
+document.addEventListener('DOMContentLoaded', function () {
+    document.querySelectorAll('.doctor-picker').forEach(picker => {
+        const valueInput = picker.querySelector('.doctor-picker-value');
+        const searchInput = picker.querySelector('input[type="text"]');
+        const results = picker.querySelector('.doctor-picker-results');
+        let searchTimer = null;
+
+        function renderResults(doctors) {
+            results.innerHTML = '';
+            doctors.forEach(doctor => {
+                const item = document.createElement('button');
+                item.type = 'button';
+                item.className = 'list-group-item list-group-item-action';
+                item.textContent = doctor.label;
+                const dept = document.createElement('small');
+                dept.className = 'text-muted d-block';
+                dept.textContent = doctor.department;
+                item.appendChild(dept);
+                item.addEventListener('click', () => {
+                    valueInput.value = doctor.id;
+                    searchInput.value = doctor.label;
+                    results.style.display = 'none';
+                    valueInput.dispatchEvent(new Event('change'));
+                });
+                results.appendChild(item);
+            });
+            results.style.display = doctors.length ? 'block' : 'none';
+        }
+
+        searchInput.addEventListener('input', () => {
+            valueInput.value = '';
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(() => {
+                fetch(`${picker.dataset.searchUrl}?q=${encodeURIComponent(searchInput.value.trim())}`)
+                    .then(response => response.json())
+                    .then(data => renderResults(data.results))
+                    .catch(error => console.error('Error searching doctors:', error));
+            }, 250);
+        });
+        searchInput.addEventListener('focus', () => {
+            if (!searchInput.value) {
+                searchInput.dispatchEvent(new Event('input'));
+            }
+        });
+        document.addEventListener('click', event => {
+            if (!picker.contains(event.target)) {
+                results.style.display = 'none';
+            }
+        });
+    });
+});